@@ -0,0 +1,71 @@
+"""
+Benchmarks of the parsing hot paths, one per sample device where relevant.
+"""
+
+from typing import Tuple
+
+import pytest
+
+from victron_ble.devices import detect_device_type
+from victron_ble.devices.base import BitReader, Device
+
+pytest.importorskip("pytest_benchmark")
+
+
+class TestParse:
+    def test_parse(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        benchmark(device.parse, data)
+
+    def test_parse_cached_keystream(
+        self, benchmark, sample: Tuple[Device, bytes]
+    ) -> None:
+        device, data = sample
+        device = type(device)(device.advertisement_key, keystream_cache_size=16)
+        benchmark(device.parse, data)
+
+    def test_parse_decrypted(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        decrypted = device.decrypt(data)
+        benchmark(device.parse_decrypted, decrypted)
+
+
+class TestDecrypt:
+    def test_decrypt(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        benchmark(device.decrypt, data)
+
+
+class TestDetect:
+    def test_detect_device_type(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        assert benchmark(detect_device_type, data) is type(device)
+
+
+class TestBitReader:
+    # The longest payload of the samples
+    data = bytes(range(24))
+
+    def test_read_unsigned_int(self, benchmark) -> None:
+        def read() -> None:
+            reader = BitReader(self.data)
+            for _ in range(12):
+                reader.read_unsigned_int(16)
+
+        benchmark(read)
+
+    def test_read_bit(self, benchmark) -> None:
+        def read() -> None:
+            reader = BitReader(self.data)
+            for _ in range(64):
+                reader.read_bit()
+
+        benchmark(read)
+
+    def test_read_fields(self, benchmark) -> None:
+        widths = (16, 16, 8, 22, 10, 7, 7, 9, 9)
+
+        def read() -> None:
+            BitReader(self.data).read_fields(widths)
+
+        benchmark(read)
@@ -0,0 +1,31 @@
+"""
+Benchmarks of the JSON output of parsed readings.
+"""
+
+import json
+from typing import Tuple
+
+import pytest
+
+from victron_ble import serializer
+from victron_ble.devices.base import Device
+from victron_ble.scanner import DeviceDataEncoder
+
+pytest.importorskip("pytest_benchmark")
+
+
+class TestSerialize:
+    def test_device_data_encoder(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        parsed = device.parse(data)
+        benchmark(json.dumps, parsed, cls=DeviceDataEncoder, indent=2)
+
+    def test_to_dict(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        parsed = device.parse(data)
+        benchmark(serializer.to_dict, parsed)
+
+    def test_dumps(self, benchmark, sample: Tuple[Device, bytes]) -> None:
+        device, data = sample
+        parsed = device.parse(data)
+        benchmark(serializer.dumps, parsed, indent=2)
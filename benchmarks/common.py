@@ -0,0 +1,94 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+from typing import Dict, List, NamedTuple, Type
+
+from victron_ble.devices import (
+    AcCharger,
+    BatteryMonitor,
+    BatterySense,
+    DcDcConverter,
+    DcEnergyMeter,
+    LynxSmartBMS,
+    MultiRS,
+    SmartBatteryProtect,
+    SmartLithium,
+    SolarCharger,
+    VEBus,
+)
+from victron_ble.devices.base import Device
+from victron_ble.sources import SyntheticDevice
+
+
+class Sample(NamedTuple):
+    key: str
+    data: bytes
+
+
+# Advertisements used by the tests in tests/
+SAMPLES: Dict[Type[Device], Sample] = {
+    AcCharger: Sample(
+        "c129cf8f75c3fe5a1655b481e205fb7d",
+        bytes.fromhex("100030a308f926c1b5170a0d2280335bf12d5ed083"),
+    ),
+    BatteryMonitor: Sample(
+        "aff4d0995b7d1e176c0c33ecb9e70dcd",
+        bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9"),
+    ),
+    BatterySense: Sample(
+        "0da694539597f9cf6c613cde60d7bf05",
+        bytes.fromhex("1000a4a3025f150d8dcbff517f30eb65e76b22a04ac4e1"),
+    ),
+    DcDcConverter: Sample(
+        "64ba49f1a8562e45197a8e1fe50d7658",
+        bytes.fromhex("1000c0a304121d64ca8d442b90bbdf6a8cba"),
+    ),
+    DcEnergyMeter: Sample(
+        "aff4d0995b7d1e176c0c33ecb9e70dcd",
+        bytes.fromhex("100289a30d787fafde83ccec982199fd815286"),
+    ),
+    MultiRS: Sample(
+        "346c410e8c824dd723c0f5b13b9eabc8",
+        bytes.fromhex("100043a40bf4e434af0e46c3b8eb68e08e616993f70c"),
+    ),
+    SmartBatteryProtect: Sample(
+        "fac570d66380b797a5b7543758be00e4",
+        bytes.fromhex("1080b0a3093523fadedea38b1af8bcbde91ca8b6dbb60e"),
+    ),
+    SolarCharger: Sample(
+        "adeccb947395801a4dd45a2eaa44bf17",
+        bytes.fromhex("100242a0016207adceb37b605d7e0ee21b24df5c"),
+    ),
+    VEBus: Sample(
+        "da3f5fa2860cb1cf86ba7a6d1d16b9dd",
+        bytes.fromhex("100380270c1252dad26f0b8eb39162074d140df410"),
+    ),
+}
+
+# The tests only have decrypted payloads of these; encrypt them with a fixed key
+_DECRYPTED_SAMPLES = [
+    (
+        LynxSmartBMS,
+        0xA3E6,
+        b"\x00@8\x8b\n\xfa\xff\x95\x15U\x14\x8c\xcf\x02\x00\xff\xb3\xea\xf1t\xd6\xfczHT\xb8\xec\x00\x86\t\xe9\xca",
+    ),
+    (
+        SmartLithium,
+        0xA0E0,
+        b"\x00\x00\x00\x06\x00\x00\xc7\xe3\xf1\xf8\xff\xff\xff,5\xb5\xfa\xb4x\x01\x0f\xd2I\xd2\xae_iV\xe1\xf8\xa9e",
+    ),
+]
+_SAMPLE_KEY = "0123456789abcdef0123456789abcdef"
+for _device_type, _model_id, _payload in _DECRYPTED_SAMPLES:
+    SAMPLES[_device_type] = Sample(
+        _SAMPLE_KEY, _device_type(_SAMPLE_KEY).encrypt(_payload, _model_id, iv=1)
+    )
+
+
+def advertisements(device: Device, count: int) -> List[bytes]:
+    """
+    Build valid advertisements for the device with random values
+    """
+    synthetic = SyntheticDevice(type(device), "", key=device.advertisement_key, seed=0)
+    return [synthetic.advertisement() for _ in range(count)]
@@ -0,0 +1,16 @@
+from typing import Tuple, Type
+
+import pytest
+from common import SAMPLES
+
+from victron_ble.devices.base import Device
+
+
+@pytest.fixture(params=list(SAMPLES), ids=lambda device_type: device_type.__name__)
+def sample(request) -> Tuple[Device, bytes]:
+    """
+    A device and one of its sample advertisements
+    """
+    device_type: Type[Device] = request.param
+    key, data = SAMPLES[device_type]
+    return device_type(key), data
@@ -0,0 +1,50 @@
+"""
+Compare eager and lazy parsing for consumers that read a single field.
+
+Usage: python benchmarks/lazy.py [readings]
+"""
+
+import os
+import sys
+import timeit
+from typing import Callable, List
+
+from common import advertisements
+
+from victron_ble.devices import (
+    BatteryMonitor,
+    DeviceData,
+    SmartLithium,
+    SolarCharger,
+)
+from victron_ble.devices.base import Device
+
+CONSUMERS = {
+    BatteryMonitor: BatteryMonitor.data_type.get_soc,
+    SmartLithium: SmartLithium.data_type.get_battery_voltage,
+    SolarCharger: SolarCharger.data_type.get_battery_voltage,
+}
+
+
+def run(device: Device, data: List[bytes], getter: Callable[[DeviceData], object]):
+    for advertisement in data:
+        getter(device.parse(advertisement))
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    key = os.urandom(16).hex()
+    print(f"{'device':<16}{'eager':>12}{'lazy':>12}  (us per reading)")
+    for device_type, getter in CONSUMERS.items():
+        data = advertisements(device_type(key), count)
+        results = []
+        for device in (device_type(key), device_type(key, lazy=True)):
+            seconds = min(
+                timeit.repeat(lambda: run(device, data, getter), number=1, repeat=5)
+            )
+            results.append(seconds / count * 1e6)
+        print(f"{device_type.__name__:<16}{results[0]:>12.2f}{results[1]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
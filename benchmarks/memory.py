@@ -0,0 +1,68 @@
+"""
+Compare the memory retained by parsed readings stored as dicts and as records,
+against a baseline of readings without __slots__.
+
+Usage: python benchmarks/memory.py [readings]
+"""
+
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, List, Optional
+
+from common import advertisements
+
+from victron_ble.devices import BatteryMonitor, DeviceData, SolarCharger
+from victron_ble.devices.base import Device
+
+
+class UnslottedData:
+    """
+    DeviceData as it was before __slots__, with a __dict__ per instance
+    """
+
+    def __init__(self, model_id: int, data: Any) -> None:
+        self._model_id = model_id
+        self._data = data
+
+
+def unslotted(reading: DeviceData) -> UnslottedData:
+    return UnslottedData(reading._model_id, reading._data)
+
+
+def measure(
+    device: Device,
+    data: List[bytes],
+    convert: Optional[Callable[[DeviceData], Any]] = None,
+) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    readings: List[Any] = [device.parse(d) for d in data]
+    if convert is not None:
+        readings = [convert(reading) for reading in readings]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del readings
+    return retained / len(data)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    key = os.urandom(16).hex()
+    print(
+        f"{'device':<16}{'unslotted':>12}{'dict':>12}{'compact':>12}"
+        "  (bytes per reading)"
+    )
+    for device_type in (BatteryMonitor, SolarCharger):
+        data = advertisements(device_type(key), count)
+        baseline = measure(device_type(key), data, unslotted)
+        plain = measure(device_type(key), data)
+        compact = measure(device_type(key, compact=True), data)
+        print(
+            f"{device_type.__name__:<16}{baseline:>12.0f}{plain:>12.0f}"
+            f"{compact:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
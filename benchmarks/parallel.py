@@ -0,0 +1,70 @@
+"""
+Compare parsing throughput in the event loop and in 1, 2 and 4 worker processes.
+
+Usage: python benchmarks/parallel.py [devices] [advertisements per device]
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from common import advertisements
+
+from victron_ble.devices import BatteryMonitor, SmartLithium, SolarCharger
+from victron_ble.parallel import ShardedParser
+
+DEVICE_TYPES = (BatteryMonitor, SmartLithium, SolarCharger)
+
+
+def fleet(devices: int, count: int) -> Tuple[Dict[str, str], List[Tuple[str, bytes]]]:
+    """
+    Build interleaved advertisements from a number of devices
+    """
+    keys: Dict[str, str] = {}
+    streams = []
+    for index in range(devices):
+        address = f"aa:bb:cc:dd:{index // 256:02x}:{index % 256:02x}"
+        keys[address] = os.urandom(16).hex()
+        device = DEVICE_TYPES[index % len(DEVICE_TYPES)](keys[address])
+        streams.append([(address, data) for data in advertisements(device, count)])
+    return keys, [item for items in zip(*streams) for item in items]
+
+
+def inline(keys: Dict[str, str], data: List[Tuple[str, bytes]]) -> float:
+    devices = {
+        address: DEVICE_TYPES[index % len(DEVICE_TYPES)](key)
+        for index, (address, key) in enumerate(keys.items())
+    }
+    start = time.perf_counter()
+    for address, advertisement in data:
+        devices[address].parse(advertisement)
+    return time.perf_counter() - start
+
+
+def sharded(keys: Dict[str, str], data: List[Tuple[str, bytes]], workers: int) -> float:
+    parser = ShardedParser(keys, workers)
+    try:
+        # Start the worker processes before timing
+        parser.parse_many(data[: workers * 16])
+        start = time.perf_counter()
+        parser.parse_many(data)
+        return time.perf_counter() - start
+    finally:
+        parser.close()
+
+
+def main() -> None:
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    keys, data = fleet(devices, count)
+    print(f"{len(data)} advertisements from {devices} devices")
+    print(f"{'backend':<12}{'adv/s':>12}")
+    print(f"{'inline':<12}{len(data) / inline(keys, data):>12.0f}")
+    for workers in (1, 2, 4):
+        seconds = sharded(keys, data, workers)
+        print(f"{f'{workers} workers':<12}{len(data) / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
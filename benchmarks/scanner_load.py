@@ -0,0 +1,254 @@
+"""
+Drive a Scanner through its detection callback with synthetic load from many
+devices, e.g. to size a gateway for a campground or a battery farm.
+
+Every device advertises at a fixed rate and repeats its previous payload for
+a fraction of its advertisements, as real devices do between readings. The
+advertisements are generated before the run starts, so only the scanner is
+measured. Reports the offered and sustained packet rates, the latency of the
+detection callback (and of queued or batched delivery), memory growth and
+dropped advertisements, once per second and for the whole run.
+
+Usage: python benchmarks/scanner_load.py --devices 1000 --rate 2 --duration 10
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import resource
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from victron_ble.devices import default_registry
+from victron_ble.pipeline import OverflowPolicy, QueuedAdvertisement
+from victron_ble.scanner import Scanner
+from victron_ble.sources import SyntheticDevice, make_advertisement
+
+Advertisement = Tuple[BLEDevice, AdvertisementData]
+
+# Advertisements delivered before yielding to the event loop when behind
+_YIELD_EVERY = 64
+
+
+def rss() -> int:
+    """
+    Return the resident set size of the process in bytes
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # The peak is the best available without procfs
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return math.nan
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def workload(
+    devices: int, rate: float, duplicates: float, duration: float, seed: int
+) -> Tuple[Dict[str, str], List[Advertisement]]:
+    """
+    Build the keys and the interleaved advertisements of all devices
+    """
+    device_types = sorted(
+        (klass for klass in default_registry.device_types() if klass.layout),
+        key=lambda klass: klass.__name__,
+    )
+    rng = random.Random(seed)
+    per_device = max(1, round(rate * duration))
+    synthetic = [
+        SyntheticDevice(
+            device_types[index % len(device_types)],
+            "AA:BB:" + index.to_bytes(4, "big").hex(":").upper(),
+            seed=seed + index,
+        )
+        for index in range(devices)
+    ]
+    streams: List[List[Advertisement]] = []
+    for device in synthetic:
+        stream: List[Advertisement] = []
+        for _ in range(per_device):
+            if not stream or rng.random() >= duplicates:
+                current = make_advertisement(
+                    device.address, device.name, device.rssi, device.advertisement()
+                )
+            stream.append(current)
+        streams.append(stream)
+    keys = {device.address: device.key for device in synthetic}
+    return keys, [item for items in zip(*streams) for item in items]
+
+
+class LoadScanner(Scanner):
+    """
+    A Scanner that records delivery latencies and counts its output
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.delivery_latencies: List[float] = []
+        self.outputs = 0
+
+    def _process(self, item: QueuedAdvertisement) -> None:
+        if self._batch_size <= 0:
+            self.delivery_latencies.append(time.monotonic() - item.timestamp)
+        super()._process(item)
+
+    def callback_batch(self, items: List[QueuedAdvertisement]) -> None:
+        now = time.monotonic()
+        self.delivery_latencies.extend(now - item.timestamp for item in items)
+        super().callback_batch(items)
+
+    def write(self, lines: List[str]) -> None:
+        self.outputs += len(lines)
+
+
+class Report:
+    def __init__(self, scanner: LoadScanner) -> None:
+        self.scanner = scanner
+        self.start = time.monotonic()
+        self.start_rss = rss()
+        self.sent = 0
+        self.latencies: List[float] = []
+        self._last = self.start
+        self._last_sent = 0
+        self._last_index = 0
+
+    def interval(self) -> None:
+        now = time.monotonic()
+        first = self._last_index
+        latencies = self.latencies[first:]
+        rate = (self.sent - self._last_sent) / (now - self._last)
+        print(
+            f"{now - self.start:>6.1f}s {rate:>10.0f}/s"
+            f" p50 {percentile(latencies, 0.5) * 1e6:>7.1f}us"
+            f" p99 {percentile(latencies, 0.99) * 1e6:>7.1f}us"
+            f" rss {(rss() - self.start_rss) / 2**20:>+8.1f}MiB"
+            f" dropped {self.dropped():>8}"
+        )
+        self._last = now
+        self._last_sent = self.sent
+        self._last_index = len(self.latencies)
+
+    def dropped(self) -> int:
+        return self.scanner.pipeline_stats().get("dropped", 0)
+
+    def summary(self, elapsed: float, offered: Optional[float]) -> None:
+        scanner = self.scanner
+        print()
+        if offered:
+            print(f"offered rate        {offered:>12.0f} packets/s")
+        print(f"sustained rate      {self.sent / elapsed:>12.0f} packets/s")
+        print(f"output readings     {scanner.outputs:>12}")
+        print(
+            f"callback latency    p50 {percentile(self.latencies, 0.5) * 1e6:.1f}us"
+            f"  p99 {percentile(self.latencies, 0.99) * 1e6:.1f}us"
+            f"  max {max(self.latencies) * 1e6:.1f}us"
+        )
+        delivery = scanner.delivery_latencies
+        if delivery:
+            print(
+                f"delivery latency    p50 {percentile(delivery, 0.5) * 1e3:.2f}ms"
+                f"  p99 {percentile(delivery, 0.99) * 1e3:.2f}ms"
+            )
+        print(f"memory growth       {(rss() - self.start_rss) / 2**20:>+12.1f} MiB")
+        print(f"duplicates dropped  {scanner.dedup_stats()['duplicates']:>12}")
+        print(f"queue drops         {self.dropped():>12}")
+        for name, value in sorted(scanner.pipeline_stats().items()):
+            print(f"  {name:<18}{value:>12}")
+        for reason, count in sorted(scanner.rejection_stats().items()):
+            print(f"rejected {reason:<11}{count:>12}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    keys, advertisements = workload(
+        args.devices, args.rate, args.duplicates, args.duration, args.seed
+    )
+    offered = None if args.flat_out else args.devices * args.rate
+    print(
+        f"{len(advertisements)} advertisements from {args.devices} devices"
+        + (f" at {offered:.0f}/s" if offered else " as fast as possible")
+    )
+    scanner = LoadScanner(
+        keys,
+        queue_size=args.queue_size,
+        overflow_policy=args.overflow,
+        batch_size=args.batch_size,
+        parse_workers=args.parse_workers,
+        dedup_capacity=args.dedup_capacity,
+    )
+    callback = scanner._detection_callback
+    scanner.start_processing()
+    report = Report(scanner)
+    latencies = report.latencies
+    next_report = report.start + 1
+    for index, (device, advertisement) in enumerate(advertisements):
+        now = time.monotonic()
+        if offered:
+            delay = report.start + index / offered - now
+            if delay > 0.001:
+                await asyncio.sleep(delay)
+            elif index % _YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+        elif index % _YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+        if now >= next_report:
+            report.interval()
+            next_report += 1
+        start = time.perf_counter()
+        callback(device, advertisement)
+        latencies.append(time.perf_counter() - start)
+        report.sent += 1
+    elapsed = time.monotonic() - report.start
+    await scanner.stop_processing()
+    report.interval()
+    report.summary(elapsed, offered)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument(
+        "--rate", type=float, default=2.0, help="Advertisements per device per second"
+    )
+    parser.add_argument(
+        "--duplicates",
+        type=float,
+        default=0.5,
+        help="Fraction of advertisements repeating the previous payload",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument(
+        "--flat-out",
+        action="store_true",
+        help="Send as fast as possible instead of at the device rate",
+    )
+    parser.add_argument(
+        "--dedup-capacity",
+        type=int,
+        default=1000,
+        help="Should exceed the number of devices to catch every duplicate",
+    )
+    parser.add_argument("--queue-size", type=int, default=0)
+    parser.add_argument(
+        "--overflow",
+        choices=[policy.value for policy in OverflowPolicy],
+        default=OverflowPolicy.DROP_OLDEST.value,
+    )
+    parser.add_argument("--batch-size", type=int, default=0)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
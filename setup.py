@@ -50,5 +50,9 @@ setup(
     packages=find_packages(exclude=["tests", ".github"]),
     install_requires=read_requirements("requirements.txt"),
     entry_points={"console_scripts": ["victron-ble = victron_ble.cli:cli"]},
-    extras_require={"test": read_requirements("requirements-test.txt")},
+    extras_require={
+        "numpy": ["numpy"],
+        "orjson": ["orjson"],
+        "test": read_requirements("requirements-test.txt"),
+    },
 )
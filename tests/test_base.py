@@ -1,4 +1,24 @@
-from victron_ble.devices.base import BitReader
+import pickle
+import random
+
+import pytest
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+from Crypto.Util.Padding import pad
+
+from victron_ble.devices.base import (
+    BitReader,
+    Device,
+    Field,
+    Layout,
+    LazyFields,
+    OperationMode,
+    Record,
+    make_record,
+    record_type,
+)
+from victron_ble.devices.battery_monitor import BatteryMonitor
+from victron_ble.devices.solar_charger import SolarCharger
 
 
 class TestBitReader:
@@ -31,3 +51,241 @@ class TestBitReader:
         assert reader.read_unsigned_int(11) == 0x4D3
         assert reader.read_bit() == 0
         assert reader.read_unsigned_int(32) == 0x90786F5E
+
+    def test_read_fields(self) -> None:
+        reader = BitReader(bytes.fromhex("1a2b3c4d5e6f7890"))
+        assert reader.read_fields([4, 6]) == (0xA, 0x31)
+        assert reader.read_signed_fields([6, 4]) == (0x0A, -0x04)
+        assert reader.read_fields([11, 1, 32]) == (0x4D3, 0, 0x90786F5E)
+        assert reader.read_fields([]) == ()
+
+    def test_read_past_end(self) -> None:
+        reader = BitReader(bytes.fromhex("ff"))
+        assert reader.read_unsigned_int(7) == 0x7F
+        with pytest.raises(IndexError):
+            reader.read_unsigned_int(2)
+        assert reader.read_bit() == 1
+        with pytest.raises(IndexError):
+            reader.read_bit()
+
+    def test_matches_bit_loop_reader(self) -> None:
+        rng = random.Random(0)
+        for _ in range(200):
+            data = bytes(rng.randrange(256) for _ in range(16))
+            widths = []
+            while sum(widths) < 100:
+                widths.append(rng.randint(1, 32))
+            widths[-1] -= sum(widths) - 100
+
+            reader = BitReader(data)
+            reference = BitLoopReader(data)
+            for num_bits in widths:
+                if rng.random() < 0.5:
+                    expected = reference.read_unsigned_int(num_bits)
+                    assert reader.read_unsigned_int(num_bits) == expected
+                else:
+                    expected = reference.read_signed_int(num_bits)
+                    assert reader.read_signed_int(num_bits) == expected
+
+            reference = BitLoopReader(data)
+            assert BitReader(data).read_fields(widths) == tuple(
+                reference.read_unsigned_int(num_bits) for num_bits in widths
+            )
+            reference = BitLoopReader(data)
+            assert BitReader(data).read_signed_fields(widths) == tuple(
+                reference.read_signed_int(num_bits) for num_bits in widths
+            )
+
+
+# The original bit-at-a-time implementation, kept as a reference
+class BitLoopReader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._index = 0
+
+    def read_bit(self) -> int:
+        bit = (self._data[self._index >> 3] >> (self._index & 7)) & 1
+        self._index += 1
+        return bit
+
+    def read_unsigned_int(self, num_bits: int) -> int:
+        value = 0
+        for position in range(0, num_bits):
+            value |= self.read_bit() << position
+        return value
+
+    def read_signed_int(self, num_bits: int) -> int:
+        return BitReader.to_signed_int(self.read_unsigned_int(num_bits), num_bits)
+
+
+class TestLayout:
+    def test_unpack(self) -> None:
+        layout = Layout(
+            Field("state", 8, not_available=0xFF, enum=OperationMode),
+            Field("voltage", 16, signed=True, not_available=0x7FFF, scale=100),
+            Field("temperature", 7, not_available=0x7F, offset=-40),
+            Field("yield", 9, transform=lambda v: v * 10),
+            Field("flags", 8),
+        )
+        assert layout.bits == 48
+        assert layout.unpack(bytes.fromhex("036c053e2100")) == {
+            "state": OperationMode.BULK,
+            "voltage": 13.88,
+            "temperature": 22,
+            "yield": 660,
+            "flags": 0,
+        }
+        assert layout.unpack(bytes.fromhex("fffffffffffe")) == {
+            "state": None,
+            "voltage": -0.01,
+            "temperature": None,
+            "yield": 5110,
+            "flags": 0xFE,
+        }
+
+    def test_unpack_matches_bit_reader(self) -> None:
+        data = bytes.fromhex("1a2b3c4d5e6f7890")
+        layout = Layout(
+            Field("a", 10),
+            Field("b", 6, signed=True),
+            Field("c", 4, signed=True),
+            Field("d", 11),
+            Field("e", 1),
+            Field("f", 32),
+        )
+        reader = BitReader(data)
+        assert layout.unpack(data) == {
+            "a": reader.read_unsigned_int(10),
+            "b": reader.read_signed_int(6),
+            "c": reader.read_signed_int(4),
+            "d": reader.read_unsigned_int(11),
+            "e": reader.read_unsigned_int(1),
+            "f": reader.read_unsigned_int(32),
+        }
+
+
+class TestDevice:
+    def test_decrypt_matches_aes_ctr(self) -> None:
+        key = bytes.fromhex("aff4d0995b7d1e176c0c33ecb9e70dcd")
+        device = BatteryMonitor(key.hex())
+        for iv in (0x0000, 0xB040, 0xFFFF):
+            encrypted = bytes([key[0]]) + bytes(range(1, 21))
+            data = bytes.fromhex("100289a302") + iv.to_bytes(2, "little") + encrypted
+
+            cipher = AES.new(
+                key,
+                AES.MODE_CTR,
+                counter=Counter.new(128, initial_value=iv, little_endian=True),
+            )
+            assert device.decrypt(data) == cipher.decrypt(pad(encrypted[1:], 16))
+
+    def test_key_is_parsed_once(self) -> None:
+        device = BatteryMonitor("aff4d0995b7d1e176c0c33ecb9e70dcd")
+        device.advertisement_key = "ffffffffffffffffffffffffffffffff"
+        assert device.advertisement_key == "ffffffffffffffffffffffffffffffff"
+        assert device.keystream(0, 16) == AES.new(b"\xff" * 16, AES.MODE_ECB).encrypt(
+            bytes(16)
+        )
+
+    def test_keystream_cache(self) -> None:
+        data = bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9")
+        device = BatteryMonitor(
+            "aff4d0995b7d1e176c0c33ecb9e70dcd", keystream_cache_size=1
+        )
+        uncached = BatteryMonitor("aff4d0995b7d1e176c0c33ecb9e70dcd")
+
+        assert device.decrypt(data) == uncached.decrypt(data)
+        assert device.decrypt(data) == uncached.decrypt(data)
+        assert device.keystream_cache_info() == (1, 1, 1, 1)
+
+        # A different IV evicts the least recently used keystream
+        device.keystream(0x1234, 16)
+        device.decrypt(data)
+        assert device.keystream_cache_info() == (1, 3, 1, 1)
+        assert uncached.keystream_cache_info() == (0, 0, 0, 0)
+
+    def test_requires_layout_or_parse_decrypted(self) -> None:
+        class Unparseable(Device):
+            pass
+
+        class Parseable(Device):
+            layout = Layout(Field("a", 8))
+
+        with pytest.raises(TypeError):
+            Unparseable(None)  # type: ignore[abstract]
+        assert Parseable(None).parse_decrypted(b"\x05") == {"a": 5}
+
+
+class TestRecord:
+    def test_mapping_access(self) -> None:
+        record = make_record({"voltage": 12.5, "current": None})
+        assert isinstance(record, Record)
+        assert record["voltage"] == 12.5
+        assert record[0] == 12.5
+        assert record.get("current") is None
+        assert record.get("missing", 1) == 1
+        assert "voltage" in record
+        assert 12.5 not in record
+        assert dict(record.items()) == {"voltage": 12.5, "current": None}
+        with pytest.raises(KeyError):
+            record["missing"]
+
+    def test_types_are_shared(self) -> None:
+        assert record_type(("a", "b")) is record_type(("a", "b"))
+        assert type(make_record({"a": 1})) is not type(make_record({"b": 1}))
+
+    def test_pickle(self) -> None:
+        record = make_record({"a": 1, "b": "x"})
+        restored = pickle.loads(pickle.dumps(record))
+        assert restored == record
+        assert restored["b"] == "x"
+
+
+class TestDeviceData:
+    DATA = bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9")
+    KEY = "aff4d0995b7d1e176c0c33ecb9e70dcd"
+
+    def test_slots(self) -> None:
+        data = BatteryMonitor(self.KEY).parse(self.DATA)
+        assert not hasattr(data, "__dict__")
+
+    def test_compact_matches_dict(self) -> None:
+        data = BatteryMonitor(self.KEY).parse(self.DATA)
+        compact = BatteryMonitor(self.KEY, compact=True).parse(self.DATA)
+        assert isinstance(compact._data, Record)
+        assert compact.to_dict() == data.to_dict()
+        assert compact.to_tuple() == data.to_tuple()
+        assert compact.get_voltage() == data.get_voltage()
+        assert compact.get_alarm() == data.get_alarm()
+        assert data.compact().to_dict() == data.to_dict()
+        assert compact.compact() is compact
+        assert pickle.loads(pickle.dumps(compact)).to_dict() == data.to_dict()
+
+    def test_lazy_matches_eager(self) -> None:
+        data = BatteryMonitor(self.KEY).parse(self.DATA)
+        lazy = BatteryMonitor(self.KEY, lazy=True).parse(self.DATA)
+        assert isinstance(lazy._data, LazyFields)
+        assert lazy.get_soc() == data.get_soc()
+        # parse_decrypted replaces the raw aux field by derived values
+        with pytest.raises(KeyError):
+            lazy._data["aux"]
+        with pytest.raises(KeyError):
+            data._data["aux"]
+        assert lazy.get_temperature() == data.get_temperature()
+        assert lazy.get_starter_voltage() == data.get_starter_voltage()
+        assert lazy.to_dict() == data.to_dict()
+        assert pickle.loads(pickle.dumps(lazy)).to_dict() == data.to_dict()
+
+    def test_lazy_decodes_single_fields(self) -> None:
+        key = "adeccb947395801a4dd45a2eaa44bf17"
+        advertisement = bytes.fromhex("100242a0016207adceb37b605d7e0ee21b24df5c")
+        data = SolarCharger(key).parse(advertisement)
+        lazy = SolarCharger(key, lazy=True).parse(advertisement)
+        assert isinstance(lazy._data, LazyFields)
+        assert lazy.get_battery_voltage() == data.get_battery_voltage()
+        assert lazy._data._parsed is None
+        assert lazy.to_dict() == data.to_dict()
+
+    def test_lazy_and_compact_are_exclusive(self) -> None:
+        with pytest.raises(ValueError):
+            BatteryMonitor(self.KEY, compact=True, lazy=True)
@@ -0,0 +1,59 @@
+import pytest
+
+from victron_ble.devices.base import Device, OperationMode
+from victron_ble.devices.battery_monitor import AlarmReason, AuxMode, BatteryMonitor
+from victron_ble.devices.solar_charger import SolarCharger
+from victron_ble.exceptions import AdvertisementKeyMismatchError
+
+np = pytest.importorskip("numpy")
+
+
+class TestParseBatch:
+    def test_battery_monitor(self) -> None:
+        data = bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9")
+        device = BatteryMonitor("aff4d0995b7d1e176c0c33ecb9e70dcd")
+        actual = device.parse_batch([data, data])
+
+        assert list(actual["model_id"]) == [0xA389, 0xA389]
+        assert list(actual["voltage"]) == [12.53, 12.53]
+        assert list(actual["soc"]) == [50.0, 50.0]
+        assert list(actual["consumed_ah"]) == [-50.0, -50.0]
+        assert list(actual["alarm"]) == [AlarmReason.NO_ALARM] * 2
+        assert list(actual["aux_mode"]) == [AuxMode.DISABLED] * 2
+        assert actual["remaining_mins"].mask.all()
+
+    def test_matches_scalar_parse(self) -> None:
+        device = SolarCharger("adeccb947395801a4dd45a2eaa44bf17")
+        # The same payload under other IVs decrypts to different valid readings
+        valid = [
+            bytes.fromhex("100242a0016207adceb37b605d7e0ee21b24df5c"),
+            bytes.fromhex("100242a0012700adceb37b605d7e0ee21b24df5c"),
+            bytes.fromhex("100242a0014301adceb37b605d7e0ee21b24df5c"),
+            bytes.fromhex("100242a0017501adceb37b605d7e0ee21b24df5c"),
+        ]
+        actual = device.parse_batch(valid)
+        for row, advertisement in enumerate(valid):
+            expected = device.parse_decrypted(device.decrypt(advertisement))
+            for name, value in expected.items():
+                column = actual[name]
+                assert (None if column.mask[row] else column[row]) == value
+
+        assert list(actual["charge_state"]) == [
+            OperationMode.ABSORPTION,
+            OperationMode.STORAGE,
+            OperationMode.EQUALIZE_MANUAL,
+            OperationMode.OFF,
+        ]
+
+    def test_key_mismatch(self) -> None:
+        data = bytes.fromhex("100289a302bb01af129087600b9b97bc2c32867c8238da")
+        with pytest.raises(AdvertisementKeyMismatchError):
+            BatteryMonitor("ffffffffffffffffffffffffffffffff").parse_batch([data])
+
+    def test_requires_layout(self) -> None:
+        class Unlaid(Device):
+            def parse_decrypted(self, decrypted: bytes) -> dict:
+                return {}
+
+        with pytest.raises(ValueError):
+            Unlaid("ffffffffffffffffffffffffffffffff").parse_batch([])
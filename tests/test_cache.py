@@ -0,0 +1,67 @@
+from victron_ble.cache import Deduplicator, NegativeCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestNegativeCache:
+    def test_expiry(self) -> None:
+        clock = FakeClock()
+        cache = NegativeCache(capacity=10, ttl=60, clock=clock)
+        cache.add("aa:bb", "missing_key")
+
+        assert "aa:bb" in cache
+        assert "cc:dd" not in cache
+        clock.now = 60
+        assert "aa:bb" not in cache
+        assert len(cache) == 0
+
+    def test_capacity(self) -> None:
+        cache = NegativeCache(capacity=2, ttl=60, clock=FakeClock())
+        cache.add("a", "missing_key")
+        cache.add("b", "missing_key")
+        cache.add("c", "unknown_device")
+
+        assert "a" not in cache
+        assert "b" in cache
+        assert "c" in cache
+        assert cache.rejections == {"missing_key": 1, "unknown_device": 1}
+
+    def test_disabled(self) -> None:
+        cache = NegativeCache(capacity=0)
+        cache.add("a", "missing_key")
+        assert "a" not in cache
+
+
+class TestDeduplicator:
+    def test_window(self) -> None:
+        clock = FakeClock()
+        deduplicator = Deduplicator(capacity=10, window=10, clock=clock)
+
+        assert not deduplicator.is_duplicate(("a", b"1"))
+        assert not deduplicator.is_duplicate(("b", b"1"))
+        clock.now = 5
+        assert deduplicator.is_duplicate(("a", b"1"))
+        clock.now = 10
+        assert not deduplicator.is_duplicate(("a", b"1"))
+        assert len(deduplicator) == 1
+        assert (deduplicator.unique, deduplicator.duplicates) == (3, 1)
+
+    def test_capacity(self) -> None:
+        deduplicator = Deduplicator(capacity=2, window=None, clock=FakeClock())
+        for key in ("a", "b", "c"):
+            assert not deduplicator.is_duplicate(key)
+
+        assert deduplicator.is_duplicate("c")
+        assert not deduplicator.is_duplicate("a")
+        assert len(deduplicator) == 2
+
+    def test_disabled(self) -> None:
+        deduplicator = Deduplicator(capacity=0)
+        assert not deduplicator.is_duplicate("a")
+        assert not deduplicator.is_duplicate("a")
@@ -2,7 +2,10 @@ from victron_ble.devices import (
     BatteryMonitor,
     BatterySense,
     DcEnergyMeter,
+    DetectionResult,
+    DeviceRegistry,
     SolarCharger,
+    default_registry,
     detect_device_type,
 )
 
@@ -25,3 +28,28 @@ def test_battery_sense_discovery() -> None:
 
 def test_solar_charger_discovery() -> None:
     assert detect_device_type(bytes.fromhex("100242a001")) == SolarCharger
+
+
+def test_unknown_device_reason() -> None:
+    result = default_registry.detect(bytes.fromhex("100289a306"))
+    assert result.device_type is None
+    assert result.model_id == 0xA389
+    assert result.readout_type == 0x6
+    assert result.reason == "Unsupported readout type 0x6 for model 0xA389"
+
+    result = default_registry.detect(bytes.fromhex("1002"))
+    assert result == DetectionResult(None, reason="Advertisement is too short")
+
+
+def test_registry() -> None:
+    registry = DeviceRegistry()
+    registry.register(SolarCharger)
+    assert registry.lookup(0xA042, 0x1) == SolarCharger
+    assert registry.lookup(0xA042, 0x2) is None
+
+    # Registrations invalidate memoized lookups
+    registry.register(BatteryMonitor, readout_type=0x1)
+    assert registry.lookup(0xA042, 0x1) == BatteryMonitor
+    registry.register_model(0xA042, SolarCharger)
+    assert registry.lookup(0xA042, 0x2) == SolarCharger
+    assert registry.detect(bytes.fromhex("100242a001")).device_type == SolarCharger
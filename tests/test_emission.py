@@ -0,0 +1,136 @@
+from typing import List
+
+import click
+import pytest
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from tests.test_state import reading
+from victron_ble.cli import FloatAssignmentParam, emission_filter
+from victron_ble.devices.base import AlarmReason
+from victron_ble.emission import EmissionFilter, EmissionPolicy
+from victron_ble.scanner import Scanner
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestEmissionPolicy:
+    def test_is_significant(self) -> None:
+        policy = EmissionPolicy(deadbands={"voltage": 0.1})
+        old = {"voltage": 12.5, "soc": 50.0, "alarm": AlarmReason.NO_ALARM}
+
+        assert not policy.is_significant(old, {**old, "voltage": 12.59})
+        assert not policy.is_significant(old, {**old, "soc": 40.0})
+        assert policy.is_significant(old, {**old, "voltage": 12.61})
+        assert policy.is_significant(old, {**old, "voltage": None})
+        assert policy.is_significant(old, {**old, "alarm": AlarmReason.LOW_VOLTAGE})
+        assert not EmissionPolicy(emit_on_enum_change=False).is_significant(
+            old, {**old, "alarm": AlarmReason.LOW_VOLTAGE}
+        )
+
+
+class TestEmissionFilter:
+    def test_interval(self) -> None:
+        clock = Clock()
+        emission = EmissionFilter(EmissionPolicy(interval=10), clock=clock)
+
+        emitted: List[bool] = []
+        for now in (0, 1, 5, 10, 15, 21):
+            clock.now = now
+            emitted.append(emission.should_emit(BATTERY_MONITOR_ADDRESS, reading()))
+        assert emitted == [True, False, False, True, False, True]
+        assert (emission.emitted, emission.suppressed) == (3, 3)
+
+    def test_significant_changes(self) -> None:
+        clock = Clock()
+        emission = EmissionFilter(
+            EmissionPolicy(interval=None, deadbands={"voltage": 0.1}), clock=clock
+        )
+        address = BATTERY_MONITOR_ADDRESS
+
+        assert emission.should_emit(address, reading(voltage=12.5))
+        clock.now = 1000
+        assert not emission.should_emit(address, reading(voltage=12.55))
+        assert emission.should_emit(address, reading(voltage=12.65))
+        # Measured from the last emitted value
+        assert not emission.should_emit(address, reading(voltage=12.6))
+        assert emission.should_emit(address, reading(alarm=AlarmReason.LOW_VOLTAGE))
+
+    def test_policies_per_device(self) -> None:
+        clock = Clock()
+        emission = EmissionFilter(
+            EmissionPolicy(interval=10),
+            {
+                "BatteryMonitor": EmissionPolicy(interval=100),
+                "11:22:33:44:55:66": EmissionPolicy(interval=0),
+            },
+            clock=clock,
+        )
+        for address in (BATTERY_MONITOR_ADDRESS, "11:22:33:44:55:66"):
+            assert emission.should_emit(address, reading())
+        clock.now = 50
+
+        assert not emission.should_emit(BATTERY_MONITOR_ADDRESS, reading())
+        assert emission.should_emit("11:22:33:44:55:66", reading())
+
+    def test_without_policy(self) -> None:
+        emission = EmissionFilter()
+        assert emission.should_emit(BATTERY_MONITOR_ADDRESS, reading())
+        assert emission.should_emit(BATTERY_MONITOR_ADDRESS, reading())
+
+
+class TestScannerEmission:
+    def test_suppresses_readings(self, capsys) -> None:
+        scanner = Scanner(
+            {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+            dedup_capacity=0,
+            emission=EmissionPolicy(interval=60),
+        )
+        for _ in range(3):
+            advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+
+        assert capsys.readouterr().out.count("payload") == 1
+
+
+class TestCli:
+    def test_float_assignment_param(self) -> None:
+        assert FloatAssignmentParam().convert("voltage=0.1", None, None) == (
+            "voltage",
+            0.1,
+        )
+        assert FloatAssignmentParam(name_required=False).convert("5", None, None) == (
+            None,
+            5.0,
+        )
+        with pytest.raises(click.BadParameter):
+            FloatAssignmentParam().convert("5", None, None)
+        with pytest.raises(click.BadParameter):
+            FloatAssignmentParam().convert("voltage=high", None, None)
+
+    def test_emission_filter(self) -> None:
+        assert emission_filter([], [], True) is None
+
+        emission = emission_filter(
+            [(None, 30.0), ("SolarCharger", 5.0)], [("voltage", 0.1)], False
+        )
+        assert emission is not None
+        assert emission.default == EmissionPolicy(30.0, {"voltage": 0.1}, False)
+        assert emission.policies == {
+            "solarcharger": EmissionPolicy(5.0, {"voltage": 0.1}, False)
+        }
+
+        # Only deadbands: output significant changes only
+        emission = emission_filter([], [("voltage", 0.1)], True)
+        assert emission is not None
+        assert emission.default is not None
+        assert emission.default.interval is None
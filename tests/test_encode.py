@@ -0,0 +1,76 @@
+import pytest
+
+from victron_ble.devices import (
+    AuxMode,
+    BatteryMonitor,
+    DcEnergyMeter,
+    SmartLithium,
+    default_registry,
+)
+from victron_ble.devices.base import AlarmReason, Field, Layout
+from victron_ble.devices.dc_energy_meter import MeterType
+from victron_ble.sources import SyntheticDevice
+
+DEVICE_TYPES = sorted(
+    (klass for klass in default_registry.device_types() if klass.layout),
+    key=lambda klass: klass.__name__,
+)
+
+
+@pytest.mark.parametrize("device_type", DEVICE_TYPES, ids=lambda k: k.__name__)
+def test_round_trip(device_type) -> None:
+    synthetic = SyntheticDevice(device_type, "AA:BB:CC:DD:EE:FF", seed=1)
+    device = device_type(synthetic.key)
+    for iv in range(200):
+        data = synthetic.advertisement()
+        parsed = device.parse(data)._data
+
+        payload = device.encode(parsed)
+        assert device.parse_decrypted(payload) == parsed
+
+        model_id = device.get_model_id(data)
+        encrypted = device.encrypt(payload, model_id, iv)
+        assert device.decrypt(encrypted)[: len(payload)] == payload
+        assert device.parse(encrypted).to_dict() == parsed
+        assert default_registry.detect(encrypted).device_type is device_type
+
+
+class TestEncode:
+    KEY = "aff4d0995b7d1e176c0c33ecb9e70dcd"
+    DATA = bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9")
+
+    def test_encrypt_reproduces_advertisement(self) -> None:
+        device = BatteryMonitor(self.KEY)
+        payload = device.decrypt(self.DATA)[: len(self.DATA) - 8]
+        assert device.encrypt(payload, 0xA389, 0x40B0) == self.DATA
+
+    def test_missing_values_are_not_available(self) -> None:
+        layout = Layout(
+            Field("a", 16, signed=True, not_available=0x7FFF, scale=100),
+            Field("b", 7, not_available=0x7F, offset=-40),
+        )
+        assert layout.unpack(layout.encode({})) == {"a": None, "b": None}
+        assert layout.unpack(layout.encode({"a": -12.34, "b": -40})) == {
+            "a": -12.34,
+            "b": -40,
+        }
+        assert Layout(Field("c", 4)).encode({}) == b"\0"
+        with pytest.raises(ValueError):
+            Layout(Field("c", 4)).encode({"c": None})
+
+    def test_derived_values(self) -> None:
+        values = {
+            "alarm": AlarmReason.LOW_VOLTAGE,
+            "aux_mode": AuxMode.STARTER_VOLTAGE,
+            "starter_voltage": -2.45,
+            "meter_type": MeterType.SOLAR_CHARGER,
+        }
+        for device_type in (BatteryMonitor, DcEnergyMeter):
+            device = device_type(self.KEY)
+            parsed = device.parse_decrypted(device.encode(values))
+            assert parsed["starter_voltage"] == -2.45
+
+        device = SmartLithium(self.KEY)
+        voltages = [3.3, float("inf"), None, 2.61, 3.0, 3.1, 3.2, float("-inf")]
+        parsed = device.parse_decrypted(device.encode({"cell_voltages": voltages}))
+        assert parsed["cell_voltages"] == voltages
@@ -0,0 +1,111 @@
+import math
+
+import pytest
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from tests.test_state import reading
+from victron_ble.devices import AuxMode, BatteryMonitorData
+from victron_ble.devices.solar_charger import SolarCharger
+from victron_ble.emission import EmissionPolicy
+from victron_ble.history import DeviceHistory, History, numeric_fields
+from victron_ble.scanner import Scanner
+
+
+class TestNumericFields:
+    def test_battery_monitor(self) -> None:
+        names = [name for name, _ in numeric_fields(BatteryMonitorData)]
+        assert "voltage" in names
+        # Enums are stored as their value
+        assert "aux_mode" in names
+        assert "model_name" not in names
+
+
+class TestDeviceHistory:
+    def test_append(self) -> None:
+        history = DeviceHistory(BatteryMonitorData, 4)
+        history.append(reading(voltage=12.5), 1.0)
+        history.append(reading(voltage=12.6, aux_mode=AuxMode.TEMPERATURE), 2.0)
+
+        window = history.last()
+        assert len(history) == 2
+        assert window["timestamp"].tolist() == [1.0, 2.0]
+        assert window["voltage"].tolist() == [12.5, 12.6]
+        assert window["aux_mode"].tolist() == [3.0, 2.0]
+        assert math.isnan(window["remaining_mins"][0])
+
+    def test_wraps_around(self) -> None:
+        history = DeviceHistory(BatteryMonitorData, 3)
+        for i in range(5):
+            history.append(reading(soc=float(i)), float(i))
+
+        assert len(history) == 3
+        assert history.last()["soc"].tolist() == [2.0, 3.0, 4.0]
+        assert history.last(2)["timestamp"].tolist() == [3.0, 4.0]
+        assert history.last(0)["soc"].tolist() == []
+        assert history.last(10)["soc"].tolist() == [2.0, 3.0, 4.0]
+
+    def test_views_are_not_copies(self) -> None:
+        history = DeviceHistory(BatteryMonitorData, 3)
+        history.append(reading(soc=1.0), 1.0)
+        column = history._columns["soc"]
+
+        view = history.last()["soc"]
+        assert view.obj is column
+        np = pytest.importorskip("numpy")
+        array = np.frombuffer(view)
+        assert array.tolist() == [1.0]
+
+    def test_since(self) -> None:
+        history = DeviceHistory(BatteryMonitorData, 4)
+        for i in range(6):
+            history.append(reading(soc=float(i)), float(i * 10))
+
+        assert history.since(35)["soc"].tolist() == [4.0, 5.0]
+        assert history.since(0)["soc"].tolist() == [2.0, 3.0, 4.0, 5.0]
+        assert history.since(100)["soc"].tolist() == []
+
+    def test_capacity(self) -> None:
+        with pytest.raises(ValueError):
+            DeviceHistory(BatteryMonitorData, 0)
+
+
+class TestHistory:
+    def test_per_address(self) -> None:
+        history = History(capacity=10, capacities={SolarCharger: 2}, clock=lambda: 5.0)
+        history.append("AA:BB:CC:DD:EE:FF", reading())
+        history.append("aa:bb:cc:dd:ee:ff", reading(), timestamp=6.0)
+
+        device = history.get("AA:BB:CC:DD:EE:FF")
+        assert device is not None
+        assert device.capacity == 10
+        assert device.last()["timestamp"].tolist() == [5.0, 6.0]
+        assert "aa:bb:cc:dd:ee:ff" in history
+        assert list(history) == ["aa:bb:cc:dd:ee:ff"]
+        assert history.capacities == {SolarCharger.data_type: 2}
+
+        history.remove("aa:bb:cc:dd:ee:ff")
+        assert len(history) == 0
+
+
+class TestScannerHistory:
+    def test_keeps_unchanged_readings(self, capsys) -> None:
+        history = History(capacity=10)
+        scanner = Scanner(
+            {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+            dedup_capacity=0,
+            emission=EmissionPolicy(interval=60),
+            history=history,
+        )
+        for _ in range(3):
+            advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+
+        device = history.get(BATTERY_MONITOR_ADDRESS)
+        assert device is not None
+        assert device.last()["voltage"].tolist() == [12.53] * 3
+        # Readings suppressed by the emission policy are kept as well
+        assert capsys.readouterr().out.count("payload") == 1
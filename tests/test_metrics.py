@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from victron_ble.metrics import Histogram, Metrics
+from victron_ble.scanner import Scanner
+
+
+class TestHistogram:
+    def test_observe(self) -> None:
+        histogram = Histogram((1.0, 2.0, 4.0))
+        for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1, 1]
+        assert histogram.count == 5
+        assert histogram.mean == 16.5 / 5
+        assert histogram.max == 10.0
+
+    def test_quantile(self) -> None:
+        histogram = Histogram((1.0, 2.0, 4.0))
+        assert histogram.quantile(0.5) == 0.0
+        for value in (0.5, 1.5, 1.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.quantile(0.25) == 1.0
+        assert histogram.quantile(0.5) == 2.0
+        # Bounded by the largest observed value
+        assert histogram.quantile(1.0) == 3.0
+
+
+class TestMetrics:
+    def test_snapshot(self) -> None:
+        metrics = Metrics()
+        metrics.inc("accepted")
+        metrics.inc("accepted", amount=2)
+        metrics.observe("parse", 1e-5, "SolarCharger")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"] == {"accepted": {"": 3}}
+        assert snapshot["stages"]["parse"]["SolarCharger"]["count"] == 1
+        assert "parse [SolarCharger]: 1 in" in metrics.summary()
+
+        metrics.reset()
+        assert metrics.snapshot() == {"counters": {}, "stages": {}}
+
+
+class TestScannerMetrics:
+    def test_stages(self, capsys) -> None:
+        scanner = Scanner(
+            {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY}, metrics=Metrics()
+        )
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+        advertise(scanner, "11:22:33:44:55:66", BATTERY_MONITOR_DATA[:-1] + b"\x00")
+        advertise(scanner, "11:22:33:44:55:66", BATTERY_MONITOR_DATA[:-1] + b"\x01")
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, b"\x00\x01")
+
+        metrics = scanner.metrics
+        assert metrics is not None
+        assert metrics.counter("accepted") == 2
+        assert metrics.counter("duplicates") == 1
+        assert metrics.counter("rejected") == 1
+        assert metrics.counter("ignored") == 1
+        assert metrics.counter("readings") == 1
+        assert metrics.histogram("filter").count == 5
+        for stage in ("detect", "decrypt", "parse", "serialize"):
+            assert metrics.histogram(stage, "BatteryMonitor").count == 1
+        assert metrics.histogram("output").count == 1
+        assert capsys.readouterr().out.count("payload") == 1
+
+    def test_disabled(self, capsys) -> None:
+        scanner = Scanner({BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY})
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+
+        assert scanner.metrics is None
+        assert capsys.readouterr().out.count("payload") == 1
+
+    def test_logs_summaries(self, caplog) -> None:
+        async def main() -> None:
+            scanner = Scanner(metrics_interval=0.01)
+            scanner.start_processing()
+            assert scanner.metrics is not None
+            scanner.metrics.inc("accepted")
+            await asyncio.sleep(0.05)
+            await scanner.stop_processing()
+
+        with caplog.at_level(logging.INFO, logger="victron_ble.metrics"):
+            asyncio.run(main())
+        assert "accepted: 1" in caplog.text
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from concurrent.futures.process import BrokenProcessPool
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from victron_ble.devices import BatteryMonitor
+from victron_ble.exceptions import AdvertisementKeyMissingError
+from victron_ble.parallel import ShardedParser, _resolve
+from victron_ble.scanner import Scanner
+
+ADDRESSES = [f"aa:bb:cc:dd:ee:{i:02x}" for i in range(8)]
+
+
+class TestShardedParser:
+    def test_parse_many(self) -> None:
+        expected = BatteryMonitor(BATTERY_MONITOR_KEY).parse(BATTERY_MONITOR_DATA)
+        parser = ShardedParser(
+            {address: BATTERY_MONITOR_KEY for address in ADDRESSES}, workers=2
+        )
+        try:
+            results = parser.parse_many(
+                [(address.upper(), BATTERY_MONITOR_DATA) for address in ADDRESSES]
+                + [("11:22:33:44:55:66", BATTERY_MONITOR_DATA)]
+            )
+        finally:
+            parser.close()
+
+        assert [r.to_dict() for r in results[:-1]] == [expected.to_dict()] * 8
+        assert isinstance(results[-1], AdvertisementKeyMissingError)
+
+    def test_submit_preserves_order(self) -> None:
+        # Readings with a distinct remaining_mins, each using a different IV
+        device = BatteryMonitor(BATTERY_MONITOR_KEY)
+        payload = BATTERY_MONITOR_DATA[8:]
+        plain = device.decrypt(BATTERY_MONITOR_DATA)[: len(payload)]
+        data = []
+        for iv in range(20):
+            plain = iv.to_bytes(2, "little") + plain[2:]
+            keystream = device.keystream(iv, len(payload))
+            encrypted = bytes(a ^ b for a, b in zip(plain, keystream))
+            data.append(
+                BATTERY_MONITOR_DATA[:5]
+                + iv.to_bytes(2, "little")
+                + BATTERY_MONITOR_DATA[7:8]
+                + encrypted
+            )
+        expected = [
+            BatteryMonitor(BATTERY_MONITOR_KEY).parse(d).to_dict() for d in data
+        ]
+
+        async def main():
+            parser = ShardedParser(
+                {address: BATTERY_MONITOR_KEY for address in ADDRESSES},
+                workers=2,
+                max_batch=3,
+            )
+            futures = {address: [] for address in ADDRESSES}
+            for d in data:
+                for address in ADDRESSES:
+                    futures[address].append(parser.submit(address, d))
+            try:
+                return {
+                    address: await asyncio.gather(*items)
+                    for address, items in futures.items()
+                }
+            finally:
+                await parser.aclose()
+
+        for results in asyncio.run(main()).values():
+            assert [r.to_dict() for r in results] == expected
+            assert [r.get_remaining_mins() for r in results] == list(range(20))
+
+    def test_drain(self) -> None:
+        async def main():
+            parser = ShardedParser({BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY})
+            futures = [
+                parser.submit(BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+                for _ in range(3)
+            ]
+            await parser.aclose()
+            return futures
+
+        futures = asyncio.run(main())
+        assert all(future.done() for future in futures)
+        assert futures[0].result().get_soc() == 50.0
+
+    def test_resolve_skips_cancelled_futures(self) -> None:
+        async def main():
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future(), loop.create_future()]
+            futures[0].cancel()
+            chunk = loop.create_future()
+            chunk.set_exception(BrokenProcessPool())
+            _resolve(futures, chunk)
+            return futures
+
+        cancelled, failed = asyncio.run(main())
+        assert cancelled.cancelled()
+        assert isinstance(failed.exception(), BrokenProcessPool)
+
+
+class TestScannerWorkers:
+    def test_parse_in_workers(self, capsys) -> None:
+        async def main() -> Scanner:
+            scanner = Scanner(
+                {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+                indent=None,
+                parse_workers=1,
+            )
+            advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+            advertise(scanner, "11:22:33:44:55:66", BATTERY_MONITOR_DATA)
+            for _ in range(100):
+                await asyncio.sleep(0.05)
+                if capsys.readouterr().out:
+                    break
+            else:
+                raise AssertionError("No output")
+            await scanner._parser.aclose()
+            return scanner
+
+        scanner = asyncio.run(main())
+        assert scanner.rejection_stats() == {}
+        assert len(scanner._rejected) == 1
+
+    def test_stop_outputs_submitted(self, capsys) -> None:
+        async def main(**options) -> None:
+            scanner = Scanner(
+                {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+                indent=None,
+                parse_workers=1,
+                dedup_capacity=0,
+                **options,
+            )
+            parser = scanner._parser
+            assert parser is not None
+            aclose = parser.aclose
+
+            async def checked_aclose() -> None:
+                # Every reading is output before the workers shut down
+                assert len(capsys.readouterr().out.splitlines()) == 100
+                await aclose()
+
+            parser.aclose = checked_aclose  # type: ignore[method-assign]
+            for _ in range(100):
+                advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+            await scanner.stop_processing()
+
+        asyncio.run(main())
+        # Including a partial batch flushed by stopping
+        asyncio.run(main(batch_size=30))
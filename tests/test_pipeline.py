@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import List
+
+from bleak.backends.device import BLEDevice
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from victron_ble.pipeline import OverflowPolicy, Pipeline, QueuedAdvertisement
+from victron_ble.scanner import Scanner
+
+
+def item(index: int) -> QueuedAdvertisement:
+    return QueuedAdvertisement(
+        BLEDevice("AA:BB:CC:DD:EE:FF", None, None), bytes([index]), None, 0.0
+    )
+
+
+def run_pipeline(policy: OverflowPolicy, count: int) -> List[int]:
+    handled: List[int] = []
+
+    async def main() -> Pipeline:
+        pipeline = Pipeline(lambda i: handled.append(i.data[0]), 2, policy)
+        for index in range(count):
+            pipeline.submit(item(index))
+        pipeline.start()
+        await pipeline.stop()
+        return pipeline
+
+    stats = asyncio.run(main()).stats()
+    assert stats["depth"] == 0
+    assert stats["high_water"] == 2
+    return handled
+
+
+class TestPipeline:
+    def test_drop_newest(self) -> None:
+        assert run_pipeline(OverflowPolicy.DROP_NEWEST, 4) == [0, 1]
+
+    def test_drop_oldest(self) -> None:
+        assert run_pipeline(OverflowPolicy.DROP_OLDEST, 4) == [2, 3]
+
+    def test_inline(self) -> None:
+        # Overflowing advertisements are handled by the caller right away
+        assert run_pipeline(OverflowPolicy.INLINE, 4) == [2, 3, 0, 1]
+
+    def test_async_handler_and_errors(self) -> None:
+        handled: List[int] = []
+
+        async def handler(i: QueuedAdvertisement) -> None:
+            if i.data[0] == 1:
+                raise ValueError("broken")
+            handled.append(i.data[0])
+
+        async def main() -> Pipeline:
+            pipeline = Pipeline(handler, 10)
+            pipeline.start()
+            for index in range(3):
+                await pipeline.put(item(index))
+            await pipeline.stop()
+            return pipeline
+
+        stats = asyncio.run(main()).stats()
+        assert handled == [0, 2]
+        assert stats["processed"] == 2
+        assert stats["errors"] == 1
+        assert stats["dropped"] == 0
+
+
+class TestScannerQueue:
+    def test_parses_in_consumer(self, capsys) -> None:
+        async def main() -> Scanner:
+            scanner = Scanner(
+                {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+                indent=None,
+                queue_size=8,
+            )
+            advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+            # Nothing is parsed inside the detection callback
+            assert capsys.readouterr().out == ""
+            scanner._pipeline.start()
+            await scanner._pipeline.stop()
+            return scanner
+
+        scanner = asyncio.run(main())
+        assert json.loads(capsys.readouterr().out)["payload"]["voltage"] == 12.53
+        assert scanner.pipeline_stats()["processed"] == 1
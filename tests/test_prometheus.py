@@ -0,0 +1,135 @@
+import asyncio
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from victron_ble.devices import BatteryMonitor, DeviceData
+from victron_ble.devices.smart_lithium import SmartLithium, SmartLithiumData
+from victron_ble.prometheus import ExporterScanner, PrometheusExporter, serve
+from victron_ble.state import StateStore
+
+LABELS = 'address="aa:bb:cc:dd:ee:ff",model="SmartShunt 500A/50mV"'
+
+
+def battery_monitor() -> DeviceData:
+    return BatteryMonitor(BATTERY_MONITOR_KEY).parse(BATTERY_MONITOR_DATA)
+
+
+def smart_lithium() -> SmartLithiumData:
+    parsed = SmartLithium(None).parse_decrypted(
+        b"\x00\x00\x00\x06\x00\x00\xc7\xe3\xf1\xf8\xff\xff\xff,5\xb5\xfa\xb4x\x01\x0f\xd2I\xd2\xae_iV\xe1\xf8\xa9e"
+    )
+    return SmartLithiumData(0xA0E0, parsed)
+
+
+class TestPrometheusExporter:
+    def test_render(self) -> None:
+        exporter = PrometheusExporter()
+        exporter.update(BATTERY_MONITOR_ADDRESS, battery_monitor(), -70, 1000.0)
+        text = exporter.render()
+
+        assert "# TYPE victron_voltage gauge\n" in text
+        assert f"victron_voltage{{{LABELS}}} 12.53\n" in text
+        # Enums are exported as their value
+        assert f"victron_aux_mode{{{LABELS}}} 3\n" in text
+        assert f"victron_rssi{{{LABELS}}} -70\n" in text
+        assert f"victron_last_change_timestamp_seconds{{{LABELS}}} 1000.0\n" in text
+        # None values and strings are left out
+        assert "victron_remaining_mins" not in text
+        assert "victron_model_name" not in text
+
+    def test_lists(self) -> None:
+        exporter = PrometheusExporter()
+        exporter.update("11:22:33:44:55:66", smart_lithium())
+        text = exporter.render()
+
+        assert 'victron_cell_voltages{address="11:22:33:44:55:66",' in text
+        assert ',index="3"} 3.31\n' in text
+        assert ',index="4"}' not in text
+
+    def test_renders_changed_devices_only(self) -> None:
+        exporter = PrometheusExporter()
+        exporter.update(BATTERY_MONITOR_ADDRESS, battery_monitor())
+        exporter.update("11:22:33:44:55:66", smart_lithium())
+        text = exporter.render()
+        assert exporter.renders == 2
+        assert exporter.render() is text
+
+        # Unchanged values do not render the device again
+        exporter.update("11:22:33:44:55:66", smart_lithium(), timestamp=5.0)
+        assert exporter.render() is text
+        assert exporter.renders == 2
+
+        parsed = smart_lithium()
+        changed = SmartLithiumData(0xA0E0, {**parsed._data, "battery_temperature": 20})
+        exporter.update("11:22:33:44:55:66", changed, timestamp=6.0)
+        text = exporter.render()
+        assert exporter.renders == 3
+        assert (
+            'victron_last_change_timestamp_seconds{address="11:22:33:44:55:66",'
+            'model="Smart Lithium Battery 12.8V/90Ah"} 6.0\n' in text
+        )
+        # Families are not repeated per device
+        assert text.count("# TYPE victron_last_change_timestamp_seconds") == 1
+
+    def test_remove(self) -> None:
+        exporter = PrometheusExporter()
+        exporter.update(BATTERY_MONITOR_ADDRESS, battery_monitor())
+        exporter.update("11:22:33:44:55:66", smart_lithium())
+        exporter.render()
+        exporter.remove("11:22:33:44:55:66")
+
+        text = exporter.render()
+        assert len(exporter) == 1
+        assert "11:22:33:44:55:66" not in text
+        assert "victron_cell_voltages" not in text
+        assert "victron_voltage{" in text
+
+    def test_shares_store(self) -> None:
+        store = StateStore()
+        exporter = PrometheusExporter(store=store)
+        store.update(BATTERY_MONITOR_ADDRESS, battery_monitor())
+
+        assert f"victron_voltage{{{LABELS}}} 12.53\n" in exporter.render()
+
+
+class TestExporterScanner:
+    def test_keeps_latest_reading(self, capsys) -> None:
+        scanner = ExporterScanner({BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY})
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+
+        assert capsys.readouterr().out == ""
+        assert f"victron_soc{{{LABELS}}} 50.0\n" in scanner.exporter.render()
+
+
+class TestServe:
+    def test_serves_metrics(self) -> None:
+        exporter = PrometheusExporter()
+        exporter.update(BATTERY_MONITOR_ADDRESS, battery_monitor())
+
+        async def get(port: int, path: str) -> bytes:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            response = await reader.read()
+            writer.close()
+            return response
+
+        async def main() -> None:
+            server = await serve(exporter, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                response = await get(port, "/metrics")
+                assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+                assert b"Content-Type: text/plain; version=0.0.4" in response
+                assert response.endswith(exporter.render().encode())
+
+                response = await get(port, "/")
+                assert response.startswith(b"HTTP/1.1 404 Not Found\r\n")
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        asyncio.run(main())
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+)
+from victron_ble.cli import cli
+from victron_ble.recording import (
+    RecordedAdvertisement,
+    RecordingWriter,
+    read_recording,
+    replay,
+)
+from victron_ble.scanner import Scanner
+
+RECORDS = [
+    RecordedAdvertisement(
+        1000.0 + i * 0.01, BATTERY_MONITOR_ADDRESS, "SmartShunt", -60 - i, data
+    )
+    for i, data in enumerate(
+        [BATTERY_MONITOR_DATA, BATTERY_MONITOR_DATA, BATTERY_MONITOR_DATA[:-1] + b"\0"]
+    )
+]
+
+
+@pytest.fixture
+def recording(tmp_path) -> str:
+    path = str(tmp_path / "recording.bin")
+    with RecordingWriter(path) as writer:
+        for record in RECORDS[:2]:
+            writer.write(record)
+    # Appending to an existing recording keeps a single header
+    with RecordingWriter(path) as writer:
+        writer.write(RECORDS[2])
+    return path
+
+
+class TestRecording:
+    def test_round_trip(self, recording) -> None:
+        assert list(read_recording(recording)) == RECORDS
+
+    def test_truncated(self, recording) -> None:
+        with open(recording, "rb+") as f:
+            f.truncate(f.seek(0, 2) - 1)
+        assert list(read_recording(recording)) == RECORDS[:2]
+
+    def test_not_a_recording(self, tmp_path) -> None:
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"something else")
+        with pytest.raises(ValueError):
+            list(read_recording(str(path)))
+
+    @pytest.mark.parametrize("speed", [None, 10.0])
+    def test_replay(self, recording, speed, capsys) -> None:
+        async def main() -> int:
+            scanner = Scanner(
+                {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+                indent=None,
+                queue_size=8,
+            )
+            return await replay(scanner, recording, speed)
+
+        assert asyncio.run(main()) == 3
+        # The repeated advertisement is dropped by the scanner's deduplication
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["rssi"] for line in lines] == [-60, -62]
+
+    def test_replay_command(self, recording) -> None:
+        result = CliRunner().invoke(
+            cli,
+            [
+                "replay",
+                recording,
+                f"{BATTERY_MONITOR_ADDRESS}@{BATTERY_MONITOR_KEY}",
+                "--speed",
+                "0",
+                "--batch-size",
+                "2",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output.splitlines()[0])["payload"]["voltage"] == 12.53
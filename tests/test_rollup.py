@@ -0,0 +1,188 @@
+import asyncio
+import io
+import json
+from typing import List
+
+import pytest
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from tests.test_state import reading
+from victron_ble.devices import AuxMode
+from victron_ble.rollup import (
+    Aggregator,
+    EnumSummary,
+    NumericSummary,
+    Rollup,
+    json_lines_sink,
+)
+from victron_ble.scanner import Scanner
+
+
+class TestAggregator:
+    def test_numeric_summary(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(10,))
+        for timestamp, voltage in ((20.0, 12.5), (22.0, 12.9), (29.5, 12.4)):
+            aggregator.add(BATTERY_MONITOR_ADDRESS, reading(voltage=voltage), timestamp)
+        assert rollups == []
+
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(voltage=12.0), 30.0)
+        [rollup] = rollups
+        assert rollup.address == BATTERY_MONITOR_ADDRESS.lower()
+        assert (rollup.start, rollup.end, rollup.readings) == (20.0, 30.0, 3)
+        voltage = rollup.fields["voltage"]
+        assert isinstance(voltage, NumericSummary)
+        assert voltage.to_dict() == {
+            "count": 3,
+            "min": 12.4,
+            "max": 12.9,
+            "mean": pytest.approx(12.6),
+            "last": 12.4,
+        }
+        # Unavailable values are not summarized
+        assert "remaining_mins" not in rollup.fields
+
+    def test_enum_transitions(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(10,))
+        modes = [AuxMode.DISABLED, AuxMode.TEMPERATURE, AuxMode.TEMPERATURE]
+        modes += [AuxMode.DISABLED, AuxMode.TEMPERATURE]
+        for timestamp, mode in enumerate(modes):
+            aggregator.add(BATTERY_MONITOR_ADDRESS, reading(aux_mode=mode), timestamp)
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(aux_mode=AuxMode.DISABLED), 10)
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(aux_mode=AuxMode.DISABLED), 20)
+        aggregator.flush()
+
+        summaries = [rollup.fields["aux_mode"] for rollup in rollups]
+        assert all(isinstance(summary, EnumSummary) for summary in summaries)
+        # Including the transition from the last value of the previous window
+        assert [s.to_dict() for s in summaries] == [
+            {"count": 5, "last": AuxMode.TEMPERATURE, "transitions": 3},
+            {"count": 1, "last": AuxMode.DISABLED, "transitions": 1},
+            {"count": 1, "last": AuxMode.DISABLED, "transitions": 0},
+        ]
+
+    def test_intervals(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(10, 60))
+        for timestamp in range(0, 125, 5):
+            aggregator.add(BATTERY_MONITOR_ADDRESS, reading(), float(timestamp))
+
+        assert [
+            (r.interval, r.start, r.readings) for r in rollups if r.interval == 60
+        ] == [
+            (60, 0.0, 12),
+            (60, 60.0, 12),
+        ]
+        assert len([r for r in rollups if r.interval == 10]) == 12
+
+    def test_merges_shorter_intervals(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(60, 10))
+        samples = [
+            (1.0, 12.5, AuxMode.DISABLED),
+            (15.0, 12.9, AuxMode.TEMPERATURE),
+            (16.0, 12.1, AuxMode.DISABLED),
+            (45.0, 12.3, AuxMode.DISABLED),
+        ]
+        for timestamp, voltage, mode in samples:
+            aggregator.add(
+                BATTERY_MONITOR_ADDRESS,
+                reading(voltage=voltage, aux_mode=mode),
+                timestamp,
+            )
+        first = rollups[0].fields["voltage"].to_dict()
+        aggregator.flush()
+
+        [minute] = [rollup for rollup in rollups if rollup.interval == 60]
+        assert (minute.start, minute.readings) == (0.0, 4)
+        assert minute.fields["voltage"].to_dict() == {
+            "count": 4,
+            "min": 12.1,
+            "max": 12.9,
+            "mean": pytest.approx(12.45),
+            "last": 12.3,
+        }
+        assert minute.fields["aux_mode"].to_dict() == {
+            "count": 4,
+            "last": AuxMode.DISABLED,
+            "transitions": 2,
+        }
+        # Merging does not change rollups already emitted
+        assert rollups[0].fields["voltage"].to_dict() == first
+
+    def test_intervals_must_be_multiples(self) -> None:
+        with pytest.raises(ValueError):
+            Aggregator(print, intervals=(10, 25))
+
+    def test_flushes_silent_devices(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(10,))
+        aggregator.add("11:22:33:44:55:66", reading(), 1.0)
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(), 5.0)
+        assert rollups == []
+
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(), 12.0)
+        assert sorted(r.address for r in rollups) == [
+            "11:22:33:44:55:66",
+            BATTERY_MONITOR_ADDRESS.lower(),
+        ]
+
+    def test_flush_until(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(10, 60))
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(), 1.0)
+        rollups.clear()
+
+        aggregator.flush(10.0)
+        assert [r.interval for r in rollups] == [10]
+        aggregator.flush()
+        assert [r.interval for r in rollups] == [10, 60]
+        aggregator.flush()
+        assert len(rollups) == 2
+
+    def test_remove(self) -> None:
+        rollups: List[Rollup] = []
+        aggregator = Aggregator(rollups.append, intervals=(10,))
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(), 1.0)
+        aggregator.remove(BATTERY_MONITOR_ADDRESS)
+        aggregator.flush()
+        assert rollups == []
+
+    def test_intervals_must_be_positive(self) -> None:
+        with pytest.raises(ValueError):
+            Aggregator(print, intervals=())
+        with pytest.raises(ValueError):
+            Aggregator(print, intervals=(10, 0))
+
+    def test_json_lines_sink(self) -> None:
+        stream = io.StringIO()
+        aggregator = Aggregator(json_lines_sink(stream), intervals=(10,))
+        aggregator.add(BATTERY_MONITOR_ADDRESS, reading(voltage=12.5), 1.0)
+        aggregator.flush()
+
+        line = json.loads(stream.getvalue())
+        assert line["interval"] == 10
+        assert line["fields"]["voltage"]["mean"] == 12.5
+        assert line["fields"]["aux_mode"]["last"] == "disabled"
+
+
+class TestScannerRollups:
+    def test_summarizes_readings(self, capsys) -> None:
+        rollups: List[Rollup] = []
+        scanner = Scanner(
+            {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+            dedup_capacity=0,
+            rollups=Aggregator(rollups.append),
+        )
+        for _ in range(3):
+            advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+        asyncio.run(scanner.stop_processing())
+
+        assert [r.readings for r in rollups] == [3, 3, 3]
+        assert [r.interval for r in rollups] == [10.0, 60.0, 900.0]
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import sys
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from victron_ble.pipeline import QueuedAdvertisement
+from victron_ble.scanner import Scanner
+
+BATTERY_MONITOR_ADDRESS = "AA:BB:CC:DD:EE:FF"
+BATTERY_MONITOR_KEY = "aff4d0995b7d1e176c0c33ecb9e70dcd"
+BATTERY_MONITOR_DATA = bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9")
+
+
+def advertise(scanner: Scanner, address: str, data: bytes, rssi: int = -70) -> None:
+    device = BLEDevice(address, "SmartShunt", None)
+    advertisement = AdvertisementData(
+        local_name="SmartShunt",
+        manufacturer_data={0x02E1: data},
+        service_data={},
+        service_uuids=[],
+        tx_power=None,
+        rssi=rssi,
+        platform_data=(),
+    )
+    scanner._detection_callback(device, advertisement)
+
+
+class TestScanner:
+    def test_parse(self, capsys) -> None:
+        scanner = Scanner({BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY}, indent=None)
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+
+        output = json.loads(capsys.readouterr().out)
+        assert output["address"] == BATTERY_MONITOR_ADDRESS
+        assert output["rssi"] == -70
+        assert output["payload"]["voltage"] == 12.53
+        assert output["payload"]["aux_mode"] == "disabled"
+
+    def test_rejects_unknown_devices(self, capsys) -> None:
+        scanner = Scanner(
+            {
+                BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY,
+                "aa:bb:cc:dd:ee:f0": BATTERY_MONITOR_KEY,
+            }
+        )
+        unsupported = bytes.fromhex("100289a306b040af925d09a4d89aa0")
+        for iv in range(3):
+            advertise(
+                scanner, "11:22:33:44:55:66", BATTERY_MONITOR_DATA[:-1] + bytes([iv])
+            )
+            advertise(
+                scanner,
+                "AA:BB:CC:DD:EE:F0",
+                unsupported[:-1] + bytes([iv]),
+            )
+
+        assert capsys.readouterr().out == ""
+        assert scanner.rejection_stats() == {"missing_key": 2, "unknown_device": 2}
+
+    def test_deduplicates(self, capsys) -> None:
+        scanner = Scanner(
+            {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY}, dedup_capacity=10
+        )
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA)
+
+        assert capsys.readouterr().out.count("payload") == 1
+        assert scanner.dedup_stats() == {"unique": 1, "duplicates": 1}
+
+
+class TestBatching:
+    def test_batches_by_size_and_window(self, capsys, monkeypatch) -> None:
+        writes = []
+        monkeypatch.setattr(Scanner, "write", lambda self, lines: writes.append(lines))
+
+        async def main() -> None:
+            scanner = Scanner(
+                {BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY},
+                indent=None,
+                batch_size=2,
+                batch_window=0.01,
+            )
+            for rssi in range(3):
+                # Vary the data so the advertisements are not duplicates
+                data = BATTERY_MONITOR_DATA[:-1] + bytes([rssi])
+                advertise(scanner, BATTERY_MONITOR_ADDRESS, data, rssi=-rssi)
+            assert [len(lines) for lines in writes] == [2]
+            await asyncio.sleep(0.05)
+
+        asyncio.run(main())
+        assert [len(lines) for lines in writes] == [2, 1]
+        assert [json.loads(line)["rssi"] for lines in writes for line in lines] == [
+            0,
+            -1,
+            -2,
+        ]
+
+    def test_single_write_per_batch(self, monkeypatch) -> None:
+        writes = []
+        monkeypatch.setattr(
+            sys,
+            "stdout",
+            type("Stdout", (), {"write": writes.append, "flush": lambda: None}),
+        )
+        scanner = Scanner({BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY}, indent=None)
+        items = [
+            QueuedAdvertisement(
+                BLEDevice(BATTERY_MONITOR_ADDRESS, "SmartShunt", None),
+                BATTERY_MONITOR_DATA,
+                AdvertisementData("SmartShunt", {}, {}, [], None, -70, ()),
+                0.0,
+            )
+        ] * 3
+        scanner.callback_batch(items)
+        assert len(writes) == 1
+        assert writes[0].count("\n") == 3
+
+    def test_failures_do_not_drop_the_batch(self, capsys) -> None:
+        address = "11:22:33:44:55:66"
+        scanner = Scanner(
+            {
+                BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY,
+                address: "ffffffffffffffffffffffffffffffff",
+            },
+            indent=None,
+            dedup_capacity=0,
+        )
+        advertisement = AdvertisementData("SmartShunt", {}, {}, [], None, -70, ())
+        items = [
+            QueuedAdvertisement(
+                BLEDevice(BATTERY_MONITOR_ADDRESS, "SmartShunt", None),
+                BATTERY_MONITOR_DATA,
+                advertisement,
+                0.0,
+            )
+        ] * 4
+        # An advertisement decrypted with the wrong key
+        items.insert(
+            2,
+            QueuedAdvertisement(
+                BLEDevice(address, "SmartShunt", None),
+                BATTERY_MONITOR_DATA,
+                advertisement,
+                0.0,
+            ),
+        )
+        scanner.callback_batch(items)
+        assert capsys.readouterr().out.count("\n") == 4
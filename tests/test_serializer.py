@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from victron_ble import serializer
+from victron_ble.devices.base import AlarmReason, OperationMode
+from victron_ble.devices.battery_monitor import BatteryMonitor, BatteryMonitorData
+from victron_ble.devices.smart_lithium import SmartLithium, SmartLithiumData
+from victron_ble.scanner import DeviceDataEncoder
+from victron_ble.serializer import dumps, serializer_for, to_dict
+
+
+def parse() -> BatteryMonitorData:
+    data = bytes.fromhex("100289a302b040af925d09a4d89aa0128bdef48c6298a9")
+    return BatteryMonitor("aff4d0995b7d1e176c0c33ecb9e70dcd").parse(data)
+
+
+def test_to_dict() -> None:
+    assert to_dict(parse()) == {
+        "alarm": "no_alarm",
+        "aux_mode": "disabled",
+        "consumed_ah": -50.0,
+        "current": 0.0,
+        "model_name": "SmartShunt 500A/50mV",
+        "soc": 50.0,
+        "voltage": 12.53,
+    }
+
+
+def test_serializer_is_cached() -> None:
+    serializer = serializer_for(BatteryMonitorData)
+    assert serializer_for(BatteryMonitorData) is serializer
+    assert [name for name, _, _ in serializer.fields][:3] == [
+        "alarm",
+        "aux_mode",
+        "consumed_ah",
+    ]
+
+
+def test_dumps() -> None:
+    blob = {"address": "aa:bb", "payload": parse()}
+    expected = {"address": "aa:bb", "payload": to_dict(parse())}
+
+    assert json.loads(dumps(blob)) == expected
+    assert json.loads(dumps(blob, indent=2)) == expected
+    assert dumps(blob, indent=4) == json.dumps(expected, indent=4)
+    assert json.loads(json.dumps(blob, cls=DeviceDataEncoder)) == expected
+
+
+def smart_lithium(cell_voltages: list) -> SmartLithiumData:
+    parsed = SmartLithium(None).parse_decrypted(
+        b"\x00\x00\x00\x06\x00\x00\xc7\xe3\xf1\xf8\xff\xff\xff,5\xb5\xfa\xb4x\x01\x0f\xd2I\xd2\xae_iV\xe1\xf8\xa9e"
+    )
+    parsed["cell_voltages"] = cell_voltages
+    return SmartLithiumData(0xA0E0, parsed)
+
+
+def test_dumps_non_finite() -> None:
+    data = smart_lithium([float("-inf"), float("inf"), None, 3.31])
+    for indent in (None, 2):
+        text = dumps({"payload": data}, indent=indent)
+        assert json.loads(text)["payload"]["cell_voltages"] == [
+            float("-inf"),
+            float("inf"),
+            None,
+            3.31,
+        ]
+    assert '"cell_voltages":[-Infinity,Infinity,null,3.31]' in dumps(data)
+
+
+def test_dumps_enum() -> None:
+    assert dumps({"x": OperationMode.BULK}) == '{"x":"bulk"}'
+    assert dumps([AlarmReason.LOW_VOLTAGE, None]) == '["low_voltage",null]'
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_dumps_without_orjson(monkeypatch, indent) -> None:
+    blob = {
+        "name": "Smart Shunt é",
+        "payload": parse(),
+        "rssi": -70,
+        "state": OperationMode.FLOAT,
+        "cells": (3.31, None),
+    }
+    with_orjson = dumps(blob, indent=indent)
+    monkeypatch.setattr(serializer, "HAS_ORJSON", False)
+    assert dumps(blob, indent=indent) == with_orjson
@@ -0,0 +1,87 @@
+import asyncio
+import json
+from collections import Counter
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+)
+from victron_ble.devices import BatterySense, SolarCharger, default_registry
+from victron_ble.recording_format import MAGIC, RecordedAdvertisement, encode_record
+from victron_ble.scanner import Scanner
+from victron_ble.sources import SyntheticDevice, SyntheticSource, UnixSocketSource
+
+
+class TestSyntheticSource:
+    def test_all_device_types(self, capsys) -> None:
+        source = SyntheticSource.for_all_devices(per_type=2, count=200)
+
+        async def main() -> Scanner:
+            scanner = Scanner(source.device_keys, indent=None, source=source)
+            await scanner.start()
+            assert await source.wait() == 200
+            await scanner.stop()
+            return scanner
+
+        scanner = asyncio.run(main())
+        assert scanner.rejection_stats() == {}
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 200
+        # Every device is detected as the type it was generated for
+        types = {device.address: device.device_type for device in source.devices}
+        counts = Counter(json.loads(line)["address"] for line in lines)
+        assert set(counts) == set(types)
+        assert len(set(types.values())) == len(
+            [klass for klass in default_registry.device_types() if klass.layout]
+        )
+
+    def test_detection_and_distributions(self) -> None:
+        device = SyntheticDevice(
+            BatterySense,
+            "AA:BB:CC:DD:EE:FF",
+            distributions={"voltage": lambda rng: 1234},
+            seed=1,
+        )
+        data = device.advertisement()
+        assert default_registry.detect(data).device_type is BatterySense
+        assert BatterySense(device.key).parse(data).get_voltage() == 12.34
+
+        # Seeded devices are reproducible
+        assert [SyntheticDevice(SolarCharger, "a", seed=2).advertisement()] == [
+            SyntheticDevice(SolarCharger, "a", seed=2).advertisement()
+        ]
+
+
+class TestUnixSocketSource:
+    def test_receives_records(self, tmp_path) -> None:
+        path = str(tmp_path / "feed.sock")
+        received = []
+
+        async def main() -> None:
+            source = UnixSocketSource(path)
+            await source.start(lambda device, ad: received.append((device, ad)))
+            _, writer = await asyncio.open_unix_connection(path)
+            writer.write(
+                MAGIC
+                + encode_record(
+                    RecordedAdvertisement(
+                        0.0, BATTERY_MONITOR_ADDRESS, None, -70, BATTERY_MONITOR_DATA
+                    )
+                )
+                * 2
+            )
+            await writer.drain()
+            writer.close()
+            for _ in range(100):
+                if len(received) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            await source.stop()
+
+        asyncio.run(main())
+        assert len(received) == 2
+        device, advertisement = received[0]
+        assert device.address == BATTERY_MONITOR_ADDRESS
+        assert device.name is None
+        assert advertisement.rssi == -70
+        assert advertisement.manufacturer_data == {0x02E1: BATTERY_MONITOR_DATA}
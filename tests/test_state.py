@@ -0,0 +1,128 @@
+from typing import List, Tuple
+
+from tests.test_scanner import (
+    BATTERY_MONITOR_ADDRESS,
+    BATTERY_MONITOR_DATA,
+    BATTERY_MONITOR_KEY,
+    advertise,
+)
+from victron_ble.devices import AuxMode, BatteryMonitor, BatteryMonitorData
+from victron_ble.scanner import Scanner
+from victron_ble.state import Changes, DeviceState, StateStore
+
+
+def reading(**values) -> BatteryMonitorData:
+    parsed = BatteryMonitor(BATTERY_MONITOR_KEY).parse(BATTERY_MONITOR_DATA)
+    return BatteryMonitorData(parsed._model_id, {**parsed._data, **values})
+
+
+class TestStateStore:
+    def test_latest_reading(self) -> None:
+        store = StateStore(clock=lambda: 100.0)
+        store.update(BATTERY_MONITOR_ADDRESS, reading(), rssi=-70)
+        latest = reading(voltage=12.6)
+        store.update(BATTERY_MONITOR_ADDRESS, latest, rssi=-60, timestamp=200.0)
+
+        state = store.get("aa:bb:cc:dd:ee:ff")
+        assert state is not None
+        assert state.data is latest
+        assert state.timestamp == 200.0
+        assert state.rssi == -60
+        assert state.values["voltage"] == 12.6
+        assert BATTERY_MONITOR_ADDRESS in store
+        assert list(store) == ["aa:bb:cc:dd:ee:ff"]
+        assert store.get("11:22:33:44:55:66") is None
+
+    def test_changes(self) -> None:
+        store = StateStore()
+        changes = store.update(BATTERY_MONITOR_ADDRESS, reading())
+        assert changes["voltage"] == (None, 12.53)
+        # None values are not reported on the first reading
+        assert "remaining_mins" not in changes
+
+        assert store.update(BATTERY_MONITOR_ADDRESS, reading()) == {}
+        assert store.update(
+            BATTERY_MONITOR_ADDRESS,
+            reading(voltage=12.6, aux_mode=AuxMode.STARTER_VOLTAGE),
+        ) == {
+            "voltage": (12.53, 12.6),
+            "aux_mode": (AuxMode.DISABLED, AuxMode.STARTER_VOLTAGE),
+        }
+
+    def test_deadband(self) -> None:
+        store = StateStore(deadbands={"voltage": 0.1})
+        store.update(BATTERY_MONITOR_ADDRESS, reading(voltage=12.5))
+
+        assert store.update(BATTERY_MONITOR_ADDRESS, reading(voltage=12.55)) == {}
+        assert store.update(BATTERY_MONITOR_ADDRESS, reading(voltage=12.59)) == {}
+        # Drift is measured from the value last reported
+        assert store.update(BATTERY_MONITOR_ADDRESS, reading(voltage=12.61)) == {
+            "voltage": (12.5, 12.61)
+        }
+        assert store.get(BATTERY_MONITOR_ADDRESS).values["voltage"] == 12.61
+        # Other fields have no deadband
+        assert store.update(BATTERY_MONITOR_ADDRESS, reading(voltage=12.61, soc=49.9))
+
+    def test_subscribe(self) -> None:
+        store = StateStore()
+        calls: List[Tuple[str, Changes]] = []
+        voltages: List[Changes] = []
+
+        def changed(address: str, state: DeviceState, changes: Changes) -> None:
+            calls.append((address, changes))
+
+        unsubscribe = store.subscribe(changed)
+        store.subscribe(
+            lambda address, state, changes: voltages.append(changes),
+            address=BATTERY_MONITOR_ADDRESS,
+            fields=["voltage"],
+        )
+        store.update(BATTERY_MONITOR_ADDRESS, reading())
+        store.update(BATTERY_MONITOR_ADDRESS, reading())
+        store.update(BATTERY_MONITOR_ADDRESS, reading(soc=49.9))
+        store.update("11:22:33:44:55:66", reading(voltage=13.0))
+
+        assert len(calls) == 3
+        assert calls[1] == ("aa:bb:cc:dd:ee:ff", {"soc": (50.0, 49.9)})
+        assert voltages == [{"voltage": (None, 12.53)}]
+
+        unsubscribe()
+        store.update(BATTERY_MONITOR_ADDRESS, reading(soc=49.8))
+        assert len(calls) == 3
+
+    def test_failing_subscriber(self) -> None:
+        store = StateStore()
+        calls = []
+
+        def fail(address: str, state: DeviceState, changes: Changes) -> None:
+            raise ValueError()
+
+        store.subscribe(fail)
+        store.subscribe(lambda address, state, changes: calls.append(address))
+        store.update(BATTERY_MONITOR_ADDRESS, reading())
+
+        assert calls == ["aa:bb:cc:dd:ee:ff"]
+
+    def test_remove(self) -> None:
+        store = StateStore()
+        store.update(BATTERY_MONITOR_ADDRESS, reading())
+        store.remove(BATTERY_MONITOR_ADDRESS)
+
+        assert len(store) == 0
+        assert store.update(BATTERY_MONITOR_ADDRESS, reading())["voltage"] == (
+            None,
+            12.53,
+        )
+
+
+class TestScannerState:
+    def test_updates_store(self, capsys) -> None:
+        store = StateStore()
+        scanner = Scanner({BATTERY_MONITOR_ADDRESS: BATTERY_MONITOR_KEY}, state=store)
+        advertise(scanner, BATTERY_MONITOR_ADDRESS, BATTERY_MONITOR_DATA, rssi=-50)
+
+        state = store.get(BATTERY_MONITOR_ADDRESS)
+        assert state is not None
+        assert state.rssi == -50
+        assert state.values["soc"] == 50.0
+        assert capsys.readouterr().out.count("payload") == 1
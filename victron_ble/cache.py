@@ -0,0 +1,102 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class NegativeCache:
+    """
+    A bounded set of keys that are forgotten after a fixed time to live.
+
+    Used to remember advertisers that cannot be parsed (no key, unknown device
+    type) so their advertisements can be dropped without further work. Each key
+    is stored with a reason, and rejections are counted per reason.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = capacity
+        self._ttl = ttl
+        self._clock = clock
+        # Entries share the same TTL, so insertion order is also expiry order
+        self._entries: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self.rejections: Dict[str, int] = Counter()
+
+    def add(self, key: Hashable, reason: str) -> None:
+        if self._capacity <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock() + self._ttl, reason)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        expires_at, reason = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return False
+        self.rejections[reason] += 1
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Deduplicator:
+    """
+    Detects repeated keys seen within a time window.
+
+    Keys are remembered for `window` seconds after they were first seen, or
+    until `capacity` newer keys push them out. Both evictions happen from the
+    front of an insertion-ordered dict, so every check is O(1) amortized.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        window: Optional[float] = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = capacity
+        self._window = window
+        self._clock = clock
+        self._first_seen: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.duplicates = 0
+        self.unique = 0
+
+    def is_duplicate(self, key: Hashable) -> bool:
+        if self._capacity <= 0:
+            self.unique += 1
+            return False
+
+        now = self._clock()
+        first_seen = self._first_seen
+        if self._window is not None:
+            expired_before = now - self._window
+            while first_seen:
+                oldest = next(iter(first_seen.values()))
+                if oldest > expired_before:
+                    break
+                first_seen.popitem(last=False)
+
+        if key in first_seen:
+            self.duplicates += 1
+            return True
+
+        first_seen[key] = now
+        if len(first_seen) > self._capacity:
+            first_seen.popitem(last=False)
+        self.unique += 1
+        return False
+
+    def __len__(self) -> int:
+        return len(self._first_seen)
@@ -1,10 +1,17 @@
 import asyncio
 import logging
-from typing import List, Tuple
+from dataclasses import replace
+from typing import List, Optional, Sequence, Tuple
 
 import click
 
+from victron_ble.emission import EmissionFilter, EmissionPolicy
+from victron_ble.pipeline import OverflowPolicy
+from victron_ble.prometheus import ExporterScanner, serve
+from victron_ble.recording import Recorder
+from victron_ble.recording import replay as replay_recording
 from victron_ble.scanner import DebugScanner, DiscoveryScanner, Scanner
+from victron_ble.sources import UnixSocketSource
 
 logger = logging.getLogger("victron_ble")
 logging.basicConfig()
@@ -24,6 +31,28 @@ class DeviceKeyParam(click.ParamType):
         self.fail(f"{value} is not a valid <addr>@<key> pair", param, ctx)
 
 
+class FloatAssignmentParam(click.ParamType):
+    """
+    A <name>=<number> pair, or just a number if the name is optional
+    """
+
+    name = "float_assignment"
+
+    def __init__(self, name_required: bool = True) -> None:
+        self.name_required = name_required
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        name, _, number = str(value).rpartition("=")
+        if name or not self.name_required:
+            try:
+                return (name.strip() or None, float(number))
+            except ValueError:
+                pass
+        self.fail(f"{value} is not a valid <name>=<number> pair", param, ctx)
+
+
 @click.group()
 @click.option("-v", "--verbose", is_flag=True, help="Increase logging output")
 def cli(verbose):
@@ -55,18 +84,205 @@ def dump(id: str):
     loop.run_forever()
 
 
+def scanner_options(func):
+    """
+    Options for how a Scanner processes advertisements
+    """
+    options = [
+        click.option(
+            "--queue-size",
+            default=1024,
+            show_default=True,
+            help="Advertisements buffered for parsing, 0 to parse in the BLE callback",
+        ),
+        click.option(
+            "--overflow",
+            "overflow_policy",
+            type=click.Choice([policy.value for policy in OverflowPolicy]),
+            default=OverflowPolicy.DROP_OLDEST.value,
+            show_default=True,
+            help="What to do with advertisements that arrive while the queue is full",
+        ),
+        click.option(
+            "--parse-workers",
+            default=0,
+            show_default=True,
+            help="Worker processes to parse in, sharded by device address",
+        ),
+        click.option(
+            "--batch-size",
+            default=0,
+            show_default=True,
+            help="Output readings in batches of up to this many advertisements",
+        ),
+        click.option(
+            "--batch-window",
+            default=0.05,
+            show_default=True,
+            help="Seconds to collect advertisements for before writing a batch",
+        ),
+        click.option(
+            "--metrics-interval",
+            default=0.0,
+            show_default=True,
+            help="Log processing counters and stage timings every this many seconds, 0 to disable",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def emission_options(func):
+    """
+    Options for which readings a Scanner outputs
+    """
+    options = [
+        click.option(
+            "--emit-interval",
+            "emit_intervals",
+            multiple=True,
+            type=FloatAssignmentParam(name_required=False),
+            metavar="[DEVICE=]SECONDS",
+            help="Output readings of a device without significant changes at most every "
+            "this many seconds, for all devices or as <address or device type>=<seconds>",
+        ),
+        click.option(
+            "--deadband",
+            "deadbands",
+            multiple=True,
+            type=FloatAssignmentParam(),
+            metavar="FIELD=CHANGE",
+            help="Output a reading immediately when a field changed by more than this, "
+            "as <field>=<change>",
+        ),
+        click.option(
+            "--emit-on-enum-change/--no-emit-on-enum-change",
+            default=True,
+            show_default=True,
+            help="Output a reading immediately when a state, error or alarm changes",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def emission_filter(
+    emit_intervals: Sequence[Tuple[Optional[str], float]],
+    deadbands: Sequence[Tuple[str, float]],
+    emit_on_enum_change: bool,
+) -> Optional[EmissionFilter]:
+    if not emit_intervals and not deadbands:
+        return None
+    intervals = dict(emit_intervals)
+    # With only deadbands, readings are output when they change significantly
+    default_interval = intervals.pop(None, None if deadbands else 0.0)
+    policy = EmissionPolicy(default_interval, dict(deadbands), emit_on_enum_change)
+    return EmissionFilter(
+        policy,
+        {
+            device: replace(policy, interval=interval)
+            for device, interval in intervals.items()
+            if device is not None
+        },
+    )
+
+
 @cli.command(help="Read data from specified devices")
 @click.argument("device_keys", nargs=-1, type=DeviceKeyParam())
-def read(device_keys: List[Tuple[str, str]]):
+@click.option(
+    "--unix-socket",
+    type=click.Path(dir_okay=False),
+    help="Read advertisements in the recording format from a UNIX socket",
+)
+@scanner_options
+@emission_options
+def read(
+    device_keys: List[Tuple[str, str]],
+    unix_socket: Optional[str],
+    emit_intervals: List[Tuple[Optional[str], float]],
+    deadbands: List[Tuple[str, float]],
+    emit_on_enum_change: bool,
+    **options,
+):
     loop = asyncio.get_event_loop()
+    emission = emission_filter(emit_intervals, deadbands, emit_on_enum_change)
 
     async def scan(keys):
-        scanner = Scanner(keys, indent=None)
+        source = UnixSocketSource(unix_socket) if unix_socket else None
+        scanner = Scanner(
+            keys, indent=None, source=source, emission=emission, **options
+        )
         await scanner.start()
 
     asyncio.ensure_future(scan({k: v for k, v in device_keys}))
     loop.run_forever()
 
 
+@cli.command("serve-metrics", help="Serve the latest readings of devices to Prometheus")
+@click.argument("device_keys", nargs=-1, type=DeviceKeyParam())
+@click.option("--host", default="0.0.0.0", show_default=True)
+@click.option("--port", default=9842, show_default=True)
+@scanner_options
+def serve_metrics(device_keys: List[Tuple[str, str]], host: str, port: int, **options):
+    loop = asyncio.get_event_loop()
+
+    async def run(keys):
+        scanner = ExporterScanner(keys, **options)
+        await serve(scanner.exporter, host, port)
+        await scanner.start()
+
+    asyncio.ensure_future(run({k: v for k, v in device_keys}))
+    loop.run_forever()
+
+
+@cli.command(help="Record raw advertisements from Victron devices to a file")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+def record(path: str):
+    loop = asyncio.get_event_loop()
+    recorder = Recorder(path)
+    try:
+        loop.run_until_complete(recorder.start())
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(recorder.stop())
+        logger.info(f"Recorded {recorder.recorded} advertisements to {path}")
+
+
+@cli.command(help="Read data from specified devices in a recording")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("device_keys", nargs=-1, type=DeviceKeyParam())
+@click.option(
+    "--speed",
+    default=1.0,
+    show_default=True,
+    help="Playback speed relative to real time, 0 for as fast as possible",
+)
+@scanner_options
+@emission_options
+def replay(
+    path: str,
+    device_keys: List[Tuple[str, str]],
+    speed: float,
+    emit_intervals: List[Tuple[Optional[str], float]],
+    deadbands: List[Tuple[str, float]],
+    emit_on_enum_change: bool,
+    **options,
+):
+    emission = emission_filter(emit_intervals, deadbands, emit_on_enum_change)
+
+    async def run():
+        scanner = Scanner(
+            {k: v for k, v in device_keys}, indent=None, emission=emission, **options
+        )
+        count = await replay_recording(scanner, path, speed)
+        logger.info(f"Replayed {count} advertisements from {path}")
+
+    asyncio.run(run())
+
+
 if __name__ == "__main__":
     cli()
@@ -1,5 +1,4 @@
-import struct
-from typing import Dict, Optional, Type
+from typing import Dict, Iterable, Optional, Type
 
 from victron_ble.devices.ac_charger import AcCharger, AcChargerData
 from victron_ble.devices.base import Device, DeviceData
@@ -15,6 +14,7 @@ from victron_ble.devices.inverter import Inverter, InverterData
 from victron_ble.devices.lynx_smart_bms import LynxSmartBMS, LynxSmartBMSData
 from victron_ble.devices.multirs import MultiRS, MultiRSData
 from victron_ble.devices.orion_xs import OrionXS, OrionXSData
+from victron_ble.devices.registry import DetectionResult, DeviceRegistry
 from victron_ble.devices.smart_battery_protect import (
     SmartBatteryProtect,
     SmartBatteryProtectData,
@@ -25,6 +25,11 @@ from victron_ble.devices.vebus import VEBus, VEBusData
 
 __all__ = [
     "AuxMode",
+    "DetectionResult",
+    "DeviceRegistry",
+    "detect_device_type",
+    "register_device",
+    "default_registry",
     "Device",
     "DeviceData",
     "BatteryMonitor",
@@ -66,47 +71,45 @@ MODEL_PARSER_OVERRIDE: Dict[int, Type[Device]] = {
     0xA3A5: BatterySense,  # Smart Battery Sense
 }
 
+# Default parsers by readout type. InverterRS (0x6) is not supported yet.
+default_registry = DeviceRegistry()
+for device_type in (
+    SolarCharger,
+    BatteryMonitor,
+    Inverter,
+    DcDcConverter,
+    # Commercially Lithium Battery Smart / LiFePO4 Battery Smart
+    SmartLithium,
+    AcCharger,
+    SmartBatteryProtect,
+    LynxSmartBMS,
+    MultiRS,
+    VEBus,
+    DcEnergyMeter,
+    OrionXS,
+):
+    default_registry.register(device_type)
+for model_id, override_type in MODEL_PARSER_OVERRIDE.items():
+    default_registry.register_model(model_id, override_type)
 
-def detect_device_type(data: bytes) -> Optional[Type[Device]]:
-    try:
-        model_id = struct.unpack("<H", data[2:4])[0]
-        mode = struct.unpack("<B", data[4:5])[0]
-    except IndexError:
-        return None
 
-    # Model ID-based preferences
-    match = MODEL_PARSER_OVERRIDE.get(model_id)
-    if match:
-        return match
+def register_device(
+    device_type: Type[Device],
+    readout_type: Optional[int] = None,
+    model_ids: Iterable[int] = (),
+) -> None:
+    """
+    Register a parser with the default registry.
 
-    # Defaults
-    if mode == 0x2:  # BatteryMonitor
-        return BatteryMonitor
-    elif mode == 0xD:  # DcEnergyMeter
-        return DcEnergyMeter
-    elif mode == 0x8:  # AcCharger
-        return AcCharger
-    elif mode == 0x4:  # DcDcConverter
-        return DcDcConverter
-    elif mode == 0x3:  # Inverter
-        return Inverter
-    elif mode == 0x6:  # InverterRS
-        pass
-    elif mode == 0xA:  # LynxSmartBMS
-        return LynxSmartBMS
-    elif mode == 0xB:  # MultiRS
-        return MultiRS
-    elif (
-        mode == 0x5
-    ):  # SmartLithium (commercially Lithium Battery Smart / LiFePO4 Battery Smart)
-        return SmartLithium
-    elif mode == 0x9:  # SmartBatteryProtect
-        return SmartBatteryProtect
-    elif mode == 0x1:  # SolarCharger
-        return SolarCharger
-    elif mode == 0xC:  # VE.Bus
-        return VEBus
-    elif mode == 0xF:  # Orion XS
-        return OrionXS
+    Without model IDs the parser handles its readout type; with model IDs it
+    only overrides detection for those models.
+    """
+    model_ids = list(model_ids)
+    for model_id in model_ids:
+        default_registry.register_model(model_id, device_type)
+    if not model_ids:
+        default_registry.register(device_type, readout_type)
 
-    return None
+
+def detect_device_type(data: bytes) -> Optional[Type[Device]]:
+    return default_registry.detect(data).device_type
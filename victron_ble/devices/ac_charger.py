@@ -1,15 +1,18 @@
 from typing import Optional
 
 from victron_ble.devices.base import (
-    BitReader,
     ChargerError,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OperationMode,
 )
 
 
 class AcChargerData(DeviceData):
+    __slots__ = ()
+
     def get_charge_state(self) -> Optional[OperationMode]:
         """
         Return an enum indicating the current charging state
@@ -73,56 +76,25 @@ class AcChargerData(DeviceData):
 
 class AcCharger(Device):
     data_type = AcChargerData
+    readout_type = 0x8
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Charge State:   0 - Off
         #                 3 - Bulk
         #                 4 - Absorption
         #                 5 - Float
-        charge_state = reader.read_unsigned_int(8)
-        charger_error = reader.read_unsigned_int(8)
-        output_voltage1 = reader.read_unsigned_int(
-            13
-        )  # Output voltage reading in 0.01V increments
-        output_current1 = reader.read_unsigned_int(
-            11
-        )  # Output current reading in 0.1A increments
-        output_voltage2 = reader.read_unsigned_int(13)
-        output_current2 = reader.read_unsigned_int(11)
-        output_voltage3 = reader.read_unsigned_int(13)
-        output_current3 = reader.read_unsigned_int(11)
-        temerature = reader.read_unsigned_int(7)  # Celsius
-        ac_current = reader.read_unsigned_int(
-            9
-        )  # AC current reading in 0.1A increments
-
-        return {
-            "charge_state": (
-                OperationMode(charge_state) if charge_state != 0xFF else None
-            ),
-            "charger_error": (
-                ChargerError(charger_error) if charger_error != 0xFF else None
-            ),
-            "output_voltage1": (
-                output_voltage1 / 100 if output_voltage1 != 0x1FFF else None
-            ),
-            "output_voltage2": (
-                output_voltage2 / 100 if output_voltage2 != 0x1FFF else None
-            ),
-            "output_voltage3": (
-                output_voltage3 / 100 if output_voltage3 != 0x1FFF else None
-            ),
-            "output_current1": (
-                output_current1 / 10 if output_current1 != 0x7FF else None
-            ),
-            "output_current2": (
-                output_current2 / 10 if output_current2 != 0x7FF else None
-            ),
-            "output_current3": (
-                output_current3 / 10 if output_current3 != 0x7FF else None
-            ),
-            "temperature": ((temerature - 40) if temerature != 0x7F else None),
-            "ac_current": (ac_current / 10 if ac_current != 0x1FF else None),
-        }
+        Field("charge_state", 8, not_available=0xFF, enum=OperationMode),
+        Field("charger_error", 8, not_available=0xFF, enum=ChargerError),
+        # Output voltage reading in 0.01V increments
+        Field("output_voltage1", 13, not_available=0x1FFF, scale=100),
+        # Output current reading in 0.1A increments
+        Field("output_current1", 11, not_available=0x7FF, scale=10),
+        Field("output_voltage2", 13, not_available=0x1FFF, scale=100),
+        Field("output_current2", 11, not_available=0x7FF, scale=10),
+        Field("output_voltage3", 13, not_available=0x1FFF, scale=100),
+        Field("output_current3", 11, not_available=0x7FF, scale=10),
+        # Celsius
+        Field("temperature", 7, not_available=0x7F, offset=-40),
+        # AC current reading in 0.1A increments
+        Field("ac_current", 9, not_available=0x1FF, scale=10),
+    )
@@ -1,14 +1,32 @@
 import abc
 import struct
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Type
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 from Crypto.Cipher import AES
-from Crypto.Util import Counter
+from Crypto.Cipher._mode_ecb import EcbMode
 from Crypto.Util.Padding import pad
 
-from victron_ble.exceptions import AdvertisementKeyMismatchError
+from victron_ble.exceptions import (
+    AdvertisementKeyMismatchError,
+    AdvertisementKeyMissingError,
+)
 
 
 # Sourced from VE.Direct docs
@@ -988,16 +1006,172 @@ MODEL_ID_MAPPING = {
 }
 
 
+class Record(tuple):
+    """
+    Compact, immutable storage for the parsed fields of one reading.
+
+    Records are tuples of values that can also be read like a mapping from
+    field name to value, which is how DeviceData getters access them. The
+    field names are stored once per record type rather than per reading.
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __reduce__(self):
+        return (make_record, (dict(self.items()),))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(self)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self._fields, self)
+
+
+_record_types: Dict[Tuple[str, ...], Type[Record]] = {}
+
+
+def record_type(fields: Tuple[str, ...]) -> Type[Record]:
+    """
+    Return the (cached) record class holding the given fields
+    """
+    klass = _record_types.get(fields)
+    if klass is None:
+        klass = type(
+            "Record",
+            (Record,),
+            {
+                "__slots__": (),
+                "_fields": fields,
+                "_index": {name: index for index, name in enumerate(fields)},
+            },
+        )
+        _record_types[fields] = klass
+    return klass
+
+
+def make_record(data: Mapping[str, Any]) -> Record:
+    return record_type(tuple(data))(data.values())
+
+
+# The parsed fields of a reading. Records are read like a mapping but are not
+# Mappings: iterating them yields values rather than field names.
+Fields = Union[Mapping[str, Any], Record]
+
+
+class LazyFields(Mapping):
+    """
+    Mapping over a decrypted payload that decodes fields on first access.
+
+    Layout fields of devices without their own parse_decrypted are unpacked
+    one at a time and memoized. Any other key, every key of devices that
+    derive or drop values in parse_decrypted, as well as iteration, fall back
+    to parsing the whole payload once. Invalid values (e.g. unknown enum
+    members) raise when they are accessed rather than when parsed.
+    """
+
+    __slots__ = ("_device", "_layout", "_decrypted", "_values", "_parsed")
+
+    def __init__(self, device: "Device", decrypted: bytes) -> None:
+        if device.layout is None:
+            raise ValueError(f"{device.__class__.__name__} does not define a layout")
+        self._device = device
+        # Single fields only match the full parse if it is the plain layout
+        self._layout: Optional[Layout] = (
+            device.layout
+            if type(device).parse_decrypted is Device._unpack_layout
+            else None
+        )
+        self._decrypted = decrypted
+        self._values: Dict[str, Any] = {}
+        self._parsed: Optional[Dict[str, Any]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        values = self._values
+        try:
+            return values[key]
+        except KeyError:
+            pass
+        layout = self._layout
+        if self._parsed is None and layout is not None and key in layout:
+            value = values[key] = layout.unpack_field(self._decrypted, key)
+            return value
+        return self._parse()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parse())
+
+    def __len__(self) -> int:
+        return len(self._parse())
+
+    def __reduce__(self):
+        # The device holds a cipher, so pickle the decoded values instead
+        return (dict, (self._parse(),))
+
+    def _parse(self) -> Dict[str, Any]:
+        if self._parsed is None:
+            self._parsed = self._device.parse_decrypted(self._decrypted)
+            self._values = self._parsed
+        return self._parsed
+
+
 class DeviceData:
-    def __init__(self, model_id: int, data: Dict[str, Any]) -> None:
+    __slots__ = ("_model_id", "_data")
+
+    def __init__(self, model_id: int, data: Fields) -> None:
         self._model_id: int = model_id
-        self._data: Dict[str, Any] = data
+        self._data: Fields = data
 
     def get_model_name(self) -> str:
         return MODEL_ID_MAPPING.get(
             self._model_id, f"<Unknown device: {self._model_id}>"
         )
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the parsed fields as a dict
+        """
+        return dict(self._data.items())
+
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """
+        Return the values of the parsed fields in parse order
+        """
+        return tuple(self._data.values())
+
+    def compact(self) -> "DeviceData":
+        """
+        Return an equivalent reading that stores its fields in a Record
+        """
+        if isinstance(self._data, Record):
+            return self
+        return self.__class__(self._model_id, make_record(self._data))
+
+
+# Prefix, model ID, readout type and IV preceding the key check byte
+_CONTAINER_HEADER = struct.Struct("<HHBH")
+
+# AES-CTR counter blocks are 128 bits wide and wrap around on overflow
+_COUNTER_MASK = (1 << 128) - 1
+
 
 @dataclass
 class AdvertisementContainer:
@@ -1008,8 +1182,26 @@ class AdvertisementContainer:
     encrypted_data: bytes
 
 
+class KeystreamCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 class Device(abc.ABC):
     data_type: Type[DeviceData] = DeviceData
+    # Record type identifier carried in the advertisement header
+    readout_type: Optional[int] = None
+    # Bit layout of the decrypted payload. Devices that declare a layout get a
+    # parse_decrypted implementation for free and only need to override it to
+    # derive additional values.
+    layout: Optional["Layout"] = None
+
+    _advertisement_key: Optional[str]
+    # The parsed key and its AES cipher, None without a key
+    _key: Optional[bytes]
+    _cipher: Optional[EcbMode]
 
     def parse_container(self, data) -> AdvertisementContainer:
         return AdvertisementContainer(
@@ -1020,40 +1212,184 @@ class Device(abc.ABC):
             encrypted_data=data[7:],
         )
 
-    def __init__(self, advertisement_key: str):
+    def __init__(
+        self,
+        advertisement_key: Optional[str],
+        keystream_cache_size: int = 0,
+        compact: bool = False,
+        lazy: bool = False,
+    ):
+        if compact and lazy:
+            raise ValueError("compact and lazy parsing are mutually exclusive")
+        # Store parsed readings in tuple-backed records instead of dicts
+        self._compact = compact
+        # Keep the decrypted payload and decode fields when they are read
+        self._lazy = lazy and self.layout is not None
+        # Devices reuse the same IV across several broadcasts, so an optional
+        # LRU cache of keystreams turns repeated IVs into a plain XOR
+        self._keystream_cache: "OrderedDict[Tuple[int, int], bytes]" = OrderedDict()
+        self._keystream_cache_size = keystream_cache_size
+        self._keystream_cache_hits = 0
+        self._keystream_cache_misses = 0
         self.advertisement_key = advertisement_key
 
+    @property
+    def advertisement_key(self) -> Optional[str]:
+        return self._advertisement_key
+
+    @advertisement_key.setter
+    def advertisement_key(self, advertisement_key: Optional[str]) -> None:
+        # Parse the key and expand the AES key schedule once per device rather
+        # than once per advertisement. CTR mode is implemented on top of the
+        # ECB primitive so decrypting a packet is a single block encryption.
+        self._advertisement_key = advertisement_key
+        if advertisement_key is None:
+            self._key = None
+            self._cipher = None
+        else:
+            self._key = bytes.fromhex(advertisement_key)
+            self._cipher = AES.new(self._key, AES.MODE_ECB)
+        self._keystream_cache.clear()
+
     def get_model_id(self, data: bytes) -> int:
         return self.parse_container(data).model_id
 
+    def keystream(self, iv: int, length: int) -> bytes:
+        """
+        Return the AES-CTR keystream for the given IV, rounded up to whole blocks
+        """
+        num_blocks = (length + 15) // 16
+        if not self._keystream_cache_size:
+            return self._generate_keystream(iv, num_blocks)
+
+        cache = self._keystream_cache
+        cache_key = (iv, num_blocks)
+        keystream = cache.get(cache_key)
+        if keystream is not None:
+            self._keystream_cache_hits += 1
+            cache.move_to_end(cache_key)
+            return keystream
+
+        self._keystream_cache_misses += 1
+        keystream = self._generate_keystream(iv, num_blocks)
+        cache[cache_key] = keystream
+        if len(cache) > self._keystream_cache_size:
+            cache.popitem(last=False)
+        return keystream
+
+    def keystream_cache_info(self) -> KeystreamCacheInfo:
+        """
+        Return hit/miss statistics for the keystream cache
+        """
+        return KeystreamCacheInfo(
+            hits=self._keystream_cache_hits,
+            misses=self._keystream_cache_misses,
+            maxsize=self._keystream_cache_size,
+            currsize=len(self._keystream_cache),
+        )
+
+    def _require_key(self) -> Tuple[bytes, EcbMode]:
+        if self._key is None or self._cipher is None:
+            raise AdvertisementKeyMissingError(
+                f"{self.__class__.__name__} has no advertisement key"
+            )
+        return self._key, self._cipher
+
+    def _generate_keystream(self, iv: int, num_blocks: int) -> bytes:
+        _, cipher = self._require_key()
+        counter_blocks = b"".join(
+            ((iv + block) & _COUNTER_MASK).to_bytes(16, "little")
+            for block in range(num_blocks)
+        )
+        return cipher.encrypt(counter_blocks)
+
     def decrypt(self, data: bytes) -> bytes:
         container = self.parse_container(data)
-
-        advertisement_key = bytes.fromhex(self.advertisement_key)
+        key, _ = self._require_key()
 
         # The first data byte is a key check byte
-        if container.encrypted_data[0] != advertisement_key[0]:
+        if container.encrypted_data[0] != key[0]:
             raise AdvertisementKeyMismatchError("Incorrect advertisement key")
 
-        ctr = Counter.new(128, initial_value=container.iv, little_endian=True)
-
-        cipher = AES.new(
-            advertisement_key,
-            AES.MODE_CTR,
-            counter=ctr,
-        )
-        return cipher.decrypt(pad(container.encrypted_data[1:], 16))
+        padded = pad(container.encrypted_data[1:], 16)
+        keystream = self.keystream(container.iv, len(padded))
+        return (
+            int.from_bytes(padded, "little") ^ int.from_bytes(keystream, "little")
+        ).to_bytes(len(padded), "little")
 
     def parse(self, data: bytes) -> DeviceData:
-        decrypted = self.decrypt(data)
-        parsed = self.parse_decrypted(decrypted)
+        return self.make_data(data, self.decrypt(data))
+
+    def make_data(self, data: bytes, decrypted: bytes) -> DeviceData:
+        """
+        Build the DeviceData of an advertisement from its decrypted payload
+        """
         model = self.get_model_id(data)
+        if self._lazy:
+            return self.data_type(model, LazyFields(self, decrypted))
+        parsed = self.parse_decrypted(decrypted)
+        if self._compact:
+            return self.data_type(model, make_record(parsed))
         return self.data_type(model, parsed)
 
+    def parse_batch(self, advertisements: Sequence[bytes]) -> Dict[str, Any]:
+        """
+        Decrypt and unpack many advertisements at once into NumPy columns.
+
+        See victron_ble.devices.batch.parse_batch for details; requires numpy.
+        """
+        from victron_ble.devices.batch import parse_batch
+
+        return parse_batch(self, advertisements)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Runs before ABCMeta collects the abstract methods, so devices with a
+        # layout and without their own parse_decrypted can be instantiated
+        if cls.layout is not None and getattr(
+            cls.parse_decrypted, "__isabstractmethod__", False
+        ):
+            cls.parse_decrypted = Device._unpack_layout  # type: ignore[method-assign]
+
     @abc.abstractmethod
     def parse_decrypted(self, decrypted: bytes) -> dict:
         pass
 
+    def _unpack_layout(self, decrypted: bytes) -> dict:
+        assert self.layout is not None
+        return self.layout.unpack(decrypted)
+
+    def encode(self, values: Mapping[str, Any]) -> bytes:
+        """
+        Encode parsed values into a payload, the inverse of parse_decrypted
+        """
+        if self.layout is None:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} must define a layout or encode"
+            )
+        return self.layout.encode(values)
+
+    def encrypt(
+        self,
+        payload: bytes,
+        model_id: int,
+        iv: int = 0,
+        readout_type: Optional[int] = None,
+        prefix: int = 0x0210,
+    ) -> bytes:
+        """
+        Encrypt a payload into manufacturer data that parse() accepts
+        """
+        if readout_type is None:
+            readout_type = self.readout_type or 0
+        keystream = self.keystream(iv, len(payload))[: len(payload)]
+        encrypted = (
+            int.from_bytes(payload, "little") ^ int.from_bytes(keystream, "little")
+        ).to_bytes(len(payload), "little")
+        header = _CONTAINER_HEADER.pack(prefix, model_id, readout_type, iv)
+        key, _ = self._require_key()
+        return header + key[:1] + encrypted
+
 
 def kelvin_to_celsius(temp_in_kelvin: float) -> float:
     return round(temp_in_kelvin - 273.15, 2)
@@ -1064,22 +1400,199 @@ def kelvin_to_celsius(temp_in_kelvin: float) -> float:
 class BitReader:
     def __init__(self, data: bytes):
         self._data = data
+        self._value = int.from_bytes(data, "little")
+        self._size = len(data) * 8
         self._index = 0
 
+    def _advance(self, num_bits: int) -> int:
+        index = self._index
+        if index + num_bits > self._size:
+            raise IndexError("Read past the end of the data")
+        self._index = index + num_bits
+        return index
+
     def read_bit(self) -> int:
-        bit = (self._data[self._index >> 3] >> (self._index & 7)) & 1
-        self._index += 1
-        return bit
+        return (self._value >> self._advance(1)) & 1
 
     def read_unsigned_int(self, num_bits: int) -> int:
-        value = 0
-        for position in range(0, num_bits):
-            value |= self.read_bit() << position
-        return value
+        return (self._value >> self._advance(num_bits)) & ((1 << num_bits) - 1)
 
     def read_signed_int(self, num_bits: int) -> int:
         return BitReader.to_signed_int(self.read_unsigned_int(num_bits), num_bits)
 
+    def read_fields(self, widths: Iterable[int]) -> Tuple[int, ...]:
+        """
+        Read consecutive unsigned values with the given bit widths
+        """
+        widths = tuple(widths)
+        value = self._value >> self._advance(sum(widths))
+        fields = []
+        for num_bits in widths:
+            fields.append(value & ((1 << num_bits) - 1))
+            value >>= num_bits
+        return tuple(fields)
+
+    def read_signed_fields(self, widths: Iterable[int]) -> Tuple[int, ...]:
+        """
+        Read consecutive two's complement values with the given bit widths
+        """
+        widths = tuple(widths)
+        return tuple(
+            BitReader.to_signed_int(value, num_bits)
+            for value, num_bits in zip(self.read_fields(widths), widths)
+        )
+
     @staticmethod
     def to_signed_int(value: int, num_bits: int) -> int:
         return value - (1 << num_bits) if value & (1 << (num_bits - 1)) else value
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    A single bit field of a decrypted advertisement payload.
+
+    Raw values are converted in order: sign extension, the "not available"
+    check (which maps to None), then either the enum, transform or scale and
+    offset (``raw / scale + offset``). Fields with a transform need an
+    inverse to be encoded.
+    """
+
+    name: str
+    bits: int
+    signed: bool = False
+    not_available: Optional[int] = None
+    enum: Optional[Type[Enum]] = None
+    scale: Optional[float] = None
+    offset: int = 0
+    transform: Optional[Callable[[int], Any]] = None
+    inverse: Optional[Callable[[Any], int]] = None
+
+    def converter(self) -> Optional[Callable[[int], Any]]:
+        if self.enum is not None:
+            return self.enum
+        if self.transform is not None:
+            return self.transform
+        scale, offset = self.scale, self.offset
+        if scale is not None and offset:
+            return lambda value: value / scale + offset
+        if scale is not None:
+            return lambda value: value / scale
+        if offset:
+            return lambda value: value + offset
+        return None
+
+    def to_raw(self, value: Any) -> int:
+        """
+        Convert a parsed value back to its raw (sign extended) value
+        """
+        if value is None and self.not_available is not None:
+            return self.not_available
+        if self.inverse is not None:
+            return self.inverse(value)
+        if value is None:
+            raise ValueError(f"{self.name} cannot be encoded as not available")
+        if isinstance(value, Enum):
+            return value.value
+        if self.transform is not None:
+            raise ValueError(f"{self.name} has a transform but no inverse")
+        if self.scale is not None:
+            return round((value - self.offset) * self.scale)
+        return int(value) - self.offset
+
+
+class Layout:
+    """
+    A compiled description of the bit fields packed into a decrypted payload.
+
+    Fields are packed from LSB to MSB in declaration order, like BitReader
+    reads them. The shifts and masks are computed once so that unpacking a
+    payload is a single int.from_bytes plus one shift and mask per field.
+    """
+
+    def __init__(self, *fields: Field) -> None:
+        self.fields: Tuple[Field, ...] = fields
+        self.bits = sum(field.bits for field in fields)
+        self._num_bytes = (self.bits + 7) // 8
+
+        extractors: List[Tuple[str, int, int, int, Optional[int], Any]] = []
+        shift = 0
+        for field in fields:
+            sign_bit = 1 << (field.bits - 1) if field.signed else 0
+            extractors.append(
+                (
+                    field.name,
+                    shift,
+                    (1 << field.bits) - 1,
+                    sign_bit,
+                    field.not_available,
+                    field.converter(),
+                )
+            )
+            shift += field.bits
+        self._extractors = tuple(extractors)
+        self._extractors_by_name = {
+            extractor[0]: extractor for extractor in self._extractors
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._extractors_by_name
+
+    def unpack(self, data: bytes) -> Dict[str, Any]:
+        value = int.from_bytes(data[: self._num_bytes], "little")
+        parsed: Dict[str, Any] = {}
+        for name, shift, mask, sign_bit, not_available, convert in self._extractors:
+            raw = (value >> shift) & mask
+            if raw & sign_bit:
+                raw -= sign_bit << 1
+            if raw == not_available:
+                parsed[name] = None
+            elif convert is None:
+                parsed[name] = raw
+            else:
+                parsed[name] = convert(raw)
+        return parsed
+
+    def unpack_field(self, data: bytes, name: str) -> Any:
+        """
+        Unpack a single field, raising KeyError if it is not in the layout
+        """
+        _, shift, mask, sign_bit, not_available, convert = self._extractors_by_name[
+            name
+        ]
+        raw = (int.from_bytes(data[: self._num_bytes], "little") >> shift) & mask
+        if raw & sign_bit:
+            raw -= sign_bit << 1
+        if raw == not_available:
+            return None
+        if convert is None:
+            return raw
+        return convert(raw)
+
+    def encode(self, values: Mapping[str, Any]) -> bytes:
+        """
+        Encode parsed values, the inverse of unpack.
+
+        Missing fields are packed like in pack().
+        """
+        return self.pack(
+            {
+                field.name: field.to_raw(values[field.name])
+                for field in self.fields
+                if field.name in values
+            }
+        )
+
+    def pack(self, raw_values: Mapping[str, int]) -> bytes:
+        """
+        Pack raw field values, the inverse of unpacking without conversions.
+
+        Missing fields are packed as their "not available" value, or 0.
+        """
+        value = 0
+        for name, shift, mask, _, not_available, _ in self._extractors:
+            raw = raw_values.get(name)
+            if raw is None:
+                raw = not_available or 0
+            value |= (raw & mask) << shift
+        return value.to_bytes(self._num_bytes, "little")
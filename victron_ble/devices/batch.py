@@ -0,0 +1,120 @@
+"""
+Vectorized decoding of many advertisements from a single device.
+
+This is intended for re-processing archived advertisements. It requires
+NumPy, which is an optional dependency (``pip install victron_ble[numpy]``).
+"""
+
+from typing import TYPE_CHECKING, Dict, Sequence
+
+from victron_ble.exceptions import AdvertisementKeyMismatchError
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    from victron_ble.devices.base import Device, Field
+
+# Offset of the encrypted payload (after the key check byte) in an advertisement
+_HEADER_SIZE = 8
+
+
+def parse_batch(
+    device: "Device", advertisements: Sequence[bytes]
+) -> Dict[str, "np.ndarray"]:
+    """
+    Decrypt and unpack advertisements from one device into columns.
+
+    Returns a dict holding a ``model_id`` array and one masked array per field
+    of the device layout, where masked entries are "not available" readings.
+    Values match those produced by Device.parse_decrypted for the layout
+    fields. Values derived in parse_decrypted (such as the BatteryMonitor aux
+    readings) are not computed; their raw fields are returned instead.
+    """
+    if not HAS_NUMPY:
+        raise ImportError("parse_batch requires numpy to be installed")
+    layout = device.layout
+    if layout is None:
+        raise ValueError(f"{device.__class__.__name__} does not define a layout")
+    key, cipher = device._require_key()
+
+    count = len(advertisements)
+    lengths = np.fromiter((len(a) for a in advertisements), dtype=np.int64, count=count)
+    payload_lengths = lengths - _HEADER_SIZE
+    if count and payload_lengths.min() < 0:
+        raise ValueError("Advertisement is too short")
+
+    # Pad every payload like Device.decrypt does (PKCS#7 to a whole block)
+    padded_lengths = (payload_lengths // 16 + 1) * 16
+    num_blocks = int(padded_lengths.max() // 16) if count else 1
+    width = _HEADER_SIZE + num_blocks * 16
+    rows = np.frombuffer(
+        b"".join(a.ljust(width, b"\0") for a in advertisements), dtype=np.uint8
+    ).reshape(count, width)
+
+    if np.any(rows[:, 7] != key[0]):
+        raise AdvertisementKeyMismatchError("Incorrect advertisement key")
+
+    model_id = rows[:, 2].astype(np.uint16) | (rows[:, 3].astype(np.uint16) << 8)
+    iv = rows[:, 5].astype(np.int64) | (rows[:, 6].astype(np.int64) << 8)
+
+    payload = rows[:, _HEADER_SIZE:].copy()
+    column = np.arange(num_blocks * 16)
+    padding = (column >= payload_lengths[:, None]) & (column < padded_lengths[:, None])
+    payload[padding] = np.broadcast_to(
+        (padded_lengths - payload_lengths)[:, None], payload.shape
+    )[padding]
+
+    # Generate the CTR keystream of every advertisement in a single ECB call.
+    # IVs are 16 bits wide, so each counter only spans the low three bytes.
+    counters = iv[:, None] + np.arange(num_blocks)
+    counter_blocks = np.zeros((count, num_blocks, 16), dtype=np.uint8)
+    for byte in range(3):
+        counter_blocks[:, :, byte] = (counters >> (8 * byte)) & 0xFF
+    keystream = np.frombuffer(
+        cipher.encrypt(counter_blocks.tobytes()), dtype=np.uint8
+    ).reshape(count, num_blocks * 16)
+    decrypted = payload ^ keystream
+
+    columns: Dict[str, np.ndarray] = {"model_id": model_id}
+    offset = 0
+    for field in layout.fields:
+        columns[field.name] = _unpack_field(decrypted, field, offset)
+        offset += field.bits
+    return columns
+
+
+def _unpack_field(decrypted: "np.ndarray", field: "Field", offset: int) -> "np.ndarray":
+    first_byte = offset // 8
+    last_byte = (offset + field.bits - 1) // 8
+
+    raw = np.zeros(len(decrypted), dtype=np.int64)
+    for byte in range(first_byte, last_byte + 1):
+        raw |= decrypted[:, byte].astype(np.int64) << (8 * (byte - first_byte))
+    raw = (raw >> (offset % 8)) & ((1 << field.bits) - 1)
+
+    if field.signed:
+        sign_bit = 1 << (field.bits - 1)
+        raw = np.where(raw & sign_bit, raw - (sign_bit << 1), raw)
+
+    if field.not_available is not None:
+        mask = raw == field.not_available
+    else:
+        mask = np.zeros(len(raw), dtype=bool)
+
+    convert = field.converter()
+    if convert is not None and (field.enum is not None or field.transform is not None):
+        values = np.empty(len(raw), dtype=object)
+        values[~mask] = [convert(int(value)) for value in raw[~mask]]
+    elif field.scale is not None:
+        values = raw / field.scale
+        if field.offset:
+            values += field.offset
+    else:
+        values = raw + field.offset
+
+    return np.ma.MaskedArray(values, mask=mask)
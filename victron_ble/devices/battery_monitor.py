@@ -1,11 +1,13 @@
 from enum import Enum
-from typing import Optional, Type
+from typing import Any, Mapping, Optional, Type
 
 from victron_ble.devices.base import (
     AlarmReason,
     BitReader,
     Device,
     DeviceData,
+    Field,
+    Layout,
     kelvin_to_celsius,
 )
 
@@ -18,6 +20,8 @@ class AuxMode(Enum):
 
 
 class BatteryMonitorData(DeviceData):
+    __slots__ = ()
+
     def get_remaining_mins(self) -> Optional[float]:
         """
         Return the number of remaining minutes of battery life in minutes
@@ -84,42 +88,56 @@ class BatteryMonitorData(DeviceData):
 
 class BatteryMonitor(Device):
     data_type: Type[DeviceData] = BatteryMonitorData
+    readout_type = 0x2
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Remaining time in minutes
-        remaining_mins = reader.read_unsigned_int(16)
+        Field("remaining_mins", 16, not_available=0xFFFF),
         # Voltage reading in 10mV increments
-        voltage = reader.read_signed_int(16)
+        Field("voltage", 16, signed=True, not_available=0x7FFF, scale=100),
         # Alarm reason
-        alarm = reader.read_unsigned_int(16)
+        Field("alarm", 16, enum=AlarmReason),
         # Value of the auxillary input (millivolts or degrees)
-        aux = reader.read_unsigned_int(16)
-        aux_mode = reader.read_unsigned_int(2)
+        Field("aux", 16),
+        Field("aux_mode", 2, enum=AuxMode),
         # The current in milliamps
-        current = reader.read_signed_int(22)
+        Field("current", 22, signed=True, not_available=0x3FFFFF, scale=1000),
         # Consumed Ah in 0.1Ah increments
-        consumed_ah = reader.read_unsigned_int(20)
+        Field(
+            "consumed_ah",
+            20,
+            not_available=0xFFFFF,
+            transform=lambda v: -v / 10,
+            inverse=lambda v: round(-v * 10),
+        ),
         # The state of charge in 0.1% increments
-        soc = reader.read_unsigned_int(10)
-
-        parsed = {
-            "remaining_mins": remaining_mins if remaining_mins != 0xFFFF else None,
-            "voltage": voltage / 100 if voltage != 0x7FFF else None,
-            "alarm": AlarmReason(alarm),
-            "aux_mode": AuxMode(aux_mode),
-            "current": current / 1000 if current != 0x3FFFFF else None,
-            "consumed_ah": -consumed_ah / 10 if consumed_ah != 0xFFFFF else None,
-            "soc": soc / 10 if soc != 0x3FF else None,
-        }
-
-        if aux_mode == AuxMode.STARTER_VOLTAGE.value:
+        Field("soc", 10, not_available=0x3FF, scale=10),
+    )
+
+    def parse_decrypted(self, decrypted: bytes) -> dict:
+        parsed = self.layout.unpack(decrypted)
+        aux = parsed.pop("aux")
+        aux_mode = parsed["aux_mode"]
+
+        if aux_mode == AuxMode.STARTER_VOLTAGE:
             # Starter voltage is treated as signed
             parsed["starter_voltage"] = BitReader.to_signed_int(aux, 16) / 100
-        elif aux_mode == AuxMode.MIDPOINT_VOLTAGE.value:
+        elif aux_mode == AuxMode.MIDPOINT_VOLTAGE:
             parsed["midpoint_voltage"] = aux / 100
-        elif aux_mode == AuxMode.TEMPERATURE.value:
+        elif aux_mode == AuxMode.TEMPERATURE:
             parsed["temperature_kelvin"] = aux / 100
 
         return parsed
+
+    def encode(self, values: Mapping[str, Any]) -> bytes:
+        values = dict(values)
+        aux_mode = values.get("aux_mode")
+        if aux_mode == AuxMode.STARTER_VOLTAGE:
+            values["aux"] = round(values["starter_voltage"] * 100)
+        elif aux_mode == AuxMode.MIDPOINT_VOLTAGE:
+            values["aux"] = round(values["midpoint_voltage"] * 100)
+        elif aux_mode == AuxMode.TEMPERATURE:
+            values["aux"] = round(values["temperature_kelvin"] * 100)
+        else:
+            values.setdefault("aux", 0)
+        return super().encode(values)
@@ -5,6 +5,8 @@ from victron_ble.devices.battery_monitor import BatteryMonitor
 
 
 class BatterySenseData(DeviceData):
+    __slots__ = ()
+
     def get_temperature(self) -> float:
         """
         Return the temperature in Celsius
@@ -1,11 +1,13 @@
 from enum import Enum
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 from victron_ble.devices.base import (
     AlarmReason,
     BitReader,
     Device,
     DeviceData,
+    Field,
+    Layout,
     kelvin_to_celsius,
 )
 from victron_ble.devices.battery_monitor import AuxMode
@@ -32,6 +34,8 @@ class MeterType(Enum):
 
 
 class DcEnergyMeterData(DeviceData):
+    __slots__ = ()
+
     def get_meter_type(self) -> MeterType:
         """
         Return an enum indicating the current meter type
@@ -80,40 +84,49 @@ class DcEnergyMeterData(DeviceData):
 
 class DcEnergyMeter(Device):
     data_type = DcEnergyMeterData
+    readout_type = 0xD
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
-        meter_type = reader.read_signed_int(16)
+    layout = Layout(
+        Field("meter_type", 16, signed=True, enum=MeterType),
         # Voltage reading in 10mV increments
-        voltage = reader.read_signed_int(16)
+        Field("voltage", 16, signed=True, not_available=0x7FFF, scale=100),
         # Alarm reason
-        alarm = reader.read_unsigned_int(16)
+        Field("alarm", 16),
         # Value of the auxillary input
-        aux = reader.read_unsigned_int(16)
+        Field("aux", 16),
         # The aux input mode:
         #   0 = Starter battery voltage
         #   2 = Temperature
         #   3 = Disabled
-        aux_mode = reader.read_unsigned_int(2)
+        Field("aux_mode", 2, enum=AuxMode),
         # The current in milliamps
-        current = reader.read_signed_int(22)
+        Field("current", 22, signed=True, not_available=0x3FFFFF, scale=1000),
+    )
 
-        parsed = {
-            "meter_type": MeterType(meter_type),
-            "aux_mode": AuxMode(aux_mode),
-            "current": current / 1000 if current != 0x3FFFFF else None,
-            "voltage": voltage / 100 if voltage != 0x7FFF else None,
-            "alarm": alarm,
-        }
+    def parse_decrypted(self, decrypted: bytes) -> dict:
+        parsed = self.layout.unpack(decrypted)
+        aux = parsed.pop("aux")
+        aux_mode = parsed["aux_mode"]
 
-        if aux_mode == AuxMode.STARTER_VOLTAGE.value:
+        if aux_mode == AuxMode.STARTER_VOLTAGE:
             # Starter voltage is treated as signed
             parsed["starter_voltage"] = BitReader.to_signed_int(aux, 16) / 100
-        elif aux_mode == AuxMode.TEMPERATURE.value:
+        elif aux_mode == AuxMode.TEMPERATURE:
             if aux == 0xFFFF:
                 parsed["temperature_kelvin"] = None
             else:
                 parsed["temperature_kelvin"] = aux / 100
 
         return parsed
+
+    def encode(self, values: Mapping[str, Any]) -> bytes:
+        values = dict(values)
+        aux_mode = values.get("aux_mode")
+        if aux_mode == AuxMode.STARTER_VOLTAGE:
+            values["aux"] = round(values["starter_voltage"] * 100)
+        elif aux_mode == AuxMode.TEMPERATURE:
+            temperature = values.get("temperature_kelvin")
+            values["aux"] = 0xFFFF if temperature is None else round(temperature * 100)
+        else:
+            values.setdefault("aux", 0)
+        return super().encode(values)
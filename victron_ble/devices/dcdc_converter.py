@@ -1,16 +1,19 @@
 from typing import Optional
 
 from victron_ble.devices.base import (
-    BitReader,
     ChargerError,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OffReason,
     OperationMode,
 )
 
 
 class DcDcConverterData(DeviceData):
+    __slots__ = ()
+
     def get_charge_state(self) -> Optional[OperationMode]:
         """
         Return an enum indicating the current charging state
@@ -44,34 +47,20 @@ class DcDcConverterData(DeviceData):
 
 class DcDcConverter(Device):
     data_type = DcDcConverterData
+    readout_type = 0x4
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Charge State:   0 - Off
         #                 3 - Bulk
         #                 4 - Absorption
         #                 5 - Float
-        device_state = reader.read_unsigned_int(8)
+        Field("device_state", 8, not_available=0xFF, enum=OperationMode),
         # Charger Error Code
-        charger_error = reader.read_unsigned_int(8)
+        Field("charger_error", 8, not_available=0xFF, enum=ChargerError),
         # Input voltage reading in 0.01V increments
-        input_voltage = reader.read_unsigned_int(16)
+        Field("input_voltage", 16, not_available=0xFFFF, scale=100),
         # Output voltage in 0.01V
-        output_voltage = reader.read_signed_int(16)
+        Field("output_voltage", 16, signed=True, not_available=0x7FFF, scale=100),
         # Reason for Charger Off
-        off_reason = reader.read_unsigned_int(32)
-
-        return {
-            "device_state": (
-                OperationMode(device_state) if device_state != 0xFF else None
-            ),
-            "charger_error": (
-                ChargerError(charger_error) if charger_error != 0xFF else None
-            ),
-            "input_voltage": input_voltage / 100 if input_voltage != 0xFFFF else None,
-            "output_voltage": (
-                output_voltage / 100 if output_voltage != 0x7FFF else None
-            ),
-            "off_reason": OffReason(off_reason),
-        }
+        Field("off_reason", 32, enum=OffReason),
+    )
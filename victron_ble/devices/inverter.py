@@ -2,14 +2,17 @@ from typing import Optional
 
 from victron_ble.devices.base import (
     AlarmReason,
-    BitReader,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OperationMode,
 )
 
 
 class InverterData(DeviceData):
+    __slots__ = ()
+
     def get_device_state(self) -> Optional[OperationMode]:
         """
         Return an enum indicating the current device state
@@ -49,34 +52,19 @@ class InverterData(DeviceData):
 
 class Inverter(Device):
     data_type = InverterData
+    readout_type = 0x3
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Device State:   0 - Off
-        device_state = reader.read_unsigned_int(8)
+        Field("device_state", 8, not_available=0xFF, enum=OperationMode),
         # Alarm Reason Code
-        alarm = reader.read_unsigned_int(16)
+        Field("alarm", 16),
         # Input voltage reading in 0.01V increments
-        battery_voltage = reader.read_signed_int(16)
+        Field("battery_voltage", 16, signed=True, not_available=0x7FFF, scale=100),
         # Output AC power in 1VA
-        ac_apparent_power = reader.read_unsigned_int(16)
+        Field("ac_apparent_power", 16, not_available=0xFFFF),
         # Output AC voltage in 0.01V
-        ac_voltage = reader.read_unsigned_int(15)
+        Field("ac_voltage", 15, not_available=0x7FFF, scale=100),
         # Output AC current in 0.1A
-        ac_current = reader.read_unsigned_int(11)
-
-        return {
-            "device_state": (
-                OperationMode(device_state) if device_state != 0xFF else None
-            ),
-            "alarm": alarm,
-            "battery_voltage": (
-                (battery_voltage) / 100 if battery_voltage != 0x7FFF else None
-            ),
-            "ac_apparent_power": (
-                ac_apparent_power if ac_apparent_power != 0xFFFF else None
-            ),
-            "ac_voltage": ac_voltage / 100 if ac_voltage != 0x7FFF else None,
-            "ac_current": ac_current / 10 if ac_current != 0x7FF else None,
-        }
+        Field("ac_current", 11, not_available=0x7FF, scale=10),
+    )
@@ -1,9 +1,11 @@
 from typing import Optional
 
-from victron_ble.devices.base import BitReader, Device, DeviceData
+from victron_ble.devices.base import Device, DeviceData, Field, Layout
 
 
 class LynxSmartBMSData(DeviceData):
+    __slots__ = ()
+
     def get_error_flags(self) -> int:
         """
         Get the raw error_flags field (meaning not documented).
@@ -61,31 +63,16 @@ class LynxSmartBMSData(DeviceData):
 
 class LynxSmartBMS(Device):
     data_type = LynxSmartBMSData
-
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-        error_flags = reader.read_unsigned_int(8)
-        remaining_mins = reader.read_unsigned_int(16)
-        voltage = reader.read_signed_int(16)
-        current = reader.read_signed_int(16)
-        io_status = reader.read_unsigned_int(16)
-        alarm_flags = reader.read_unsigned_int(18)
-        soc = reader.read_unsigned_int(10)
-        consumed_ah = reader.read_unsigned_int(20)
-        temperature = reader.read_unsigned_int(7)
-
-        parsed = {
-            "error_flags": error_flags,
-            "remaining_mins": (remaining_mins if remaining_mins != 0xFFFF else None),
-            "voltage": voltage / 100 if voltage != 0x7FFF else None,
-            "current": current / 10 if current != 0x7FFF else None,
-            "io_status": io_status,
-            "alarm_flags": alarm_flags,
-            "soc": soc / 10.0 if soc != 0x3FFF else None,
-            "consumed_ah": consumed_ah / 10 if consumed_ah != 0xFFFFF else None,
-            "battery_temperature": (
-                (temperature - 40) if temperature != 0x7F else None
-            ),
-        }
-
-        return parsed
+    readout_type = 0xA
+
+    layout = Layout(
+        Field("error_flags", 8),
+        Field("remaining_mins", 16, not_available=0xFFFF),
+        Field("voltage", 16, signed=True, not_available=0x7FFF, scale=100),
+        Field("current", 16, signed=True, not_available=0x7FFF, scale=10),
+        Field("io_status", 16),
+        Field("alarm_flags", 18),
+        Field("soc", 10, not_available=0x3FFF, scale=10.0),
+        Field("consumed_ah", 20, not_available=0xFFFFF, scale=10),
+        Field("battery_temperature", 7, not_available=0x7F, offset=-40),
+    )
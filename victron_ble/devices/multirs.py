@@ -1,8 +1,14 @@
-import struct
 from enum import Enum
 from typing import Optional
 
-from victron_ble.devices.base import ACInState, ChargerError, Device, DeviceData
+from victron_ble.devices.base import (
+    ACInState,
+    ChargerError,
+    Device,
+    DeviceData,
+    Field,
+    Layout,
+)
 
 
 class MultiRSOperationMode(Enum):
@@ -35,6 +41,8 @@ class MultiRSData(DeviceData):
     Class holding parsed data from a MultiRS device.
     """
 
+    __slots__ = ()
+
     def get_device_state(self) -> Optional[MultiRSOperationMode]:
         """
         Return an enum indicating the current device state
@@ -96,43 +104,22 @@ class MultiRS(Device):
     """
 
     data_type = MultiRSData
-
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        """
-        Parse the decrypted BLE advertisement data and return a MultiRSData object.
-        """
-        (
-            device_state,
-            charger_error,
-            battery_current,
-            battery_voltage_ac_in,
-            active_ac_in_power,
-            active_ac_out_power,
-            pv_power,
-            yield_today,
-        ) = struct.unpack("<bbhHhhHH", decrypted[:14])
-
-        battery_voltage = (battery_voltage_ac_in & 0x3FFF) / 100.0
-        active_ac_in = (battery_voltage_ac_in >> 14) & 0x03
-
-        return {
-            "device_state": (
-                MultiRSOperationMode(device_state) if device_state != 0xFF else None
-            ),
-            "charger_error": (
-                ChargerError(charger_error) if charger_error != 0xFF else None
-            ),
-            "battery_current": (
-                battery_current / 10.0 if battery_current != 0x7FFF else None
-            ),
-            "battery_voltage": battery_voltage,
-            "active_ac_in": ACInState(active_ac_in) if active_ac_in != 0x03 else None,
-            "active_ac_in_power": (
-                active_ac_in_power if active_ac_in_power != 0x7FFF else None
-            ),
-            "active_ac_out_power": (
-                active_ac_out_power if active_ac_out_power != 0x7FFF else None
-            ),
-            "pv_power": pv_power if pv_power != 0xFFFF else None,
-            "yield_today": yield_today / 100.0 if yield_today != 0xFFFF else None,
-        }
+    readout_type = 0xB
+
+    layout = Layout(
+        Field(
+            "device_state",
+            8,
+            signed=True,
+            not_available=0xFF,
+            enum=MultiRSOperationMode,
+        ),
+        Field("charger_error", 8, signed=True, not_available=0xFF, enum=ChargerError),
+        Field("battery_current", 16, signed=True, not_available=0x7FFF, scale=10.0),
+        Field("battery_voltage", 14, scale=100.0),
+        Field("active_ac_in", 2, not_available=0x03, enum=ACInState),
+        Field("active_ac_in_power", 16, signed=True, not_available=0x7FFF),
+        Field("active_ac_out_power", 16, signed=True, not_available=0x7FFF),
+        Field("pv_power", 16, not_available=0xFFFF),
+        Field("yield_today", 16, not_available=0xFFFF, scale=100.0),
+    )
@@ -1,16 +1,19 @@
 from typing import Optional
 
 from victron_ble.devices.base import (
-    BitReader,
     ChargerError,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OffReason,
     OperationMode,
 )
 
 
 class OrionXSData(DeviceData):
+    __slots__ = ()
+
     def get_charge_state(self) -> Optional[OperationMode]:
         """
         Return an enum indicating the current charging state
@@ -56,43 +59,27 @@ class OrionXSData(DeviceData):
 
 class OrionXS(Device):
     data_type = OrionXSData
+    readout_type = 0xF
 
     # Based on reverse engineering by Fabian Schmidt.
     # The record format has not been documented by Victron as of when this was implemented.
     # See https://github.com/Fabian-Schmidt/esphome-victron_ble/pull/54
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Charge State:   0 - Off
         #                 3 - Bulk
         #                 4 - Absorption
         #                 5 - Float
-        device_state = reader.read_unsigned_int(8)
+        Field("device_state", 8, not_available=0xFF, enum=OperationMode),
         # Charger Error Code
-        charger_error = reader.read_unsigned_int(8)
+        Field("charger_error", 8, not_available=0xFF, enum=ChargerError),
         # Output voltage in 0.01V
-        output_voltage = reader.read_unsigned_int(16)
+        Field("output_voltage", 16, not_available=0xFFFF, scale=100),
         # Output current in 0.1A
-        output_current = reader.read_unsigned_int(16)
+        Field("output_current", 16, not_available=0xFFFF, scale=10),
         # Input voltage reading in 0.01V increments
-        input_voltage = reader.read_unsigned_int(16)
+        Field("input_voltage", 16, not_available=0xFFFF, scale=100),
         # Input current in 0.1A
-        input_current = reader.read_unsigned_int(16)
+        Field("input_current", 16, not_available=0xFFFF, scale=10),
         # Reason for Charger Off
-        off_reason = reader.read_unsigned_int(32)
-
-        return {
-            "device_state": (
-                OperationMode(device_state) if device_state != 0xFF else None
-            ),
-            "charger_error": (
-                ChargerError(charger_error) if charger_error != 0xFF else None
-            ),
-            "output_voltage": (
-                output_voltage / 100 if output_voltage != 0xFFFF else None
-            ),
-            "output_current": output_current / 10 if output_current != 0xFFFF else None,
-            "input_voltage": input_voltage / 100 if input_voltage != 0xFFFF else None,
-            "input_current": input_current / 10 if input_current != 0xFFFF else None,
-            "off_reason": OffReason(off_reason),
-        }
+        Field("off_reason", 32, enum=OffReason),
+    )
@@ -0,0 +1,79 @@
+import struct
+from typing import Dict, NamedTuple, Optional, Set, Tuple, Type
+
+from victron_ble.devices.base import Device
+
+_HEADER = struct.Struct("<HB")
+
+
+class DetectionResult(NamedTuple):
+    device_type: Optional[Type[Device]]
+    model_id: Optional[int] = None
+    readout_type: Optional[int] = None
+    # Why no parser was found, None if detection succeeded
+    reason: Optional[str] = None
+
+
+class DeviceRegistry:
+    """
+    Maps the model ID and readout type of an advertisement to a parser class.
+
+    Model-specific registrations take precedence over readout types. Lookups
+    are memoized per (model ID, readout type) pair.
+    """
+
+    def __init__(self) -> None:
+        self._readout_types: Dict[int, Type[Device]] = {}
+        self._models: Dict[int, Type[Device]] = {}
+        self._cache: Dict[Tuple[int, int], Optional[Type[Device]]] = {}
+
+    def register(
+        self, device_type: Type[Device], readout_type: Optional[int] = None
+    ) -> None:
+        """
+        Register a parser for a readout type, defaulting to its readout_type
+        """
+        if readout_type is None:
+            readout_type = device_type.readout_type
+        if readout_type is None:
+            raise ValueError(f"{device_type.__name__} does not define a readout_type")
+        self._readout_types[readout_type] = device_type
+        self._cache.clear()
+
+    def register_model(self, model_id: int, device_type: Type[Device]) -> None:
+        """
+        Force a parser for a model ID regardless of its readout type
+        """
+        self._models[model_id] = device_type
+        self._cache.clear()
+
+    def device_types(self) -> Set[Type[Device]]:
+        """
+        Return every registered parser class
+        """
+        return set(self._readout_types.values()) | set(self._models.values())
+
+    def lookup(self, model_id: int, readout_type: int) -> Optional[Type[Device]]:
+        key = (model_id, readout_type)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        match = self._models.get(model_id) or self._readout_types.get(readout_type)
+        self._cache[key] = match
+        return match
+
+    def detect(self, data: bytes) -> DetectionResult:
+        if len(data) < _HEADER.size + 2:
+            return DetectionResult(None, reason="Advertisement is too short")
+
+        model_id, readout_type = _HEADER.unpack_from(data, 2)
+        device_type = self.lookup(model_id, readout_type)
+        if device_type is None:
+            return DetectionResult(
+                None,
+                model_id,
+                readout_type,
+                f"Unsupported readout type 0x{readout_type:X} for model 0x{model_id:X}",
+            )
+        return DetectionResult(device_type, model_id, readout_type)
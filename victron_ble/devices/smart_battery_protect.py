@@ -3,10 +3,11 @@ from typing import Optional
 
 from victron_ble.devices.base import (
     AlarmReason,
-    BitReader,
     ChargerError,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OffReason,
     OperationMode,
 )
@@ -19,6 +20,8 @@ class OutputState(Enum):
 
 
 class SmartBatteryProtectData(DeviceData):
+    __slots__ = ()
+
     def get_device_state(self) -> Optional[OperationMode]:
         """
         Return the device state
@@ -70,32 +73,15 @@ class SmartBatteryProtectData(DeviceData):
 
 class SmartBatteryProtect(Device):
     data_type = SmartBatteryProtectData
-
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
-        device_state = reader.read_unsigned_int(8)
-        output_state = reader.read_unsigned_int(8)
-        error_code = reader.read_unsigned_int(8)
-        alarm_reason = reader.read_unsigned_int(16)
-        warning_reason = reader.read_unsigned_int(16)
-        input_voltage = reader.read_signed_int(16)
-        output_voltage = reader.read_unsigned_int(16)
-        off_reason = reader.read_unsigned_int(32)
-
-        return {
-            "device_state": (
-                OperationMode(device_state) if device_state != 0xFF else None
-            ),
-            "output_state": (
-                OutputState(output_state) if output_state != 0xFF else None
-            ),
-            "error_code": (ChargerError(error_code) if error_code != 0xFF else None),
-            "alarm_reason": AlarmReason(alarm_reason),
-            "warning_reason": AlarmReason(warning_reason),
-            "input_voltage": (input_voltage / 100 if input_voltage != 0x7FFF else None),
-            "output_voltage": (
-                output_voltage / 100 if output_voltage != 0xFFFF else None
-            ),
-            "off_reason": OffReason(off_reason),
-        }
+    readout_type = 0x9
+
+    layout = Layout(
+        Field("device_state", 8, not_available=0xFF, enum=OperationMode),
+        Field("output_state", 8, not_available=0xFF, enum=OutputState),
+        Field("error_code", 8, not_available=0xFF, enum=ChargerError),
+        Field("alarm_reason", 16, enum=AlarmReason),
+        Field("warning_reason", 16, enum=AlarmReason),
+        Field("input_voltage", 16, signed=True, not_available=0x7FFF, scale=100),
+        Field("output_voltage", 16, not_available=0xFFFF, scale=100),
+        Field("off_reason", 32, enum=OffReason),
+    )
@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import Optional
+from typing import Any, Mapping, Optional
 
-from victron_ble.devices.base import BitReader, Device, DeviceData
+from victron_ble.devices.base import Device, DeviceData, Field, Layout
 
 
 class BalancerStatus(Enum):
@@ -12,6 +12,8 @@ class BalancerStatus(Enum):
 
 
 class SmartLithiumData(DeviceData):
+    __slots__ = ()
+
     def get_bms_flags(self) -> int:
         """
         Get the raw bms_flags field (meaning not documented).
@@ -49,37 +51,53 @@ class SmartLithiumData(DeviceData):
         return self._data["balancer_status"]
 
 
+def parse_cell_voltage(payload: int) -> Optional[float]:
+    return {0x00: float("-inf"), 0x7E: float("inf"), 0x7F: None}.get(
+        payload, (260 + payload) / 100.0
+    )
+
+
+def encode_cell_voltage(voltage: Optional[float]) -> int:
+    if voltage is None:
+        return 0x7F
+    if voltage == float("-inf"):
+        return 0x00
+    if voltage == float("inf"):
+        return 0x7E
+    return round(voltage * 100) - 260
+
+
 class SmartLithium(Device):
     data_type = SmartLithiumData
+    readout_type = 0x5
+
+    layout = Layout(
+        Field("bms_flags", 32),
+        Field("error_flags", 16),
+        *(
+            Field(
+                f"cell_voltage{cell}",
+                7,
+                transform=parse_cell_voltage,
+                inverse=encode_cell_voltage,
+            )
+            for cell in range(8)
+        ),
+        Field("battery_voltage", 12, not_available=0x0FFF, scale=100.0),
+        Field("balancer_status", 4, not_available=0xF, enum=BalancerStatus),
+        # Celsius
+        Field("battery_temperature", 7, not_available=0x7F, offset=-40),
+    )
 
     def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-        bms_flags = reader.read_unsigned_int(32)
-        error_flags = reader.read_unsigned_int(16)
-        cell_voltages = [reader.read_unsigned_int(7) for _ in range(8)]
-        battery_voltage = reader.read_unsigned_int(12)
-        balancer_status = reader.read_unsigned_int(4)
-        battery_temperature = reader.read_unsigned_int(7)
-
-        parsed = {
-            "bms_flags": bms_flags,
-            "error_flags": error_flags,
-            "cell_voltages": [parse_cell_voltage(v) for v in cell_voltages],
-            "battery_voltage": (
-                battery_voltage / 100.0 if battery_voltage != 0x0FFF else None
-            ),
-            "balancer_status": (
-                BalancerStatus(balancer_status) if balancer_status != 0xF else None
-            ),
-            "battery_temperature": (
-                (battery_temperature - 40) if battery_temperature != 0x7F else None
-            ),  # Celsius
-        }
-
+        parsed = self.layout.unpack(decrypted)
+        parsed["cell_voltages"] = [
+            parsed.pop(f"cell_voltage{cell}") for cell in range(8)
+        ]
         return parsed
 
-
-def parse_cell_voltage(payload: int) -> Optional[float]:
-    return {0x00: float("-inf"), 0x7E: float("inf"), 0x7F: None}.get(
-        payload, (260 + payload) / 100.0
-    )
+    def encode(self, values: Mapping[str, Any]) -> bytes:
+        values = dict(values)
+        for cell, voltage in enumerate(values.pop("cell_voltages", [None] * 8)):
+            values[f"cell_voltage{cell}"] = voltage
+        return super().encode(values)
@@ -1,15 +1,18 @@
 from typing import Optional
 
 from victron_ble.devices.base import (
-    BitReader,
     ChargerError,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OperationMode,
 )
 
 
 class SolarChargerData(DeviceData):
+    __slots__ = ()
+
     def get_charge_state(self) -> Optional[OperationMode]:
         """
         Return an enum indicating the current charging state
@@ -55,45 +58,35 @@ class SolarChargerData(DeviceData):
 
 class SolarCharger(Device):
     data_type = SolarChargerData
+    readout_type = 0x1
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Charge State:   0 - Off
         #                 3 - Bulk
         #                 4 - Absorption
         #                 5 - Float
-        charge_state = reader.read_unsigned_int(8)
-        charger_error = reader.read_unsigned_int(8)
+        Field("charge_state", 8, not_available=0xFF, enum=OperationMode),
+        Field("charger_error", 8, not_available=0xFF, enum=ChargerError),
         # Battery voltage reading in 0.01V increments
-        battery_voltage = reader.read_signed_int(16)
+        Field("battery_voltage", 16, signed=True, not_available=0x7FFF, scale=100),
         # Battery charging Current reading in 0.1A increments
-        battery_charging_current = reader.read_signed_int(16)
+        Field(
+            "battery_charging_current",
+            16,
+            signed=True,
+            not_available=0x7FFF,
+            scale=10,
+        ),
         # Todays solar power yield in 10Wh increments
-        yield_today = reader.read_unsigned_int(16)
+        Field(
+            "yield_today",
+            16,
+            not_available=0xFFFF,
+            transform=lambda v: v * 10,
+            inverse=lambda v: round(v / 10),
+        ),
         # Current power from solar in 1W increments
-        solar_power = reader.read_unsigned_int(16)
+        Field("solar_power", 16, not_available=0xFFFF),
         # External device load in 0.1A increments
-        external_device_load = reader.read_unsigned_int(9)
-
-        return {
-            "charge_state": (
-                OperationMode(charge_state) if charge_state != 0xFF else None
-            ),
-            "charger_error": (
-                ChargerError(charger_error) if charger_error != 0xFF else None
-            ),
-            "battery_voltage": (
-                battery_voltage / 100 if battery_voltage != 0x7FFF else None
-            ),
-            "battery_charging_current": (
-                battery_charging_current / 10
-                if battery_charging_current != 0x7FFF
-                else None
-            ),
-            "yield_today": yield_today * 10 if yield_today != 0xFFFF else None,
-            "solar_power": solar_power if solar_power != 0xFFFF else None,
-            "external_device_load": (
-                external_device_load / 10 if external_device_load != 0x1FF else None
-            ),
-        }
+        Field("external_device_load", 9, not_available=0x1FF, scale=10),
+    )
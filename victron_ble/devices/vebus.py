@@ -3,14 +3,17 @@ from typing import Optional
 from victron_ble.devices.base import (
     ACInState,
     AlarmNotification,
-    BitReader,
     Device,
     DeviceData,
+    Field,
+    Layout,
     OperationMode,
 )
 
 
 class VEBusData(DeviceData):
+    __slots__ = ()
+
     def get_device_state(self) -> Optional[OperationMode]:
         """
         Return an enum indicating the device state
@@ -74,49 +77,27 @@ class VEBusData(DeviceData):
 
 class VEBus(Device):
     data_type = VEBusData
+    readout_type = 0xC
 
-    def parse_decrypted(self, decrypted: bytes) -> dict:
-        reader = BitReader(decrypted)
-
+    layout = Layout(
         # Device state
-        device_state = reader.read_unsigned_int(8)
+        Field("device_state", 8, not_available=0xFF, enum=OperationMode),
         # VE.Bus error (docs do not explain how to interpret)
-        error = reader.read_unsigned_int(8)
+        Field("error", 8, not_available=0xFF),
         # Battery charging Current reading in 0.1A increments
-        battery_current = reader.read_signed_int(16)
+        Field("battery_current", 16, signed=True, not_available=0x7FFF, scale=10),
         # Battery voltage reading in 0.01V increments (14 bits)
+        Field("battery_voltage", 14, not_available=0x3FFF, scale=100),
         # Active AC in state (enum) (2 bits)
-        battery_voltage = reader.read_unsigned_int(14)
-        # AC input active
-        ac_in_state = reader.read_unsigned_int(2)
+        Field("ac_in_state", 2, not_available=3, enum=ACInState),
         # Active AC in power in 1W increments (19 bits, signed)
-        ac_in_power = reader.read_signed_int(19)
+        Field("ac_in_power", 19, signed=True, not_available=0x3FFFF),
         # AC out power in 1W increments (19 bits, signed)
-        ac_out_power = reader.read_signed_int(19)
+        Field("ac_out_power", 19, signed=True, not_available=0x3FFFF),
         # Alarm (enum but docs say "to be defined") (2 bits)
-        alarm = reader.read_unsigned_int(2)
+        Field("alarm", 2, not_available=3, enum=AlarmNotification),
         # Battery temperature in 1 degree celcius increments (7 bits)
-        battery_temperature = reader.read_unsigned_int(7)
+        Field("battery_temperature", 7, not_available=0x7F, offset=-40),
         # Battery state of charge in 1% increments (7 bits)
-        soc = reader.read_unsigned_int(7)
-
-        return {
-            "device_state": (
-                OperationMode(device_state) if device_state != 0xFF else None
-            ),
-            "error": error if error != 0xFF else None,
-            "battery_voltage": (
-                battery_voltage / 100 if battery_voltage != 0x3FFF else None
-            ),
-            "battery_current": (
-                battery_current / 10 if battery_current != 0x7FFF else None
-            ),
-            "ac_in_state": ACInState(ac_in_state) if ac_in_state != 3 else None,
-            "ac_in_power": ac_in_power if ac_in_power != 0x3FFFF else None,
-            "ac_out_power": ac_out_power if ac_out_power != 0x3FFFF else None,
-            "alarm": (AlarmNotification(alarm) if alarm != 3 else None),
-            "battery_temperature": (
-                battery_temperature - 40 if battery_temperature != 0x7F else None
-            ),
-            "soc": soc if soc != 0x7F else None,
-        }
+        Field("soc", 7, not_available=0x7F),
+    )
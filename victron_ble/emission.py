@@ -0,0 +1,117 @@
+"""
+Policies that decide which parsed readings are output.
+
+Devices advertise several times per second, mostly with nearly identical
+values. An emission policy passes the first reading of a device and
+significant changes immediately, and other readings at most once per
+interval. Significant changes are enum fields changing (charge state, alarm
+reason, ...) and numeric fields moving further than their deadband away
+from the value last emitted.
+"""
+
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type
+
+from victron_ble.devices import DeviceData, default_registry
+from victron_ble.state import field_values, is_number
+
+
+@dataclass(frozen=True)
+class EmissionPolicy:
+    # Seconds between emissions without a significant change; 0 emits every
+    # reading and None only emits significant changes
+    interval: Optional[float] = 0.0
+    # Field name -> the change of a numeric field that is emitted immediately
+    deadbands: Mapping[str, float] = field(default_factory=dict)
+    emit_on_enum_change: bool = True
+
+    def is_significant(self, old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+        """
+        Return whether values changed significantly from the last emitted ones
+        """
+        for name, value in new.items():
+            previous = old.get(name)
+            if previous == value:
+                continue
+            if self.emit_on_enum_change and (
+                isinstance(value, Enum) or isinstance(previous, Enum)
+            ):
+                return True
+            deadband = self.deadbands.get(name)
+            if deadband is None:
+                continue
+            if not (is_number(value) and is_number(previous)):
+                # Becoming (un)available
+                return True
+            if abs(value - previous) > deadband:
+                return True
+        return False
+
+
+class EmissionFilter:
+    """
+    Applies emission policies per device.
+
+    Policies can be given per address or per device class name (such as
+    "SolarCharger"), both case insensitive; other devices use the default
+    policy, or have all their readings emitted without one.
+    """
+
+    def __init__(
+        self,
+        default: Optional[EmissionPolicy] = None,
+        policies: Optional[Dict[str, EmissionPolicy]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.default = default
+        self.policies = {
+            key.lower(): policy for key, policy in (policies or {}).items()
+        }
+        self._clock = clock
+        # address -> (time, values) of the last emitted reading
+        self._emitted: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._device_names: Dict[Type[DeviceData], str] = {}
+        self.emitted = 0
+        self.suppressed = 0
+
+    def policy_for(self, address: str, data: DeviceData) -> Optional[EmissionPolicy]:
+        policy = self.policies.get(address.lower())
+        if policy is None:
+            policy = self.policies.get(self._device_name(type(data)), self.default)
+        return policy
+
+    def should_emit(
+        self, address: str, data: DeviceData, timestamp: Optional[float] = None
+    ) -> bool:
+        policy = self.policy_for(address, data)
+        if policy is None or policy.interval == 0:
+            self.emitted += 1
+            return True
+
+        address = address.lower()
+        now = self._clock() if timestamp is None else timestamp
+        values = field_values(data)
+        last = self._emitted.get(address)
+        if (
+            last is None
+            or (policy.interval is not None and now - last[0] >= policy.interval)
+            or policy.is_significant(last[1], values)
+        ):
+            self._emitted[address] = (now, values)
+            self.emitted += 1
+            return True
+        self.suppressed += 1
+        return False
+
+    def _device_name(self, data_type: Type[DeviceData]) -> str:
+        name = self._device_names.get(data_type)
+        if name is None:
+            name = data_type.__name__
+            for device_type in default_registry.device_types():
+                if device_type.data_type is data_type:
+                    name = device_type.__name__
+                    break
+            name = self._device_names[data_type] = name.lower()
+        return name
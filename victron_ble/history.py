@@ -0,0 +1,160 @@
+"""
+Recent readings of devices in fixed-size ring buffers.
+
+Every numeric getter of a device's data (including enums, stored as their
+value) gets a column of doubles, next to a timestamp column; unavailable
+values are stored as NaN. Each column is an array twice the capacity that
+every value is written to twice, at i and i + capacity, so the most recent n
+readings are always contiguous. Appends are O(1) and do not allocate, and
+windows are memoryviews of the columns that can be wrapped without copying,
+e.g. with numpy.frombuffer(). Views are only valid until the readings they
+cover are overwritten.
+"""
+
+import math
+import time
+import typing
+from array import array
+from bisect import bisect_left
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from victron_ble.devices import Device, DeviceData
+from victron_ble.serializer import serializer_for
+
+TIMESTAMP = "timestamp"
+
+
+def numeric_fields(data_type: Type[DeviceData]) -> List[Tuple[str, Callable]]:
+    """
+    Return the name and getter of the fields of the data type with numeric or
+    enum values, by the return annotations of the getters
+    """
+    fields = []
+    for name, getter, _ in serializer_for(data_type).fields:
+        try:
+            annotation = typing.get_type_hints(getter).get("return")
+        except Exception:
+            continue
+        candidates = typing.get_args(annotation) or (annotation,)
+        if any(
+            isinstance(candidate, type) and issubclass(candidate, (int, float, Enum))
+            for candidate in candidates
+        ):
+            fields.append((name, getter))
+    return fields
+
+
+class DeviceHistory:
+    """
+    The most recent readings of one device, up to its capacity
+    """
+
+    def __init__(self, data_type: Type[DeviceData], capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.data_type = data_type
+        self.capacity = capacity
+        self._getters = numeric_fields(data_type)
+        self._columns: Dict[str, array] = {
+            name: array("d", bytes(16 * capacity))
+            for name in [TIMESTAMP] + [name for name, _ in self._getters]
+        }
+        self._timestamps = self._columns[TIMESTAMP]
+        self._writers = [
+            (getter, self._columns[name]) for name, getter in self._getters
+        ]
+        self._next = 0
+        self._count = 0
+
+    @property
+    def fields(self) -> List[str]:
+        return [name for name, _ in self._getters]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, data: DeviceData, timestamp: float) -> None:
+        index = self._next
+        mirror = index + self.capacity
+        self._timestamps[index] = self._timestamps[mirror] = timestamp
+        for getter, column in self._writers:
+            value = getter(data)
+            if value is None:
+                value = math.nan
+            elif isinstance(value, Enum):
+                value = value.value
+            column[index] = column[mirror] = value
+        self._next = index + 1 if index + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def last(self, count: Optional[int] = None) -> Dict[str, memoryview]:
+        """
+        Return views of the columns over the most recent readings, oldest
+        first, keyed by field name and "timestamp"
+        """
+        count = self._count if count is None else max(0, min(count, self._count))
+        end = self._next + self.capacity
+        start = end - count
+        return {
+            name: memoryview(column)[start:end]
+            for name, column in self._columns.items()
+        }
+
+    def since(self, timestamp: float) -> Dict[str, memoryview]:
+        """
+        Return views of the columns over the readings at or after timestamp
+        """
+        timestamps = self.last()[TIMESTAMP]
+        return self.last(len(timestamps) - bisect_left(timestamps, timestamp))
+
+
+class History:
+    """
+    Ring buffers of the recent readings of devices, by address.
+
+    The capacity of the buffers can be set per device type, for instance to
+    keep the same time span of devices advertising at different rates.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 3600,
+        capacities: Optional[Dict[Type[Device], int]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.capacity = capacity
+        self.capacities: Dict[Type[DeviceData], int] = {
+            device_type.data_type: capacity
+            for device_type, capacity in (capacities or {}).items()
+        }
+        self._clock = clock
+        self._devices: Dict[str, DeviceHistory] = {}
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __contains__(self, address: str) -> bool:
+        return address.lower() in self._devices
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._devices)
+
+    def get(self, address: str) -> Optional[DeviceHistory]:
+        return self._devices.get(address.lower())
+
+    def append(
+        self, address: str, data: DeviceData, timestamp: Optional[float] = None
+    ) -> None:
+        address = address.lower()
+        history = self._devices.get(address)
+        if history is None or history.data_type is not type(data):
+            data_type = type(data)
+            history = self._devices[address] = DeviceHistory(
+                data_type, self.capacities.get(data_type, self.capacity)
+            )
+        history.append(data, self._clock() if timestamp is None else timestamp)
+
+    def remove(self, address: str) -> None:
+        self._devices.pop(address.lower(), None)
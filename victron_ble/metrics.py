@@ -0,0 +1,144 @@
+"""
+Optional instrumentation of the stages advertisements go through.
+
+A scanner given a Metrics instance counts events and records the time spent
+in each stage, labelled by device class where it is known. Without one, the
+instrumented code paths only check for None.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stages timed by the scanners
+FILTER = "filter"
+DETECT = "detect"
+DECRYPT = "decrypt"
+PARSE = "parse"
+SERIALIZE = "serialize"
+OUTPUT = "output"
+
+# Upper bounds of the latency buckets in seconds, doubling from 1us to ~1s
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(1e-6 * 2**i for i in range(21))
+
+
+class Histogram:
+    """
+    Counts of observed values in fixed buckets, plus their sum and maximum
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        # The last bucket holds values above the largest bound
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Return the upper bound of the bucket holding the given quantile
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """
+    Event counters and stage latency histograms, labelled by device class.
+
+    Labels are free-form strings; events that do not belong to one device
+    class use the empty label.
+    """
+
+    def __init__(self) -> None:
+        self.counters: Dict[Tuple[str, str], int] = Counter()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def inc(self, name: str, label: str = "", amount: int = 1) -> None:
+        self.counters[(name, label)] += amount
+
+    def observe(self, stage: str, seconds: float, label: str = "") -> None:
+        histogram = self.histograms.get((stage, label))
+        if histogram is None:
+            histogram = self.histograms[(stage, label)] = Histogram()
+        histogram.observe(seconds)
+
+    def counter(self, name: str, label: str = "") -> int:
+        return self.counters.get((name, label), 0)
+
+    def histogram(self, stage: str, label: str = "") -> Optional[Histogram]:
+        return self.histograms.get((stage, label))
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Return the counters and stage latencies nested by name and label
+        """
+        counters: Dict[str, Dict[str, Any]] = {}
+        for (name, label), value in sorted(self.counters.items()):
+            counters.setdefault(name, {})[label] = value
+        stages: Dict[str, Dict[str, Any]] = {}
+        for (stage, label), histogram in sorted(self.histograms.items()):
+            stages.setdefault(stage, {})[label] = histogram.snapshot()
+        return {"counters": counters, "stages": stages}
+
+    def summary(self) -> str:
+        lines = []
+        for (name, label), value in sorted(self.counters.items()):
+            lines.append(f"{name}{_suffix(label)}: {value}")
+        for (stage, label), histogram in sorted(self.histograms.items()):
+            lines.append(
+                f"{stage}{_suffix(label)}: {histogram.count} in "
+                f"{histogram.total * 1e3:.1f}ms, mean {histogram.mean * 1e6:.1f}us, "
+                f"p99 {histogram.quantile(0.99) * 1e6:.1f}us, "
+                f"max {histogram.max * 1e6:.1f}us"
+            )
+        return "\n".join(lines)
+
+
+def _suffix(label: str) -> str:
+    return f" [{label}]" if label else ""
+
+
+async def log_summaries(metrics: Metrics, interval: float) -> None:
+    """
+    Log a summary of the metrics every interval seconds, until cancelled
+    """
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"Metrics:\n{metrics.summary()}")
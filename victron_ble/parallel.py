@@ -0,0 +1,233 @@
+"""
+Parsing of advertisements in worker processes, sharded by device address.
+
+Every address is assigned to one single-process executor, so each worker owns
+the Device instances (and cipher state) of its addresses and results for one
+device are produced in the order they were submitted. Workers detect device
+types with the default registry; parsers registered at runtime are only
+visible to them if they are registered before the first advertisement is
+submitted and processes are forked.
+"""
+
+import asyncio
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from victron_ble.devices import Device, DeviceData, default_registry
+from victron_ble.exceptions import AdvertisementKeyMissingError, UnknownDeviceError
+
+# Per-process state of a worker, set up by _init_worker
+_worker_keys: Dict[str, str] = {}
+_worker_devices: Dict[str, Device] = {}
+_worker_keystream_cache_size = 0
+
+
+def _init_worker(device_keys: Dict[str, str], keystream_cache_size: int) -> None:
+    global _worker_keystream_cache_size
+    _worker_keys.clear()
+    _worker_keys.update(device_keys)
+    _worker_devices.clear()
+    _worker_keystream_cache_size = keystream_cache_size
+
+
+def _parse(address: str, data: bytes) -> DeviceData:
+    device = _worker_devices.get(address)
+    if device is None:
+        try:
+            key = _worker_keys[address]
+        except KeyError:
+            raise AdvertisementKeyMissingError(f"No key available for {address}")
+        detection = default_registry.detect(data)
+        if detection.device_type is None:
+            raise UnknownDeviceError(
+                f"Could not identify device type for {address}: {detection.reason}"
+            )
+        device = _worker_devices[address] = detection.device_type(
+            key, keystream_cache_size=_worker_keystream_cache_size
+        )
+    return device.parse(data)
+
+
+def _parse_chunk(chunk: List[Tuple[str, bytes]]) -> List[Tuple[bool, Any]]:
+    results: List[Tuple[bool, Any]] = []
+    for address, data in chunk:
+        try:
+            results.append((True, _parse(address, data)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+def _resolve(
+    futures: List["asyncio.Future[DeviceData]"], chunk: asyncio.Future
+) -> None:
+    if chunk.cancelled():
+        for future in futures:
+            future.cancel()
+        return
+    error = chunk.exception()
+    if error is not None:
+        # The worker itself failed, e.g. it was killed
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(error)
+        return
+    for future, (ok, value) in zip(futures, chunk.result()):
+        if future.cancelled():
+            continue
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+
+class ShardedParser:
+    """
+    Parses advertisements in worker processes sharded by device address.
+
+    submit() is used from the event loop: advertisements submitted within one
+    loop iteration are sent to their worker as a single chunk (of at most
+    max_batch items) to keep the inter-process overhead per advertisement low.
+    parse_many() is a synchronous variant for bulk processing. Within the
+    event loop, stop with aclose(), which parses the advertisements submitted
+    so far before shutting the workers down; close() is for synchronous use.
+    """
+
+    def __init__(
+        self,
+        device_keys: Dict[str, str],
+        workers: int = 2,
+        keystream_cache_size: int = 0,
+        max_batch: int = 256,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+        keys = {k.lower(): v for k, v in device_keys.items()}
+        self._executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_worker,
+                initargs=(keys, keystream_cache_size),
+            )
+            for _ in range(workers)
+        ]
+        self._max_batch = max_batch
+        self._pending: List[List[Tuple[str, bytes, "asyncio.Future[DeviceData]"]]] = [
+            [] for _ in range(workers)
+        ]
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # Chunks sent to a worker whose results have not been resolved yet
+        self._outstanding: Set["asyncio.Future[List[Tuple[bool, Any]]]"] = set()
+
+    @property
+    def workers(self) -> int:
+        return len(self._executors)
+
+    def shard(self, address: str) -> int:
+        return zlib.crc32(address.lower().encode()) % len(self._executors)
+
+    def submit(self, address: str, data: bytes) -> "asyncio.Future[DeviceData]":
+        """
+        Queue an advertisement for parsing, resolving to its DeviceData
+        """
+        loop = asyncio.get_event_loop()
+        future: "asyncio.Future[DeviceData]" = loop.create_future()
+        address = address.lower()
+        index = self.shard(address)
+        pending = self._pending[index]
+        pending.append((address, data, future))
+        if len(pending) >= self._max_batch:
+            self._flush_shard(index)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self.flush)
+        return future
+
+    def flush(self) -> None:
+        """
+        Send all queued advertisements to their workers
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for index, pending in enumerate(self._pending):
+            if pending:
+                self._flush_shard(index)
+
+    def parse_many(
+        self, advertisements: Sequence[Tuple[str, bytes]]
+    ) -> List[Union[DeviceData, Exception]]:
+        """
+        Parse (address, data) pairs, returning a DeviceData or the raised
+        exception for each of them in input order
+        """
+        positions: List[List[int]] = [[] for _ in self._executors]
+        for position, (address, _) in enumerate(advertisements):
+            positions[self.shard(address)].append(position)
+
+        chunks = []
+        for index, shard_positions in enumerate(positions):
+            for start in range(0, len(shard_positions), self._max_batch):
+                stop = start + self._max_batch
+                part = shard_positions[start:stop]
+                chunk = [
+                    (advertisements[p][0].lower(), advertisements[p][1]) for p in part
+                ]
+                chunks.append(
+                    (part, self._executors[index].submit(_parse_chunk, chunk))
+                )
+
+        results: Dict[int, Union[DeviceData, Exception]] = {}
+        for part, future in chunks:
+            for position, (_, value) in zip(part, future.result()):
+                results[position] = value
+        return [results[position] for position in range(len(advertisements))]
+
+    async def drain(self) -> None:
+        """
+        Send all queued advertisements and wait until their futures resolved
+        """
+        while True:
+            self.flush()
+            if not self._outstanding:
+                return
+            await asyncio.wait(set(self._outstanding))
+
+    async def aclose(self) -> None:
+        """
+        Drain, then shut the workers down without blocking the event loop
+        """
+        await self.drain()
+        loop = asyncio.get_event_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(None, partial(executor.shutdown, wait=True))
+                for executor in self._executors
+            )
+        )
+
+    def close(self) -> None:
+        """
+        Cancel queued advertisements and shut the workers down, blocking
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for pending in self._pending:
+            for _, _, future in pending:
+                future.cancel()
+            pending.clear()
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+
+    def _flush_shard(self, index: int) -> None:
+        pending = self._pending[index]
+        self._pending[index] = []
+        chunk = [(address, data) for address, data, _ in pending]
+        futures = [future for _, _, future in pending]
+        result = asyncio.wrap_future(self._executors[index].submit(_parse_chunk, chunk))
+        # Resolve the futures before drain() sees the chunk as done
+        result.add_done_callback(partial(_resolve, futures))
+        result.add_done_callback(self._outstanding.discard)
+        self._outstanding.add(result)
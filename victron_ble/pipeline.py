@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from enum import Enum
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Union
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedAdvertisement(NamedTuple):
+    device: BLEDevice
+    data: bytes
+    advertisement: AdvertisementData
+    # time.monotonic() at which the advertisement was received
+    timestamp: float
+
+
+class OverflowPolicy(Enum):
+    # Discard the advertisement that did not fit
+    DROP_NEWEST = "drop_newest"
+    # Discard the oldest queued advertisement to make room
+    DROP_OLDEST = "drop_oldest"
+    # Process the advertisement in the caller, pushing back on the producer
+    INLINE = "inline"
+
+
+Handler = Callable[[QueuedAdvertisement], Union[None, Awaitable[None]]]
+
+
+class Pipeline:
+    """
+    A bounded queue of advertisements drained by consumer tasks.
+
+    submit() never waits, so it can be called from the bleak detection
+    callback; when the queue is full the overflow policy decides what happens.
+    Async producers can instead await put() to wait for free space. The
+    handler may be a plain function or a coroutine function.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        maxsize: int = 1024,
+        policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+        workers: int = 1,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self._handler = handler
+        self._is_async = asyncio.iscoroutinefunction(handler)
+        self._maxsize = maxsize
+        self._policy = OverflowPolicy(policy)
+        self._num_workers = workers
+        self._queue: Optional["asyncio.Queue[QueuedAdvertisement]"] = None
+        self._workers: List["asyncio.Future[None]"] = []
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.inline = 0
+        self.errors = 0
+        self.high_water = 0
+
+    @property
+    def queue(self) -> "asyncio.Queue[QueuedAdvertisement]":
+        # Created lazily so that it binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._maxsize)
+        return self._queue
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.ensure_future(self._work()) for _ in range(self._num_workers)
+        ]
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Stop the consumer tasks, by default after the queue has been emptied
+        """
+        if drain and self._workers:
+            await self.queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, item: QueuedAdvertisement) -> bool:
+        """
+        Queue an advertisement without waiting, returning False if it was dropped
+        """
+        queue = self.queue
+        if queue.full():
+            if self._policy is OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return False
+            if self._policy is OverflowPolicy.DROP_OLDEST:
+                queue.get_nowait()
+                queue.task_done()
+                self.dropped += 1
+            elif not self._is_async:
+                self.inline += 1
+                self._handle(item)
+                return True
+            else:
+                # Async handlers cannot be run from a synchronous caller
+                self.dropped += 1
+                return False
+        queue.put_nowait(item)
+        self._enqueued()
+        return True
+
+    async def put(self, item: QueuedAdvertisement) -> None:
+        """
+        Queue an advertisement, waiting for space if the queue is full
+        """
+        await self.queue.put(item)
+        self._enqueued()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.queue.qsize(),
+            "high_water": self.high_water,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "inline": self.inline,
+            "errors": self.errors,
+        }
+
+    def _enqueued(self) -> None:
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.high_water:
+            self.high_water = depth
+
+    def _handle(self, item: QueuedAdvertisement) -> None:
+        try:
+            self._handler(item)
+        except Exception:
+            self._failed(item)
+        else:
+            self.processed += 1
+
+    async def _handle_async(self, item: QueuedAdvertisement) -> None:
+        try:
+            await self._handler(item)  # type: ignore[misc]
+        except Exception:
+            self._failed(item)
+        else:
+            self.processed += 1
+
+    def _failed(self, item: QueuedAdvertisement) -> None:
+        self.errors += 1
+        logger.exception(f"Failed to process advertisement from {item.device}")
+
+    async def _work(self) -> None:
+        queue = self.queue
+        while True:
+            item = await queue.get()
+            try:
+                if self._is_async:
+                    await self._handle_async(item)
+                else:
+                    self._handle(item)
+            finally:
+                queue.task_done()
+            # get() does not yield while items are queued; let bleak run
+            await asyncio.sleep(0)
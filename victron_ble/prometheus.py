@@ -0,0 +1,240 @@
+"""
+Export the latest readings of devices in the Prometheus text format.
+
+Every numeric value of a reading becomes a gauge named after its getter, e.g.
+victron_battery_voltage{address="...",model="..."}. Enums are exported as
+their numeric value and lists (such as cell voltages) get an index label.
+
+Readings are kept in a StateStore. The exposition is rendered incrementally:
+the samples of a device are only rendered again after the store reported a
+changed value, and the assembled text is reused until any device changes, so
+scrapes stay cheap with thousands of devices. The RSSI and timestamp gauges
+are those of the reading that changed a value last.
+"""
+
+import asyncio
+import logging
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from victron_ble.devices import DeviceData
+from victron_ble.scanner import Reading, Scanner
+from victron_ble.serializer import serializer_for
+from victron_ble.state import Changes, DeviceState, StateStore
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    return None
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class PrometheusExporter:
+    """
+    Renders the latest readings in a state store as gauges
+    """
+
+    def __init__(
+        self, namespace: str = "victron", store: Optional[StateStore] = None
+    ) -> None:
+        self.namespace = namespace
+        self.store = store if store is not None else StateStore()
+        self.store.subscribe(self._changed)
+        # address -> rendered label set
+        self._labels: Dict[str, str] = {}
+        # family -> address -> rendered samples
+        self._samples: Dict[str, Dict[str, str]] = {}
+        self._families: Dict[str, Set[str]] = {}
+        # data type -> (family, field name)
+        self._field_families: Dict[Type[DeviceData], List[Tuple[str, str]]] = {}
+        self._dirty: Set[str] = set()
+        self._text: Optional[str] = None
+        # Number of times the samples of a device were rendered
+        self.renders = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def update(
+        self,
+        address: str,
+        parsed: DeviceData,
+        rssi: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        self.store.update(address, parsed, rssi, timestamp)
+
+    def remove(self, address: str) -> None:
+        address = address.lower()
+        self.store.remove(address)
+        self._labels.pop(address, None)
+        self._dirty.discard(address)
+        self._replace(address, {})
+        self._text = None
+
+    def _changed(self, address: str, state: DeviceState, changes: Changes) -> None:
+        self._dirty.add(address)
+        self._text = None
+
+    def render(self) -> str:
+        """
+        Return the exposition text, rendering only devices that changed
+        """
+        if self._text is None:
+            for address in self._dirty:
+                state = self.store.get(address)
+                self._replace(
+                    address, self._render_device(address, state) if state else {}
+                )
+            self._dirty.clear()
+            parts = []
+            for family in sorted(self._samples):
+                parts.append(f"# TYPE {family} gauge\n")
+                parts.extend(self._samples[family].values())
+            self._text = "".join(parts)
+        return self._text
+
+    def _families_for(self, data_type: Type[DeviceData]) -> List[Tuple[str, str]]:
+        families = self._field_families.get(data_type)
+        if families is None:
+            families = self._field_families[data_type] = [
+                (f"{self.namespace}_{name}", name)
+                for name, _, _ in serializer_for(data_type).fields
+            ]
+        return families
+
+    def _render_device(self, address: str, state: DeviceState) -> Dict[str, str]:
+        self.renders += 1
+        labels = self._labels.get(address)
+        if labels is None:
+            labels = self._labels[address] = (
+                f'address="{_escape(address)}",'
+                f'model="{_escape(state.data.get_model_name())}"'
+            )
+        rendered = {}
+        for family, name in self._families_for(type(state.data)):
+            value = state.values[name]
+            if isinstance(value, (list, tuple)):
+                lines = []
+                for index, item in enumerate(value):
+                    number = _number(item)
+                    if number is not None:
+                        lines.append(
+                            f'{family}{{{labels},index="{index}"}} '
+                            f"{_format_value(number)}\n"
+                        )
+                if lines:
+                    rendered[family] = "".join(lines)
+                continue
+            number = _number(value)
+            if number is not None:
+                rendered[family] = f"{family}{{{labels}}} {_format_value(number)}\n"
+        if state.rssi is not None:
+            rendered[f"{self.namespace}_rssi"] = (
+                f"{self.namespace}_rssi{{{labels}}} {state.rssi}\n"
+            )
+        family = f"{self.namespace}_last_change_timestamp_seconds"
+        rendered[family] = f"{family}{{{labels}}} {_format_value(state.timestamp)}\n"
+        return rendered
+
+    def _replace(self, address: str, rendered: Dict[str, str]) -> None:
+        for family in self._families.pop(address, set()) - rendered.keys():
+            samples = self._samples[family]
+            del samples[address]
+            if not samples:
+                del self._samples[family]
+        for family, text in rendered.items():
+            self._samples.setdefault(family, {})[address] = text
+        if rendered:
+            self._families[address] = set(rendered)
+
+
+class ExporterScanner(Scanner):
+    """
+    A Scanner that keeps readings in the store of an exporter instead of
+    printing them
+    """
+
+    def __init__(
+        self,
+        device_keys: Dict[str, str] = {},
+        exporter: Optional[PrometheusExporter] = None,
+        **kwargs,
+    ) -> None:
+        self.exporter = exporter or PrometheusExporter()
+        super().__init__(device_keys, state=self.exporter.store, **kwargs)
+
+    def output(
+        self,
+        ble_device: BLEDevice,
+        advertisement: AdvertisementData,
+        parsed: DeviceData,
+    ) -> None:
+        self.exporter.update(ble_device.address, parsed, advertisement.rssi)
+
+    def output_batch(self, readings: List[Reading]) -> None:
+        for reading in readings:
+            self.output(*reading)
+
+
+async def serve(
+    exporter: PrometheusExporter, host: str = "0.0.0.0", port: int = 9842
+) -> asyncio.AbstractServer:
+    """
+    Serve the exposition of the exporter on /metrics over HTTP
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            # Headers are not needed
+            while (await reader.readline()).strip():
+                pass
+            parts = request.split()
+            method = parts[0] if parts else b""
+            path = parts[1].split(b"?")[0] if len(parts) > 1 else b""
+            if method not in (b"GET", b"HEAD"):
+                status, body = "405 Method Not Allowed", b""
+            elif path == b"/metrics":
+                status, body = "200 OK", exporter.render().encode()
+            else:
+                status, body = "404 Not Found", b""
+            head = (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode() + (body if method == b"GET" else b""))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,80 @@
+"""
+Recording of raw Victron advertisements and replaying them through a scanner.
+
+See victron_ble.recording_format for the format of recordings.
+"""
+
+import time
+from typing import Optional
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from victron_ble.recording_format import (
+    MAGIC,
+    RECORD_HEADER,
+    RecordedAdvertisement,
+    RecordingWriter,
+    encode_record,
+    read_recording,
+)
+from victron_ble.scanner import BaseScanner
+from victron_ble.sources import ReplaySource
+
+__all__ = [
+    "MAGIC",
+    "RECORD_HEADER",
+    "RecordedAdvertisement",
+    "Recorder",
+    "RecordingWriter",
+    "encode_record",
+    "read_recording",
+    "replay",
+]
+
+
+class Recorder(BaseScanner):
+    """
+    Writes every Victron instant readout advertisement to a recording
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0) -> None:
+        # Keep repeated advertisements so replays see the real packet rate
+        super().__init__(dedup_capacity=0)
+        self._writer = RecordingWriter(path)
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self.recorded = 0
+
+    def callback(
+        self, device: BLEDevice, data: bytes, advertisement: AdvertisementData
+    ):
+        self._writer.write(
+            RecordedAdvertisement(
+                time.time(), device.address, device.name, advertisement.rssi, data
+            )
+        )
+        self.recorded += 1
+        now = time.monotonic()
+        if now - self._last_flush >= self._flush_interval:
+            self._writer.flush()
+            self._last_flush = now
+
+    async def stop(self):
+        await super().stop()
+        self._writer.close()
+
+
+async def replay(scanner: BaseScanner, path: str, speed: Optional[float] = 1.0) -> int:
+    """
+    Feed a recording through the scanner, returning the number of
+    advertisements replayed. See ReplaySource for the meaning of speed.
+    """
+    source = ReplaySource(path, speed)
+    scanner.start_processing()
+    try:
+        await source.start(scanner._detection_callback)
+        return await source.wait()
+    finally:
+        await source.stop()
+        await scanner.stop_processing()
@@ -0,0 +1,86 @@
+"""
+The binary format of advertisement recordings.
+
+Recordings are append-only binary files: an 8 byte magic header followed by
+one record per advertisement. Each record is a fixed header (wall clock
+timestamp, RSSI and the lengths of the variable parts) followed by the UTF-8
+address, the UTF-8 name and the raw manufacturer data. The same stream is
+accepted by the UNIX socket source.
+"""
+
+import struct
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+MAGIC = b"VBLEREC1"
+
+# timestamp, rssi, address length, name length, data length
+RECORD_HEADER = struct.Struct("<dbBBH")
+
+
+class RecordedAdvertisement(NamedTuple):
+    timestamp: float
+    address: str
+    name: Optional[str]
+    rssi: int
+    data: bytes
+
+
+def encode_record(record: RecordedAdvertisement) -> bytes:
+    address = record.address.encode()
+    name = (record.name or "").encode()[:255]
+    header = RECORD_HEADER.pack(
+        record.timestamp,
+        max(-128, min(127, record.rssi)),
+        len(address),
+        len(name),
+        len(record.data),
+    )
+    return header + address + name + record.data
+
+
+class RecordingWriter:
+    """
+    Appends advertisements to a recording, creating it if needed
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file: BinaryIO = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(self, record: RecordedAdvertisement) -> None:
+        self._file.write(encode_record(record))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "RecordingWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_recording(path: str) -> Iterator[RecordedAdvertisement]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a victron_ble recording")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                # A truncated final record is left by an interrupted recorder
+                return
+            timestamp, rssi, address_len, name_len, data_len = RECORD_HEADER.unpack(
+                header
+            )
+            address = f.read(address_len)
+            name = f.read(name_len)
+            data = f.read(data_len)
+            if len(data) < data_len:
+                return
+            yield RecordedAdvertisement(
+                timestamp, address.decode(), name.decode() or None, rssi, data
+            )
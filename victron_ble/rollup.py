@@ -0,0 +1,288 @@
+"""
+Downsampling of readings into rollups per device, field and interval.
+
+Windows are aligned to the epoch (a 60 second window starts on the minute)
+and are summarized when a reading of the device falls into a later window,
+when a window of a silent device has ended, or on flush(). Numeric fields
+are summarized by count, min, max, mean and last value; enum fields by their
+last value and the number of transitions, including the transition from the
+last value of the previous window.
+
+Readings only update the window of the shortest interval. Every interval is
+a multiple of the previous one, so each closed window is merged into the
+window of the next interval instead. Memory per device is constant.
+"""
+
+import copy
+import math
+import time
+from enum import Enum
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from victron_ble.devices import DeviceData
+from victron_ble.serializer import dumps
+from victron_ble.state import field_values, is_number
+
+
+class NumericSummary:
+    __slots__ = ("count", "total", "min", "max", "last")
+
+    def __init__(self, value: float) -> None:
+        self.count = 1
+        self.total = value
+        self.min = value
+        self.max = value
+        self.last = value
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.last = value
+
+    def merge(self, other: "NumericSummary") -> None:
+        self.count += other.count
+        self.total += other.total
+        if other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        self.last = other.last
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count,
+            "last": self.last,
+        }
+
+
+class EnumSummary:
+    __slots__ = ("count", "last", "transitions")
+
+    def __init__(self, value: Enum, previous: Optional[Enum] = None) -> None:
+        self.count = 1
+        self.last = value
+        self.transitions = int(previous is not None and previous != value)
+
+    def add(self, value: Enum) -> None:
+        self.count += 1
+        if value != self.last:
+            self.transitions += 1
+            self.last = value
+
+    def merge(self, other: "EnumSummary") -> None:
+        # The transitions of other include the one from self.last
+        self.count += other.count
+        self.transitions += other.transitions
+        self.last = other.last
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "last": self.last, "transitions": self.transitions}
+
+
+Summary = Union[NumericSummary, EnumSummary]
+
+
+class Rollup(NamedTuple):
+    address: str
+    # Length of the window in seconds
+    interval: float
+    start: float
+    # Number of readings in the window
+    readings: int
+    fields: Dict[str, Summary]
+
+    @property
+    def end(self) -> float:
+        return self.start + self.interval
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "interval": self.interval,
+            "start": self.start,
+            "readings": self.readings,
+            "fields": {
+                name: summary.to_dict() for name, summary in self.fields.items()
+            },
+        }
+
+
+Sink = Callable[[Rollup], None]
+
+
+def json_lines_sink(stream: IO[str]) -> Sink:
+    """
+    Return a sink writing every rollup as a line of JSON to the stream
+    """
+
+    def write(rollup: Rollup) -> None:
+        stream.write(dumps(rollup.to_dict()) + "\n")
+
+    return write
+
+
+class _Window:
+    __slots__ = ("start", "count", "numbers", "enums")
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.count = 0
+        self.numbers: Dict[str, NumericSummary] = {}
+        self.enums: Dict[str, EnumSummary] = {}
+
+
+class Aggregator:
+    """
+    Summarizes the readings of devices over windows of the given intervals
+    and passes every completed window to the sink
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        intervals: Sequence[float] = (10.0, 60.0, 900.0),
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        intervals = sorted(intervals)
+        if not intervals or intervals[0] <= 0:
+            raise ValueError("Intervals must be positive")
+        for shorter, longer in zip(intervals, intervals[1:]):
+            ratio = longer / shorter
+            if not math.isclose(ratio, round(ratio)):
+                raise ValueError(
+                    f"Interval {longer} is not a multiple of interval {shorter}"
+                )
+        self.sink = sink
+        self.intervals = tuple(intervals)
+        self._clock = clock
+        # address -> one open window (or None) per interval
+        self._windows: Dict[str, List[Optional[_Window]]] = {}
+        # address -> the last value of every enum field
+        self._enums: Dict[str, Dict[str, Enum]] = {}
+        self._next_sweep = 0.0
+
+    def add(
+        self, address: str, data: DeviceData, timestamp: Optional[float] = None
+    ) -> None:
+        address = address.lower()
+        now = self._clock() if timestamp is None else timestamp
+        windows = self._windows.get(address)
+        if windows is None:
+            windows = self._windows[address] = [None] * len(self.intervals)
+        last_enums = self._enums.setdefault(address, {})
+
+        interval = self.intervals[0]
+        start = now - now % interval
+        window = windows[0]
+        if window is None or window.start != start:
+            if window is not None:
+                self._close(address, windows, 0)
+            window = windows[0] = _Window(start)
+        window.count += 1
+        numbers = window.numbers
+        enums = window.enums
+        for name, value in field_values(data).items():
+            if isinstance(value, Enum):
+                enum = enums.get(name)
+                if enum is None:
+                    enums[name] = EnumSummary(value, last_enums.get(name))
+                else:
+                    enum.add(value)
+                last_enums[name] = value
+            elif is_number(value):
+                number = numbers.get(name)
+                if number is None:
+                    numbers[name] = NumericSummary(value)
+                else:
+                    number.add(value)
+
+        if now >= self._next_sweep:
+            self._next_sweep = now + interval
+            self.flush(now)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """
+        Emit the windows that ended by now, or all open windows without it
+        """
+        for address, windows in self._windows.items():
+            for position, interval in enumerate(self.intervals):
+                window = windows[position]
+                if window is not None and (
+                    now is None or window.start + interval <= now
+                ):
+                    self._close(address, windows, position)
+
+    def remove(self, address: str) -> None:
+        """
+        Forget a device without emitting its open windows
+        """
+        address = address.lower()
+        self._windows.pop(address, None)
+        self._enums.pop(address, None)
+
+    def _close(
+        self,
+        address: str,
+        windows: List[Optional[_Window]],
+        position: int,
+    ) -> None:
+        """
+        Emit the window at position and merge it into the next interval,
+        closing that window first if the merged one is past its end
+        """
+        window = windows[position]
+        assert window is not None
+        windows[position] = None
+        fields: Dict[str, Summary] = {**window.numbers, **window.enums}
+        self.sink(
+            Rollup(
+                address, self.intervals[position], window.start, window.count, fields
+            )
+        )
+
+        position += 1
+        if position == len(self.intervals):
+            return
+        interval = self.intervals[position]
+        start = window.start - window.start % interval
+        parent = windows[position]
+        if parent is not None and parent.start != start:
+            self._close(address, windows, position)
+            parent = None
+        if parent is None:
+            # Copies, the summaries of the emitted rollup must not change
+            parent = windows[position] = _Window(start)
+            parent.numbers = {k: copy.copy(v) for k, v in window.numbers.items()}
+            parent.enums = {k: copy.copy(v) for k, v in window.enums.items()}
+            parent.count = window.count
+            return
+        parent.count += window.count
+        for name, number in window.numbers.items():
+            summary = parent.numbers.get(name)
+            if summary is None:
+                parent.numbers[name] = copy.copy(number)
+            else:
+                summary.merge(number)
+        for name, enum in window.enums.items():
+            enum_summary = parent.enums.get(name)
+            if enum_summary is None:
+                parent.enums[name] = copy.copy(enum)
+            else:
+                enum_summary.merge(enum)
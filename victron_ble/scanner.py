@@ -1,93 +1,323 @@
 from __future__ import annotations
 
-import inspect
+import asyncio
 import json
 import logging
+import sys
 import time
-from enum import Enum
-from typing import Set
+from functools import partial
+from typing import Dict, List, NamedTuple, Optional, Set, Union
 
-from bleak import BleakScanner
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 
-from victron_ble.devices import Device, DeviceData, detect_device_type
+from victron_ble.cache import Deduplicator, NegativeCache
+from victron_ble.devices import Device, DeviceData, default_registry
+from victron_ble.emission import EmissionFilter, EmissionPolicy
 from victron_ble.exceptions import AdvertisementKeyMissingError, UnknownDeviceError
+from victron_ble.history import History
+from victron_ble.metrics import (
+    DECRYPT,
+    DETECT,
+    FILTER,
+    OUTPUT,
+    PARSE,
+    SERIALIZE,
+    Metrics,
+    log_summaries,
+)
+from victron_ble.parallel import ShardedParser
+from victron_ble.pipeline import OverflowPolicy, Pipeline, QueuedAdvertisement
+from victron_ble.rollup import Aggregator
+from victron_ble.serializer import dumps, to_dict
+from victron_ble.sources import AdvertisementSource, BleakSource
+from victron_ble.state import StateStore
 
 logger = logging.getLogger(__name__)
 
 
+class Reading(NamedTuple):
+    device: BLEDevice
+    advertisement: AdvertisementData
+    parsed: DeviceData
+
+
 class BaseScanner:
-    def __init__(self) -> None:
-        """Initialize the scanner."""
-        self._scanner: BleakScanner = BleakScanner(
-            detection_callback=self._detection_callback
-        )
-        self._seen_data: Set[bytes] = set()
+    def __init__(
+        self,
+        negative_cache_size: int = 1024,
+        negative_cache_ttl: float = 300.0,
+        dedup_capacity: int = 1000,
+        dedup_window: Optional[float] = 60.0,
+        queue_size: int = 0,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+        queue_workers: int = 1,
+        batch_size: int = 0,
+        batch_window: float = 0.05,
+        source: Optional[AdvertisementSource] = None,
+        metrics: Optional[Metrics] = None,
+        metrics_interval: float = 0.0,
+    ) -> None:
+        """Initialize the scanner.
+
+        With a queue_size, advertisements are handed to callback() from
+        consumer tasks instead of from within the bleak detection callback.
+        With a batch_size, advertisements are collected for up to batch_window
+        seconds or batch_size advertisements and handed to callback_batch().
+        Advertisements come from the Bluetooth adapter unless another source
+        is given. Processing is instrumented if metrics are given, or if a
+        metrics_interval is set, in which case a summary of them is logged
+        every metrics_interval seconds.
+        """
+        self._source: AdvertisementSource = source or BleakSource()
+        # Identical advertisements from an address within the window are dropped
+        self._deduplicator = Deduplicator(dedup_capacity, dedup_window)
+        # Addresses whose advertisements cannot be handled, e.g. because there
+        # is no key for them. Subclasses add to this to drop them early.
+        self._rejected = NegativeCache(negative_cache_size, negative_cache_ttl)
+        self._pipeline: Optional[Pipeline] = None
+        if queue_size > 0:
+            self._pipeline = Pipeline(
+                self._process, queue_size, overflow_policy, queue_workers
+            )
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._batch: List[QueuedAdvertisement] = []
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        if metrics is None and metrics_interval > 0:
+            metrics = Metrics()
+        self.metrics = metrics
+        self._metrics_interval = metrics_interval
+        self._metrics_task: Optional[asyncio.Future[None]] = None
 
     def _detection_callback(self, device: BLEDevice, advertisement: AdvertisementData):
+        metrics = self.metrics
+        if metrics is None:
+            data = self._filter(device, advertisement)
+        else:
+            start = time.perf_counter()
+            data = self._filter(device, advertisement)
+            metrics.observe(FILTER, time.perf_counter() - start)
+        if data is None:
+            return
+
+        if self._pipeline is not None:
+            self._pipeline.submit(
+                QueuedAdvertisement(device, data, advertisement, time.monotonic())
+            )
+        elif self._batch_size > 0:
+            self._add_to_batch(
+                QueuedAdvertisement(device, data, advertisement, time.monotonic())
+            )
+        else:
+            self.callback(device, data, advertisement)
+
+    def _filter(
+        self, device: BLEDevice, advertisement: AdvertisementData
+    ) -> Optional[bytes]:
+        """
+        Return the data of an advertisement that should be processed, or None
+        """
+        if device.address in self._rejected:
+            self._count("rejected")
+            return None
+
         # Filter for Victron devices and instant readout advertisements
         data = advertisement.manufacturer_data.get(0x02E1)
-        if not data or not data.startswith(b"\x10") or data in self._seen_data:
-            return
+        if not data or not data.startswith(b"\x10"):
+            self._count("ignored")
+            return None
 
         # De-duplicate advertisements
-        if len(self._seen_data) > 1000:
-            self._seen_data = set()
-        self._seen_data.add(data)
+        if self._deduplicator.is_duplicate((device.address, data)):
+            self._count("duplicates")
+            return None
+
+        self._count("accepted")
+        return data
+
+    def _count(self, name: str, label: str = "", amount: int = 1) -> None:
+        if self.metrics is not None:
+            self.metrics.inc(name, label, amount)
+
+    def _process(self, item: QueuedAdvertisement) -> None:
+        if self._batch_size > 0:
+            self._add_to_batch(item)
+        else:
+            self.callback(item.device, item.data, item.advertisement)
 
-        self.callback(device, data, advertisement)
+    def _add_to_batch(self, item: QueuedAdvertisement) -> None:
+        self._batch.append(item)
+        if len(self._batch) >= self._batch_size:
+            self.flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = asyncio.get_event_loop().call_later(
+                self._batch_window, self.flush_batch
+            )
+
+    def flush_batch(self) -> None:
+        """
+        Hand the advertisements collected so far to callback_batch()
+        """
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, []
+        if batch:
+            self.callback_batch(batch)
 
     def callback(
         self, device: BLEDevice, data: bytes, advertisement: AdvertisementData
     ):
         raise NotImplementedError()
 
+    def callback_batch(self, items: List[QueuedAdvertisement]) -> None:
+        for item in items:
+            self.callback(item.device, item.data, item.advertisement)
+
+    def rejection_stats(self) -> Dict[str, int]:
+        """
+        Return the number of advertisements dropped per rejection reason
+        """
+        return dict(self._rejected.rejections)
+
+    def dedup_stats(self) -> Dict[str, int]:
+        """
+        Return the number of unique and dropped duplicate advertisements
+        """
+        return {
+            "unique": self._deduplicator.unique,
+            "duplicates": self._deduplicator.duplicates,
+        }
+
+    def pipeline_stats(self) -> Dict[str, int]:
+        """
+        Return queue depth and throughput counters, empty without a queue
+        """
+        if self._pipeline is None:
+            return {}
+        return self._pipeline.stats()
+
+    def start_processing(self) -> None:
+        """
+        Start handling advertisements, without starting the BLE scan
+        """
+        if self._pipeline is not None:
+            self._pipeline.start()
+        if self.metrics is not None and self._metrics_interval > 0:
+            if self._metrics_task is None:
+                self._metrics_task = asyncio.ensure_future(
+                    log_summaries(self.metrics, self._metrics_interval)
+                )
+
+    async def stop_processing(self) -> None:
+        """
+        Handle queued and batched advertisements and stop
+        """
+        if self._pipeline is not None:
+            await self._pipeline.stop()
+        self.flush_batch()
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+            self._metrics_task = None
+
     async def start(self):
-        await self._scanner.start()
+        self.start_processing()
+        await self._source.start(self._detection_callback)
 
     async def stop(self):
-        await self._scanner.stop()
+        await self._source.stop()
+        await self.stop_processing()
+
+
+def _label(device_type: Optional[type]) -> str:
+    return device_type.__name__ if device_type is not None else ""
 
 
-# An ugly hack to print a class as JSON
 class DeviceDataEncoder(json.JSONEncoder):
     def default(self, obj):
-        if issubclass(obj.__class__, DeviceData):
-            data = {}
-            for name, method in inspect.getmembers(obj, predicate=inspect.ismethod):
-                if name.startswith("get_"):
-                    value = method()
-                    if isinstance(value, Enum):
-                        value = value.name.lower()
-                    if value is not None:
-                        data[name[4:]] = value
-            return data
+        if isinstance(obj, DeviceData):
+            return to_dict(obj)
+        return super().default(obj)
 
 
 class Scanner(BaseScanner):
-    def __init__(self, device_keys: dict[str, str] = {}, indent=2):
-        super().__init__()
+    def __init__(
+        self,
+        device_keys: dict[str, str] = {},
+        indent=2,
+        keystream_cache_size: int = 0,
+        parse_workers: int = 0,
+        state: Optional[StateStore] = None,
+        emission: Union[EmissionPolicy, EmissionFilter, None] = None,
+        history: Optional[History] = None,
+        rollups: Optional[Aggregator] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        # Keeps the latest reading of every device if given
+        self.state = state
+        # Keeps the recent readings of every device, emitted or not, if given
+        self.history = history
+        # Summarizes every reading, emitted or not, if given
+        self.rollups = rollups
+        # Decides which readings are written, all of them if not given
+        if isinstance(emission, EmissionPolicy):
+            emission = EmissionFilter(emission)
+        self.emission = emission
         self._device_keys = {k.lower(): v for k, v in device_keys.items()}
+        self._keystream_cache_size = keystream_cache_size
         self._known_devices: dict[str, Device] = {}
         self._indent = indent
+        # Parse in worker processes sharded by address instead of in the loop
+        self._parser: Optional[ShardedParser] = None
+        # Futures of advertisements handed to the parser and not yet output
+        self._parsing: Set[asyncio.Future] = set()
+        if parse_workers > 0:
+            self._parser = ShardedParser(
+                self._device_keys, parse_workers, keystream_cache_size
+            )
 
     async def start(self):
         logger.info(f"Reading data for {list(self._device_keys.keys())}")
         await super().start()
 
+    async def stop_processing(self) -> None:
+        await super().stop_processing()
+        if self._parser is not None:
+            # Output what was submitted before the batches flushed above
+            await self._parser.drain()
+            while self._parsing:
+                await asyncio.wait(set(self._parsing))
+            await self._parser.aclose()
+        if self.rollups is not None:
+            self.rollups.flush()
+
     def get_device(self, ble_device: BLEDevice, raw_data: bytes) -> Device:
         address = ble_device.address.lower()
         if address not in self._known_devices:
             advertisement_key = self.load_key(address)
 
-            device_klass = detect_device_type(raw_data)
+            if self.metrics is None:
+                detection = default_registry.detect(raw_data)
+            else:
+                start = time.perf_counter()
+                detection = default_registry.detect(raw_data)
+                self.metrics.observe(
+                    DETECT,
+                    time.perf_counter() - start,
+                    _label(detection.device_type),
+                )
+            device_klass = detection.device_type
             if not device_klass:
                 raise UnknownDeviceError(
-                    f"Could not identify device type for {ble_device}"
+                    f"Could not identify device type for {ble_device}: "
+                    f"{detection.reason}"
                 )
 
-            self._known_devices[address] = device_klass(advertisement_key)
+            self._known_devices[address] = device_klass(
+                advertisement_key, keystream_cache_size=self._keystream_cache_size
+            )
         return self._known_devices[address]
 
     def load_key(self, address: str) -> str:
@@ -102,22 +332,200 @@ class Scanner(BaseScanner):
         logger.debug(
             f"Received data from {ble_device.address.lower()}: {raw_data.hex()}"
         )
+        if self._parser is not None:
+            if not self._has_key(ble_device):
+                return
+            future = self._parser.submit(ble_device.address, raw_data)
+            future.add_done_callback(partial(self._parsed, ble_device, advertisement))
+            self._track(future)
+            return
+
+        parsed = self._parse(ble_device, raw_data)
+        if parsed is not None:
+            self.output(ble_device, advertisement, parsed)
+
+    def callback_batch(self, items: List[QueuedAdvertisement]) -> None:
+        logger.debug(f"Received a batch of {len(items)} advertisements")
+        if self._parser is not None:
+            items = [item for item in items if self._has_key(item.device)]
+            futures = [
+                self._parser.submit(item.device.address, item.data) for item in items
+            ]
+            batch = asyncio.gather(*futures, return_exceptions=True)
+            batch.add_done_callback(partial(self._parsed_batch, items))
+            self._track(batch)
+            return
+
+        readings = []
+        for item in items:
+            # One bad advertisement must not drop the readings of the batch
+            try:
+                parsed = self._parse(item.device, item.data)
+            except Exception as e:
+                parsed = self._result(item.device, e)
+            if parsed is not None:
+                readings.append(Reading(item.device, item.advertisement, parsed))
+        self.output_batch(readings)
+
+    def _track(self, future: asyncio.Future) -> None:
+        # Added after the output callback, so it is output once discarded
+        self._parsing.add(future)
+        future.add_done_callback(self._parsing.discard)
+
+    def _has_key(self, ble_device: BLEDevice) -> bool:
+        if ble_device.address.lower() in self._device_keys:
+            return True
+        self._rejected.add(ble_device.address, "missing_key")
+        return False
+
+    def _parse(self, ble_device: BLEDevice, raw_data: bytes) -> Optional[DeviceData]:
         try:
             device = self.get_device(ble_device, raw_data)
         except AdvertisementKeyMissingError:
-            return
+            self._rejected.add(ble_device.address, "missing_key")
+            return None
         except UnknownDeviceError as e:
             logger.error(e)
+            self._rejected.add(ble_device.address, "unknown_device")
+            return None
+        metrics = self.metrics
+        if metrics is None:
+            return device.parse(raw_data)
+
+        label = type(device).__name__
+        start = time.perf_counter()
+        decrypted = device.decrypt(raw_data)
+        decrypted_at = time.perf_counter()
+        parsed = device.make_data(raw_data, decrypted)
+        metrics.observe(DECRYPT, decrypted_at - start, label)
+        metrics.observe(PARSE, time.perf_counter() - decrypted_at, label)
+        return parsed
+
+    def _parsed(
+        self,
+        ble_device: BLEDevice,
+        advertisement: AdvertisementData,
+        future: asyncio.Future[DeviceData],
+    ) -> None:
+        if future.cancelled():
+            return
+        parsed = self._result(ble_device, future.exception() or future.result())
+        if parsed is not None:
+            self.output(ble_device, advertisement, parsed)
+
+    def _parsed_batch(
+        self, items: List[QueuedAdvertisement], future: asyncio.Future[list]
+    ) -> None:
+        if future.cancelled():
             return
-        parsed = device.parse(raw_data)
+        readings = []
+        for item, result in zip(items, future.result()):
+            parsed = self._result(item.device, result)
+            if parsed is not None:
+                readings.append(Reading(item.device, item.advertisement, parsed))
+        self.output_batch(readings)
+
+    def _result(
+        self, ble_device: BLEDevice, result: Union[DeviceData, BaseException]
+    ) -> Optional[DeviceData]:
+        """
+        Handle the outcome of parsing in a worker process or in a batch
+        """
+        if isinstance(result, asyncio.CancelledError):
+            return None
+        if isinstance(result, UnknownDeviceError):
+            logger.error(result)
+            self._rejected.add(ble_device.address, "unknown_device")
+            return None
+        if isinstance(result, BaseException):
+            logger.error(
+                f"Failed to parse advertisement from {ble_device}", exc_info=result
+            )
+            return None
+        return result
+
+    def format(
+        self,
+        ble_device: BLEDevice,
+        advertisement: AdvertisementData,
+        parsed: DeviceData,
+    ) -> str:
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+            line = self._format(ble_device, advertisement, parsed)
+            device = self._known_devices.get(ble_device.address.lower())
+            label = type(device).__name__ if device else type(parsed).__name__
+            metrics.observe(SERIALIZE, time.perf_counter() - start, label)
+            return line
+        return self._format(ble_device, advertisement, parsed)
 
+    def _format(
+        self,
+        ble_device: BLEDevice,
+        advertisement: AdvertisementData,
+        parsed: DeviceData,
+    ) -> str:
         blob = {
             "name": ble_device.name,
             "address": ble_device.address,
             "rssi": advertisement.rssi,
-            "payload": parsed,
+            "payload": to_dict(parsed),
         }
-        print(json.dumps(blob, cls=DeviceDataEncoder, indent=self._indent), flush=True)
+        return dumps(blob, indent=self._indent)
+
+    def output(
+        self,
+        ble_device: BLEDevice,
+        advertisement: AdvertisementData,
+        parsed: DeviceData,
+    ) -> None:
+        if self.state is not None:
+            self.state.update(ble_device.address, parsed, advertisement.rssi)
+        if self.history is not None:
+            self.history.append(ble_device.address, parsed)
+        if self.rollups is not None:
+            self.rollups.add(ble_device.address, parsed)
+        if self.emission is not None and not self.emission.should_emit(
+            ble_device.address, parsed
+        ):
+            return
+        self.write([self.format(ble_device, advertisement, parsed)])
+
+    def output_batch(self, readings: List[Reading]) -> None:
+        """
+        Output the readings parsed from a batch of advertisements
+        """
+        if self.state is not None:
+            for reading in readings:
+                self.state.update(
+                    reading.device.address, reading.parsed, reading.advertisement.rssi
+                )
+        if self.history is not None:
+            for reading in readings:
+                self.history.append(reading.device.address, reading.parsed)
+        if self.rollups is not None:
+            for reading in readings:
+                self.rollups.add(reading.device.address, reading.parsed)
+        if self.emission is not None:
+            should_emit = self.emission.should_emit
+            readings = [r for r in readings if should_emit(r.device.address, r.parsed)]
+        self.write([self.format(*reading) for reading in readings])
+
+    def write(self, lines: List[str]) -> None:
+        """
+        Write formatted readings to stdout with a single write and flush
+        """
+        if not lines:
+            return
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+        sys.stdout.write("".join(f"{line}\n" for line in lines))
+        sys.stdout.flush()
+        if metrics is not None:
+            metrics.observe(OUTPUT, time.perf_counter() - start)
+            metrics.inc("readings", amount=len(lines))
 
 
 class DiscoveryScanner(BaseScanner):
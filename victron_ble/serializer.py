@@ -0,0 +1,154 @@
+import inspect
+import json
+import math
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from victron_ble.devices import DeviceData
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover
+    HAS_ORJSON = False
+
+
+def _enum_name(value: Any) -> Any:
+    return value.name.lower() if isinstance(value, Enum) else value
+
+
+def _returns_enum(getter: Callable) -> bool:
+    try:
+        annotation = typing.get_type_hints(getter).get("return")
+    except Exception:
+        # Unresolvable annotations fall back to checking every value
+        return True
+    if annotation is None:
+        return True
+    candidates = typing.get_args(annotation) or (annotation,)
+    return any(
+        not isinstance(candidate, type) or issubclass(candidate, Enum)
+        for candidate in candidates
+        if candidate is not type(None)
+    )
+
+
+class DeviceDataSerializer:
+    """
+    Converts DeviceData instances of one class to JSON-compatible dicts.
+
+    The get_* methods of the class are discovered once. Each getter becomes a
+    field named without the get_ prefix; enums are output as their lower case
+    name and None values are left out.
+    """
+
+    def __init__(self, data_type: Type[DeviceData]) -> None:
+        self.data_type = data_type
+        self.fields: List[Tuple[str, Callable, Optional[Callable]]] = [
+            (name[4:], getter, _enum_name if _returns_enum(getter) else None)
+            for name, getter in inspect.getmembers(data_type, inspect.isfunction)
+            if name.startswith("get_")
+        ]
+
+    def to_dict(self, data: DeviceData) -> Dict[str, Any]:
+        result = {}
+        for name, getter, convert in self.fields:
+            value = getter(data)
+            if value is None:
+                continue
+            if convert is not None:
+                value = convert(value)
+            result[name] = value
+        return result
+
+
+_serializers: Dict[Type[DeviceData], DeviceDataSerializer] = {}
+
+
+def serializer_for(data_type: Type[DeviceData]) -> DeviceDataSerializer:
+    serializer = _serializers.get(data_type)
+    if serializer is None:
+        serializer = _serializers[data_type] = DeviceDataSerializer(data_type)
+    return serializer
+
+
+def to_dict(data: DeviceData) -> Dict[str, Any]:
+    return serializer_for(type(data)).to_dict(data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """
+    Serialize to JSON, using orjson if it is installed.
+
+    The output is the same either way: compact without an indent, enums as
+    their lower case name and non-ASCII characters unescaped. orjson only
+    supports an indent of 2, and writes non-finite floats (such as the
+    SmartLithium cell voltages out of range) as null, so those fall back to
+    the standard library, which writes Infinity, -Infinity and NaN.
+    """
+    if HAS_ORJSON and indent in (None, 2):
+        try:
+            # orjson writes enums by value without calling default
+            converted = _for_orjson(obj)
+        except _NonFinite:
+            pass
+        else:
+            return orjson.dumps(
+                converted,
+                default=_default,
+                option=orjson.OPT_INDENT_2 if indent else 0,
+            ).decode()
+    return json.dumps(
+        obj,
+        default=_default,
+        indent=indent,
+        separators=(",", ":") if indent is None else None,
+        ensure_ascii=False,
+    )
+
+
+class _NonFinite(Exception):
+    pass
+
+
+def _for_orjson(obj: Any) -> Any:
+    """
+    Return obj with enums replaced by their names, copying only the
+    containers that hold one, or raise _NonFinite for inf and NaN
+    """
+    cls = obj.__class__
+    if cls is str or cls is int or cls is bool or obj is None:
+        return obj
+    if cls is float:
+        if not math.isfinite(obj):
+            raise _NonFinite()
+        return obj
+    if cls is dict:
+        converted = None
+        for key, value in obj.items():
+            new = _for_orjson(value)
+            if new is not value:
+                if converted is None:
+                    converted = dict(obj)
+                converted[key] = new
+        return obj if converted is None else converted
+    if cls is list or cls is tuple:
+        items = [_for_orjson(value) for value in obj]
+        if any(new is not old for new, old in zip(items, obj)):
+            return items
+        return obj
+    if isinstance(obj, Enum):
+        return obj.name.lower()
+    if isinstance(obj, DeviceData):
+        return _for_orjson(to_dict(obj))
+    return obj
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, DeviceData):
+        return to_dict(obj)
+    if isinstance(obj, Enum):
+        return obj.name.lower()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
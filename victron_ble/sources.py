@@ -0,0 +1,365 @@
+"""
+Sources of BLE advertisements for scanners.
+
+A source calls a detection callback with the same (BLEDevice,
+AdvertisementData) pairs that bleak produces, so scanners can process
+advertisements from a Bluetooth adapter, a recording, a UNIX socket or a
+synthetic generator alike.
+"""
+
+import abc
+import asyncio
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from victron_ble.devices import (
+    AuxMode,
+    BatterySense,
+    DcEnergyMeter,
+    Device,
+    Inverter,
+    default_registry,
+)
+from victron_ble.devices.base import MODEL_ID_MAPPING, AlarmReason, Field
+from victron_ble.recording_format import MAGIC, RECORD_HEADER, read_recording
+
+VICTRON_MANUFACTURER_ID = 0x02E1
+
+DetectionCallback = Callable[[BLEDevice, AdvertisementData], None]
+
+# Advertisements delivered before yielding to the event loop at full speed
+_YIELD_EVERY = 64
+
+
+def make_advertisement(
+    address: str, name: Optional[str], rssi: int, data: bytes
+) -> Tuple[BLEDevice, AdvertisementData]:
+    """
+    Build the bleak objects a live scan produces for Victron manufacturer data
+    """
+    device = BLEDevice(address, name, None)
+    advertisement = AdvertisementData(
+        local_name=name,
+        manufacturer_data={VICTRON_MANUFACTURER_ID: data},
+        service_data={},
+        service_uuids=[],
+        tx_power=None,
+        rssi=rssi,
+        platform_data=(),
+    )
+    return device, advertisement
+
+
+class AdvertisementSource(abc.ABC):
+    @abc.abstractmethod
+    async def start(self, callback: DetectionCallback) -> None:
+        """
+        Start delivering advertisements to the callback
+        """
+
+    @abc.abstractmethod
+    async def stop(self) -> None:
+        pass
+
+
+class BleakSource(AdvertisementSource):
+    """
+    Advertisements received by the Bluetooth adapter
+    """
+
+    def __init__(self, **scanner_kwargs) -> None:
+        self._scanner_kwargs = scanner_kwargs
+        self._scanner: Optional[BleakScanner] = None
+
+    async def start(self, callback: DetectionCallback) -> None:
+        self._scanner = BleakScanner(
+            detection_callback=callback, **self._scanner_kwargs
+        )
+        await self._scanner.start()
+
+    async def stop(self) -> None:
+        if self._scanner is not None:
+            await self._scanner.stop()
+            self._scanner = None
+
+
+class _TaskSource(AdvertisementSource):
+    """
+    A source that delivers advertisements from a task until it is exhausted
+    """
+
+    def __init__(self) -> None:
+        self._task: Optional["asyncio.Task[int]"] = None
+
+    async def start(self, callback: DetectionCallback) -> None:
+        self._task = asyncio.ensure_future(self._run(callback))
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def wait(self) -> int:
+        """
+        Wait until the source is exhausted and return the number delivered
+        """
+        assert self._task is not None, "The source has not been started"
+        return await self._task
+
+    @abc.abstractmethod
+    async def _run(self, callback: DetectionCallback) -> int:
+        pass
+
+
+class ReplaySource(_TaskSource):
+    """
+    Advertisements from a recording (see victron_ble.recording_format).
+
+    A speed of 1 replays in real time and larger values accelerate playback;
+    None (or 0) replays as fast as possible, yielding to the event loop
+    regularly so that queue consumers and batch timers keep running.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0) -> None:
+        super().__init__()
+        self.path = path
+        self.speed = speed
+
+    async def _run(self, callback: DetectionCallback) -> int:
+        count = 0
+        start = time.monotonic()
+        first: Optional[float] = None
+        for record in read_recording(self.path):
+            if self.speed:
+                if first is None:
+                    first = record.timestamp
+                elapsed = time.monotonic() - start
+                delay = (record.timestamp - first) / self.speed - elapsed
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif count % _YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            callback(
+                *make_advertisement(
+                    record.address, record.name, record.rssi, record.data
+                )
+            )
+            count += 1
+        return count
+
+
+class UnixSocketSource(AdvertisementSource):
+    """
+    Advertisements written to a UNIX socket by other processes.
+
+    Every connection carries a stream in the recording format, so a recording
+    can be fed as is, e.g. with ``socat - UNIX-CONNECT:<path> < recording``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.received = 0
+
+    async def start(self, callback: DetectionCallback) -> None:
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            try:
+                await self._read(reader, callback)
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_unix_server(handle, self.path)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    async def _read(
+        self, reader: asyncio.StreamReader, callback: DetectionCallback
+    ) -> None:
+        try:
+            if await reader.readexactly(len(MAGIC)) != MAGIC:
+                return
+            while True:
+                header = await reader.readexactly(RECORD_HEADER.size)
+                _, rssi, address_len, name_len, data_len = RECORD_HEADER.unpack(header)
+                body = await reader.readexactly(address_len + name_len + data_len)
+                data_start = address_len + name_len
+                address = body[:address_len].decode()
+                name = body[address_len:data_start].decode() or None
+                callback(*make_advertisement(address, name, rssi, body[data_start:]))
+                self.received += 1
+        except asyncio.IncompleteReadError:
+            # The writer disconnected
+            return
+
+
+# Returns a raw (not yet converted) field value
+Distribution = Callable[[random.Random], int]
+
+
+def _alarm_reason(rng: random.Random) -> int:
+    return rng.choice(list(AlarmReason)).value
+
+
+# Distributions replacing the uniform default for some device fields
+_DEFAULT_DISTRIBUTIONS: Dict[type, Dict[str, Distribution]] = {
+    # A Battery Sense always reports its temperature
+    BatterySense: {"aux_mode": lambda rng: AuxMode.TEMPERATURE.value},
+    # The alarm is converted to an AlarmReason by the getter
+    DcEnergyMeter: {"alarm": _alarm_reason},
+    Inverter: {"alarm": _alarm_reason},
+}
+
+
+def _default_model_id(device_type: Type[Device]) -> int:
+    readout_type = device_type.readout_type or 0
+    for model_id in sorted(MODEL_ID_MAPPING):
+        if default_registry.lookup(model_id, readout_type) is device_type:
+            return model_id
+    return 0
+
+
+class SyntheticDevice:
+    """
+    Generates encrypted advertisements for a device type.
+
+    Raw field values are drawn from the given distributions. Fields without
+    one get a uniformly chosen enum member, or a uniformly random raw value.
+    """
+
+    def __init__(
+        self,
+        device_type: Type[Device],
+        address: str,
+        key: Optional[str] = None,
+        distributions: Optional[Dict[str, Distribution]] = None,
+        model_id: Optional[int] = None,
+        name: Optional[str] = None,
+        rssi: int = -60,
+        seed: Optional[int] = None,
+    ) -> None:
+        if device_type.layout is None:
+            raise ValueError(f"{device_type.__name__} does not define a layout")
+        self._random = random.Random(seed)
+        self.device_type = device_type
+        self.address = address
+        self.key = key or self._random.getrandbits(128).to_bytes(16, "big").hex()
+        self.model_id = _default_model_id(device_type) if model_id is None else model_id
+        self.name = name or device_type.__name__
+        self.rssi = rssi
+        self._device = device_type(self.key)
+        self._iv = self._random.randrange(1 << 16)
+        distributions = {
+            **_DEFAULT_DISTRIBUTIONS.get(device_type, {}),
+            **(distributions or {}),
+        }
+        self._distributions: List[Tuple[str, Distribution]] = []
+        for field in device_type.layout.fields:
+            distribution = distributions.get(field.name)
+            if distribution is None:
+                distribution = _uniform(field)
+            self._distributions.append((field.name, distribution))
+
+    def raw_values(self) -> Dict[str, int]:
+        rng = self._random
+        return {name: distribution(rng) for name, distribution in self._distributions}
+
+    def advertisement(self) -> bytes:
+        assert self.device_type.layout is not None
+        plain = self.device_type.layout.pack(self.raw_values())
+        self._iv = (self._iv + 1) & 0xFFFF
+        return self._device.encrypt(plain, self.model_id, self._iv)
+
+
+def _uniform(field: Field) -> Distribution:
+    if field.enum is not None:
+        # Only members that survive the field's sign extension
+        if field.signed:
+            low, high = -(1 << field.bits - 1), 1 << field.bits - 1
+        else:
+            low, high = 0, 1 << field.bits
+        members = [m.value for m in field.enum if low <= m.value < high]
+        return lambda rng: rng.choice(members)
+    bits = field.bits
+    return lambda rng: rng.getrandbits(bits)
+
+
+class SyntheticSource(_TaskSource):
+    """
+    Advertisements generated round-robin from synthetic devices.
+
+    With a rate (advertisements per second) the source paces itself,
+    otherwise it generates as fast as possible. It stops after count
+    advertisements, or runs until stopped.
+    """
+
+    def __init__(
+        self,
+        devices: Sequence[SyntheticDevice],
+        rate: Optional[float] = None,
+        count: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        self.devices = list(devices)
+        self.rate = rate
+        self.count = count
+
+    @classmethod
+    def for_all_devices(
+        cls, per_type: int = 1, seed: int = 0, **kwargs
+    ) -> "SyntheticSource":
+        """
+        Create a source with devices of every registered device type
+        """
+        device_types = sorted(
+            (klass for klass in default_registry.device_types() if klass.layout),
+            key=lambda klass: klass.__name__,
+        )
+        devices: List[SyntheticDevice] = []
+        for device_type in device_types:
+            for _ in range(per_type):
+                index = len(devices)
+                address = "AA:BB:CC:" + index.to_bytes(3, "big").hex(":").upper()
+                devices.append(SyntheticDevice(device_type, address, seed=seed + index))
+        return cls(devices, **kwargs)
+
+    @property
+    def device_keys(self) -> Dict[str, str]:
+        return {device.address: device.key for device in self.devices}
+
+    async def _run(self, callback: DetectionCallback) -> int:
+        sent = 0
+        start = time.monotonic()
+        while self.count is None or sent < self.count:
+            device = self.devices[sent % len(self.devices)]
+            if self.rate:
+                delay = sent / self.rate - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif sent % _YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            callback(
+                *make_advertisement(
+                    device.address, device.name, device.rssi, device.advertisement()
+                )
+            )
+            sent += 1
+        return sent
@@ -0,0 +1,187 @@
+"""
+The latest reading of every device, with notification of changed values.
+
+Values are compared field by field, using the getters of the device data
+(named without their get_ prefix as in the JSON output). A deadband makes
+a numeric field count as changed only once it moved further than the
+deadband away from the value last reported to subscribers, so slow drift is
+still reported while noise is not.
+"""
+
+import logging
+import time
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from victron_ble.devices import DeviceData
+from victron_ble.serializer import serializer_for
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceState(NamedTuple):
+    data: DeviceData
+    # Wall clock time at which the reading was received
+    timestamp: float
+    rssi: Optional[int]
+    values: Dict[str, Any]
+
+
+# Field name -> (last reported value, new value)
+Changes = Dict[str, tuple]
+
+Subscriber = Callable[[str, DeviceState, Changes], None]
+
+
+def field_values(data: DeviceData) -> Dict[str, Any]:
+    """
+    Return the value of every getter of the data, keyed by field name
+    """
+    return {name: getter(data) for name, getter, _ in serializer_for(type(data)).fields}
+
+
+def is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, (bool, Enum))
+
+
+class _Subscription:
+    __slots__ = ("callback", "address", "fields")
+
+    def __init__(
+        self,
+        callback: Subscriber,
+        address: Optional[str],
+        fields: Optional[Collection[str]],
+    ) -> None:
+        self.callback = callback
+        self.address = address
+        self.fields = frozenset(fields) if fields is not None else None
+
+
+class StateStore:
+    """
+    Holds the latest reading per address and notifies subscribers of changes
+    """
+
+    def __init__(
+        self,
+        deadbands: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.deadbands = dict(deadbands or {})
+        self._clock = clock
+        self._states: Dict[str, DeviceState] = {}
+        # The values last reported to subscribers, the reference for deadbands
+        self._reported: Dict[str, Dict[str, Any]] = {}
+        self._subscriptions: List[_Subscription] = []
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, address: str) -> bool:
+        return address.lower() in self._states
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._states)
+
+    def get(self, address: str) -> Optional[DeviceState]:
+        return self._states.get(address.lower())
+
+    def update(
+        self,
+        address: str,
+        data: DeviceData,
+        rssi: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> Changes:
+        """
+        Store a reading, returning and notifying the fields that changed
+        """
+        address = address.lower()
+        values = field_values(data)
+        state = DeviceState(
+            data, self._clock() if timestamp is None else timestamp, rssi, values
+        )
+        self._states[address] = state
+
+        reported = self._reported.get(address)
+        if reported is None:
+            self._reported[address] = dict(values)
+            changes = {
+                name: (None, value)
+                for name, value in values.items()
+                if value is not None
+            }
+        else:
+            changes = {}
+            for name, value in values.items():
+                old = reported.get(name)
+                if self._changed(name, old, value):
+                    changes[name] = (old, value)
+                    reported[name] = value
+
+        if changes:
+            self._notify(address, state, changes)
+        return changes
+
+    def remove(self, address: str) -> None:
+        address = address.lower()
+        self._states.pop(address, None)
+        self._reported.pop(address, None)
+
+    def subscribe(
+        self,
+        callback: Subscriber,
+        address: Optional[str] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> Callable[[], None]:
+        """
+        Call callback(address, state, changes) when fields change, optionally
+        only for one address or for some fields. Returns an unsubscribe
+        function.
+        """
+        subscription = _Subscription(
+            callback, address.lower() if address is not None else None, fields
+        )
+        self._subscriptions.append(subscription)
+
+        def unsubscribe() -> None:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+        return unsubscribe
+
+    def _changed(self, name: str, old: Any, new: Any) -> bool:
+        if old == new:
+            return False
+        deadband = self.deadbands.get(name)
+        if deadband is not None and is_number(old) and is_number(new):
+            return abs(new - old) > deadband
+        return True
+
+    def _notify(self, address: str, state: DeviceState, changes: Changes) -> None:
+        for subscription in list(self._subscriptions):
+            if subscription.address is not None and subscription.address != address:
+                continue
+            selected = changes
+            if subscription.fields is not None:
+                selected = {
+                    name: change
+                    for name, change in changes.items()
+                    if name in subscription.fields
+                }
+                if not selected:
+                    continue
+            try:
+                subscription.callback(address, state, selected)
+            except Exception:
+                logger.exception(f"State subscriber failed for {address}")